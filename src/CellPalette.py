@@ -0,0 +1,166 @@
+"""The shared colors of the cells.
+
+Cells only store which state they are in, and look their colors up in a
+palette shared by every cell of a viewer. Changing a color is a single
+assignment followed by a repaint, no matter how large the maze is.
+"""
+from PyQt6.QtGui import QColor
+from enum import IntEnum
+import json
+import os
+
+
+class CellState(IntEnum):
+    """Enumeration for the fill state of a cell.
+
+    Attributes:
+        INACTIVE = 0
+        ACTIVE = 1
+        QUEUED = 2
+        OBSERVING = 3
+    """
+
+    INACTIVE = 0
+    ACTIVE = 1
+    QUEUED = 2
+    OBSERVING = 3
+
+
+# The palette role used to fill each cell state
+FILL_ROLES = {
+    CellState.INACTIVE: "inactive",
+    CellState.ACTIVE: "active",
+    CellState.QUEUED: "queued",
+    CellState.OBSERVING: "observing",
+}
+
+BUILTIN_THEMES = {
+    "Default": {
+        "inactive": "#ff7f7f7f",
+        "active": "#ffffffff",
+        "queued": "#ffa33939",
+        "observing": "#fff56464",
+        "path": "#ff3fa2f2",
+        "route": "#fff29635",
+        "wall": "#ff000000",
+        "text": "#ff000000",
+    },
+    "Dark": {
+        "inactive": "#ff202020",
+        "active": "#ff3a3a3a",
+        "queued": "#ff6a3d9a",
+        "observing": "#ffe0629a",
+        "path": "#ff4fc3f7",
+        "route": "#ffffca28",
+        "wall": "#ffe0e0e0",
+        "text": "#ffffffff",
+    },
+}
+
+
+class CellPalette:
+    """The colors shared by the cells of a viewer.
+
+    Args:
+        theme (dict[str, str]): Colors by role as #AARRGGBB strings. Defaults to
+            the Default theme.
+
+    Attributes:
+        colors (dict[str, QColor]): The color of each role (inactive, active,
+            queued, observing, path, route, wall, text).
+    """
+
+    def __init__(self, theme: dict[str, str] = None):
+        self.colors = {}
+        self.setTheme(BUILTIN_THEMES["Default"])
+        if theme is not None:
+            self.setTheme(theme)
+
+    def __getitem__(self, role: str) -> QColor:
+        return self.colors[role]
+
+    def __setitem__(self, role: str, color: QColor):
+        self.colors[role] = QColor(color)
+
+    def fill(self, state: CellState) -> QColor:
+        """Gets the fill color of a cell state.
+
+        Args:
+            state (CellState): The state of the cell.
+
+        Returns:
+            QColor: The color to fill the cell with.
+        """
+        return self.colors[FILL_ROLES[state]]
+
+    def theme(self) -> dict[str, str]:
+        """Gets the colors as a theme.
+
+        Returns:
+            dict[str, str]: Colors by role as #AARRGGBB strings.
+        """
+        return {
+            role: color.name(QColor.NameFormat.HexArgb)
+            for role, color in self.colors.items()
+        }
+
+    def setTheme(self, theme: dict[str, str]):
+        """Sets the colors from a theme.
+
+        Note:
+            Roles missing from the theme keep their current color.
+
+        Args:
+            theme (dict[str, str]): Colors by role as #AARRGGBB strings.
+        """
+        for role, name in theme.items():
+            self.colors[role] = QColor(name)
+
+
+def themesFile() -> str:
+    """Gets the file the user's themes are saved in.
+
+    Returns:
+        str: $XDG_CONFIG_HOME/MazeViewer/themes.json, or ~/.config when unset.
+    """
+    base = os.environ.get("XDG_CONFIG_HOME", os.path.join(os.path.expanduser("~"), ".config"))
+    return os.path.join(base, "MazeViewer", "themes.json")
+
+
+def loadThemes() -> dict[str, dict[str, str]]:
+    """Loads the built-in and saved themes.
+
+    Returns:
+        dict[str, dict[str, str]]: The themes by name.
+    """
+    themes = dict(BUILTIN_THEMES)
+
+    try:
+        with open(themesFile(), "r") as file:
+            themes.update(json.load(file))
+    except (OSError, ValueError):
+        pass
+
+    return themes
+
+
+def saveTheme(name: str, palette: CellPalette):
+    """Saves a palette as a named theme.
+
+    Args:
+        name (str): The name of the theme.
+        palette (CellPalette): The palette to save.
+    """
+    fileName = themesFile()
+
+    try:
+        with open(fileName, "r") as file:
+            themes = json.load(file)
+    except (OSError, ValueError):
+        themes = {}
+
+    themes[name] = palette.theme()
+
+    os.makedirs(os.path.dirname(fileName), exist_ok=True)
+    with open(fileName, "w") as file:
+        json.dump(themes, file, indent=2)
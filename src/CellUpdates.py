@@ -0,0 +1,108 @@
+"""The decoded state of the cells touched by a step.
+
+Decoding a step into what each cell should show is done for all changed
+cells at once with array operations, independently of the Qt items, so it
+can happen ahead of time on another thread. Applying the result only copies
+the values onto the cells.
+"""
+
+import numpy as np
+from typing import NamedTuple
+from CellPalette import CellState
+from MazeGrid import LEFT, RIGHT, TOP, BOTTOM
+
+ALL_WALLS = LEFT | RIGHT | TOP | BOTTOM
+ROUTE_CHARS = np.frombuffer(b"*sx", dtype=np.uint8)
+
+
+def affectedCells(positions: np.ndarray, columns: int, width: int, height: int) -> np.ndarray:
+    """Finds the cells that read any of the changed characters.
+
+    Note:
+        A cell reads the characters up to two away from its center.
+
+    Args:
+        positions (np.ndarray): The flat positions of the changed characters.
+        columns (int): The number of characters per row (2W+1).
+        width (int): The width of the maze in cells.
+        height (int): The height of the maze in cells.
+
+    Returns:
+        np.ndarray: The sorted indices of the affected cells.
+    """
+    rows, cols = np.divmod(positions, columns)
+    cellX = ((cols - 1) // 2)[:, None] + np.array([-1, 0, 1])
+    cellY = ((rows - 1) // 2)[:, None] + np.array([-1, 0, 1])
+    cellX = np.repeat(cellX, 3, axis=1)
+    cellY = np.tile(cellY, 3)
+    valid = (cellX >= 0) & (cellX < width) & (cellY >= 0) & (cellY < height)
+    return np.unique(cellY[valid] * width + cellX[valid])
+
+
+class CellUpdates(NamedTuple):
+    """The values to copy onto a set of cells.
+
+    Attributes:
+        cells (np.ndarray): The indices of the cells.
+        walls (np.ndarray): The wall bitmask of each cell.
+        paths (np.ndarray): The sides with a path stroke, as wall bits.
+        routes (np.ndarray): The sides with a route stroke, as wall bits.
+        states (np.ndarray): The CellState of each cell.
+        chars (np.ndarray): The symbol of each cell.
+    """
+
+    cells: np.ndarray
+    walls: np.ndarray
+    paths: np.ndarray
+    routes: np.ndarray
+    states: np.ndarray
+    chars: np.ndarray
+
+    @classmethod
+    def fromChars(cls, chars: np.ndarray, cells: np.ndarray) -> "CellUpdates":
+        """Decodes cells from the maze characters like MazeViewer.drawChars.
+
+        Args:
+            chars (np.ndarray): The characters of the maze, shape (2H+1, 2W+1) uint8.
+            cells (np.ndarray): The indices of the cells to decode.
+
+        Returns:
+            CellUpdates: The decoded cells.
+        """
+        height, width = chars.shape[0] // 2, chars.shape[1] // 2
+        y, x = np.divmod(np.asarray(cells, dtype=np.int64), width)
+        cy = 2 * y + 1
+        cx = 2 * x + 1
+
+        center = chars[cy, cx]
+        sides = {
+            LEFT: chars[cy, cx - 1],
+            RIGHT: chars[cy, cx + 1],
+            TOP: chars[cy - 1, cx],
+            BOTTOM: chars[cy + 1, cx],
+        }
+
+        route = np.isin(center, ROUTE_CHARS)
+        path = route | (center == ord("."))
+
+        walls = np.zeros(center.shape, dtype=np.uint8)
+        paths = np.zeros(center.shape, dtype=np.uint8)
+        routes = np.zeros(center.shape, dtype=np.uint8)
+        for side, char in sides.items():
+            walls |= (char == ord("#")) * np.uint8(side)
+            paths |= (path & (char == ord("."))) * np.uint8(side)
+            routes |= (route & (char == ord("*"))) * np.uint8(side)
+
+        # Neighbors past the border count as observing
+        observing = ord(":")
+        surrounded = (x == 0) | (chars[cy, np.maximum(cx - 2, 1)] == observing)
+        surrounded &= (x == width - 1) | (chars[cy, np.minimum(cx + 2, 2 * width - 1)] == observing)
+        surrounded &= (y == 0) | (chars[np.maximum(cy - 2, 1), cx] == observing)
+        surrounded &= (y == height - 1) | (chars[np.minimum(cy + 2, 2 * height - 1), cx] == observing)
+
+        states = np.full(center.shape, CellState.INACTIVE, dtype=np.uint8)
+        states[surrounded | (walls != ALL_WALLS)] = CellState.ACTIVE
+        states[(center == ord("Q")) | (center == ord("q"))] = CellState.QUEUED
+        states[center == observing] = CellState.OBSERVING
+
+        return cls(np.asarray(cells), walls, paths, routes, states, center)
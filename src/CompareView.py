@@ -0,0 +1,350 @@
+"""The view for comparing solvers side by side.
+
+This file utilizes the layout of a ui file, and adds the control
+logic to it.
+"""
+from PyQt6.QtWidgets import QWidget, QLabel, QVBoxLayout, QMessageBox
+from PyQt6 import uic
+from PyQt6.QtCore import QTimerEvent, Qt, pyqtSignal
+from PyQt6.QtGui import QColor
+from concurrent.futures import ProcessPoolExecutor, Future
+from MazeViewer import MazeViewer
+from MazeCache import MazeCache
+from MazeFile import MazeFile
+from StepStore import StepStore
+from CellPalette import CellPalette
+from SpeedDialog import MAX_SPEED, FRAME_INTERVAL
+import multiprocessing
+import subprocess
+import math
+import os
+
+
+def runSolver(solveBin: str, mazeFile: str, solver: str, stepsFile: str) -> str:
+    """Runs a solver binary.
+
+    Note:
+        The solver runs in a worker process. Its steps stay in stepsFile,
+        only the solved maze is pickled back to the view.
+
+    Args:
+        solveBin (str): The binary for solving mazes.
+        mazeFile (str): The file holding the maze to solve.
+        solver (str): The name of the solver to use.
+        stepsFile (str): The file for storing the solver's steps.
+
+    Raises:
+        subprocess.CalledProcessError: If the solver failed.
+
+    Returns:
+        str: The solved maze.
+    """
+    cmd = [solveBin, "-q", "-v", stepsFile, "-i", mazeFile, "-a", solver]
+    process = subprocess.run(cmd, stdout=subprocess.PIPE)
+    process.check_returncode()
+    return "\n".join(
+        [line.strip("\r") for line in process.stdout.decode("ASCII").split("\n")]
+    ).strip("\n")
+
+
+def countVisited(maze: str) -> int:
+    """Counts the cells a solver visited.
+
+    Args:
+        maze (str): The solved maze.
+
+    Returns:
+        int: The number of cells marked as visited, observed or on the route.
+    """
+    rows = maze.split("\n")
+    return sum(
+        row[x] in ".:*sx" for row in rows[1::2] for x in range(1, len(row), 2)
+    )
+
+
+class CompareView(QWidget):
+    """The view for comparing solvers on the same maze.
+
+    Args:
+        *args (list): List of arguments to pass to QWidget.
+        **kwargs (dict): Dictionary of key-word arguments to pass to QWidget.
+
+    Attributes:
+        step (int): The current step of the shared playback clock.
+        speed (int): The speed to run through the steps in steps/s.
+        mazeFile (str): The file holding the maze to solve.
+        solveBin (str): The binary for solving mazes.
+        cache (MazeCache): The cache of solved mazes.
+        cellPalette (CellPalette): The colors shared by every viewer.
+        mazeKey (str | None): The cache key of the maze being solved.
+        width (int): The width of the maze.
+        height (int): The height of the maze.
+        solvers (list[str]): The solvers of the current comparison.
+        steps (dict[str, StepStore]): The steps of each solver.
+        viewers (dict[str, MazeViewer]): The viewer of each solver.
+
+    Signals:
+        solverFinished (int, str, str, Future): Emitted from the pool's thread when
+            a solver of a comparison is done, delivered to the GUI thread.
+    """
+
+    solverFinished = pyqtSignal(int, str, str, Future)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        uic.loadUi("ui/CompareView.ui", self)
+
+        self.step = 0
+        self.speed = 50
+        self.mazeFile = "maze.mz"
+        self.solveBin = ""
+        self.cache = MazeCache()
+        self.cellPalette = CellPalette()
+        self.mazeKey = None
+        self.width = 10
+        self.height = 10
+        self.solvers = []
+        self.steps = {}
+        self.viewers = {}
+        self._labels = {}
+        self._timerId = None
+        self._stride = 1
+        self._pool = None
+        self._comparison = 0
+        self._mazes = {}
+        self._pending = set()
+
+        self.solveButton.clicked.connect(self.solve)
+        self.solverFinished.connect(self.finishSolver)
+        self.runButton.clicked.connect(self.run)
+
+    def selectedSolvers(self) -> list[str]:
+        """Gets the solvers checked for comparison.
+
+        Returns:
+            list[str]: The names of the checked solvers.
+        """
+        boxes = [
+            (self.depthCheckBox, "depth"),
+            (self.breadthCheckBox, "breadth"),
+            (self.dijkstraCheckBox, "dijkstra"),
+            (self.aStarCheckBox, "a-star"),
+        ]
+        return [solver for box, solver in boxes if box.isChecked()]
+
+    def setMaze(self, mazeFile: str, width: int, height: int, mazeKey: str = None):
+        """Sets the maze to compare the solvers on.
+
+        Args:
+            mazeFile (str): The file holding the maze.
+            width (int): The width of the maze.
+            height (int): The height of the maze.
+            mazeKey (str): The cache key of the maze. Defaults to None (no caching).
+        """
+        self.stop()
+        self.mazeFile = mazeFile
+        self.width = width
+        self.height = height
+        self.mazeKey = mazeKey
+        self.clearViews()
+
+    def clearViews(self):
+        """Removes the viewers of the previous comparison.
+
+        Note:
+            Solvers still running are abandoned, their results are dropped.
+        """
+        self._comparison += 1
+        self._pending = set()
+        self._mazes = {}
+        self.solveButton.setEnabled(True)
+
+        while self.viewsLayout.count():
+            item = self.viewsLayout.takeAt(0)
+            if item.widget() is not None:
+                item.widget().deleteLater()
+
+        self.solvers = []
+        self.steps = {}
+        self.viewers = {}
+        self._labels = {}
+        self.runButton.setEnabled(False)
+
+    def solve(self):
+        """Solves the maze with every selected solver concurrently.
+
+        Note:
+            Cached solutions are reused, the rest run in a process pool
+            without blocking the view. The viewers are laid out once every
+            solver is done.
+        """
+        self.stop()
+        self.clearViews()
+        self.solvers = self.selectedSolvers()
+        if self.solvers == []:
+            return
+
+        for solver in self.solvers:
+            cached = None
+            if self.mazeKey is not None:
+                cached = self.cache.load(self.cache.key(self.mazeKey, solver))
+
+            if cached is not None:
+                self._mazes[solver] = cached[0]
+                self.steps[solver] = StepStore.fromSteps(cached[1])
+            else:
+                self._pending.add(solver)
+
+        if self._pending == set():
+            self.showSolvers()
+            return
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context("forkserver"))
+
+        self.solveButton.setEnabled(False)
+        comparison = self._comparison
+        for solver in list(self._pending):
+            # Abandoned solvers may still be writing, so every comparison gets its own files
+            stepsFile = f"maze.{solver}.{comparison}.steps"
+            future = self._pool.submit(runSolver, self.solveBin, self.mazeFile, solver, stepsFile)
+            future.add_done_callback(
+                lambda future, solver=solver, stepsFile=stepsFile: self.solverFinished.emit(
+                    comparison, solver, stepsFile, future
+                )
+            )
+
+    def finishSolver(self, comparison: int, solver: str, stepsFile: str, future: Future):
+        """Loads the steps of a finished solver.
+
+        Note:
+            The steps file is removed once its steps are loaded and cached.
+
+        Args:
+            comparison (int): The comparison the solver belongs to.
+            solver (str): The name of the solver.
+            stepsFile (str): The file holding the solver's steps.
+            future (Future): The solver's run, holding the solved maze.
+        """
+        try:
+            if comparison != self._comparison:
+                return
+
+            try:
+                maze = future.result()
+                with MazeFile(stepsFile) as steps:
+                    self.steps[solver] = StepStore.fromArrays(steps)
+            except Exception as error:
+                self.clearViews()
+                QMessageBox.warning(self, "Compare Solvers", f"The {solver} solver failed:\n{error}")
+                return
+
+            self._mazes[solver] = maze
+            if self.mazeKey is not None:
+                self.cache.store(self.cache.key(self.mazeKey, solver), maze, stepsFile)
+
+            self._pending.discard(solver)
+            if self._pending == set():
+                self.showSolvers()
+        finally:
+            if os.path.exists(stepsFile):
+                os.remove(stepsFile)
+
+    def showSolvers(self):
+        """Lays out a viewer per solver, showing its solved maze."""
+        self.solveButton.setEnabled(True)
+
+        # Lay the viewers out in a near-square grid
+        columns = math.ceil(math.sqrt(len(self.solvers)))
+        for i, solver in enumerate(self.solvers):
+            maze = self._mazes[solver]
+            steps = self.steps[solver]
+
+            viewer = MazeViewer(self.width, self.height)
+            viewer.setCellPalette(self.cellPalette)
+            viewer.setBackgroundBrush(QColor(0, 0, 0, 255))
+            viewer.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+            viewer.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+            viewer.drawMaze(maze)
+            self.viewers[solver] = viewer
+
+            label = QLabel()
+            label.setText(
+                f"{solver}: {len(steps)} steps, {countVisited(maze)} cells visited"
+            )
+            self._labels[solver] = label
+
+            layout = QVBoxLayout()
+            layout.addWidget(label)
+            layout.addWidget(viewer)
+            container = QWidget()
+            container.setLayout(layout)
+            self.viewsLayout.addWidget(container, i // columns, i % columns)
+
+        self.runButton.setEnabled(True)
+        self.refresh()
+
+    def run(self):
+        """Plays every solver's steps in lockstep from the start."""
+        self.stop()
+        self.step = 0
+
+        # The waiting time is based on milliseconds.
+        # 1000 ms / s => 1000 * 1/speed
+        # Faster speeds skip steps between frames instead
+        waitTime = max(FRAME_INTERVAL, int(1000 * 1 / self.speed))
+        if self.speed >= MAX_SPEED:
+            self._stride = max([len(steps) for steps in self.steps.values()], default=1)
+        else:
+            self._stride = max(1, round(self.speed * waitTime / 1000))
+
+        # The viewers show the solved mazes, so they start over from the first step
+        for solver in self.solvers:
+            self.steps[solver].seek(0)
+            self.viewers[solver].drawChars(self.steps[solver].state)
+        self.refresh()
+
+        self.solveButton.setEnabled(False)
+        self.runButton.setEnabled(False)
+        self._timerId = self.startTimer(waitTime)
+
+    def stop(self):
+        """Stops the playback clock."""
+        if self._timerId is not None:
+            self.killTimer(self._timerId)
+            self._timerId = None
+
+        self.solveButton.setEnabled(self._pending == set())
+        self.runButton.setEnabled(self.viewers != {})
+
+    def timerEvent(self, e: QTimerEvent):
+        """Override of the timerEvent method
+
+        Note:
+            Advances the shared playback clock for every viewer.
+
+        Args:
+            e (QTimerEvent): The timer event.
+        """
+        super().timerEvent(e)
+
+        lastStep = 0
+        for solver in self.solvers:
+            steps = self.steps[solver]
+            lastStep = max(lastStep, len(steps) - 1)
+
+            # Solvers that already finished hold their last step
+            changed = steps.seek(min(self.step, len(steps) - 1))
+            self.viewers[solver].applyChanges(steps.state, changed)
+
+        self.refresh()
+
+        if self.step >= lastStep:
+            self.stop()
+        else:
+            self.step = min(self.step + self._stride, lastStep)
+
+    def refresh(self):
+        """Refreshes every viewer."""
+        for viewer in self.viewers.values():
+            viewer.refresh()
@@ -0,0 +1,192 @@
+"""The offscreen renderer for maze frames.
+
+Frames are rasterized straight from the maze characters with NumPy, following
+the drawing rules of Cell.paint, so they can be rendered outside the GUI
+thread without touching the scene.
+"""
+
+import numpy as np
+from CellPalette import CellPalette, CellState, FILL_ROLES
+from MazeGrid import wallArray, LEFT, RIGHT, TOP, BOTTOM
+
+ALL_WALLS = LEFT | RIGHT | TOP | BOTTOM
+
+
+def paletteColors(cellPalette: CellPalette) -> dict[str, tuple[int, int, int]]:
+    """Gets the colors of a palette as plain RGB tuples.
+
+    Note:
+        QColor can't be shared with worker threads, the tuples can.
+
+    Args:
+        cellPalette (CellPalette): The palette.
+
+    Returns:
+        dict[str, tuple[int, int, int]]: The RGB color of each role.
+    """
+    return {role: color.getRgb()[:3] for role, color in cellPalette.colors.items()}
+
+
+def cellStates(chars: np.ndarray) -> np.ndarray:
+    """Computes the fill state of every cell like MazeViewer.drawChars.
+
+    Args:
+        chars (np.ndarray): The characters of the maze, shape (2H+1, 2W+1) uint8.
+
+    Returns:
+        np.ndarray: The CellState of each cell, shape (H, W) uint8.
+    """
+    cells = chars[1::2, 1::2]
+    observing = cells == ord(":")
+
+    # Neighbors past the border count as observing
+    padded = np.pad(observing, 1, constant_values=True)
+    surrounded = padded[1:-1, :-2] & padded[1:-1, 2:] & padded[:-2, 1:-1] & padded[2:, 1:-1]
+
+    states = np.full(cells.shape, CellState.INACTIVE, dtype=np.uint8)
+    states[surrounded | (wallArray(chars) != ALL_WALLS)] = CellState.ACTIVE
+    states[(cells == ord("Q")) | (cells == ord("q"))] = CellState.QUEUED
+    states[observing] = CellState.OBSERVING
+    return states
+
+
+def _strokes(cellSize: int) -> dict[int, np.ndarray]:
+    """Builds the pixel mask of a stroke from the center to each side of a cell.
+
+    Args:
+        cellSize (int): The size of a cell in pixels.
+
+    Returns:
+        dict[int, np.ndarray]: The (cellSize, cellSize) mask of each side.
+    """
+    center = cellSize // 2
+    width = max(1, cellSize // 10)
+    low = center - width // 2
+    high = low + width
+
+    strokes = {side: np.zeros((cellSize, cellSize), dtype=bool) for side in (LEFT, RIGHT, TOP, BOTTOM)}
+    strokes[LEFT][low:high, : center + 1] = True
+    strokes[RIGHT][low:high, center:] = True
+    strokes[TOP][: center + 1, low:high] = True
+    strokes[BOTTOM][center:, low:high] = True
+    return strokes
+
+
+def renderFrame(
+    chars: np.ndarray, colors: dict[str, tuple[int, int, int]], cellSize: int, out: np.ndarray = None
+) -> np.ndarray:
+    """Renders the maze into an RGB image.
+
+    Note:
+        The start and exit are marked with a square in the text color
+        instead of their letter.
+
+    Args:
+        chars (np.ndarray): The characters of the maze, shape (2H+1, 2W+1) uint8.
+        colors (dict[str, tuple[int, int, int]]): The RGB color of each role from paletteColors.
+        cellSize (int): The size of a cell in pixels.
+        out (np.ndarray): The array to render into. Defaults to None (a new array).
+
+    Returns:
+        np.ndarray: The image, shape (H * cellSize + 1, W * cellSize + 1, 3) uint8.
+    """
+    height, width = chars.shape[0] // 2, chars.shape[1] // 2
+    image = out if out is not None else np.empty((height * cellSize + 1, width * cellSize + 1, 3), dtype=np.uint8)
+    image[...] = colors["wall"]
+
+    # Fill every cell with the color of its state
+    fills = np.array([colors[FILL_ROLES[state]] for state in CellState], dtype=np.uint8)
+    cellFill = fills[cellStates(chars)]
+    cellFill = np.repeat(np.repeat(cellFill, cellSize, axis=0), cellSize, axis=1)
+    image[: height * cellSize, : width * cellSize] = cellFill
+
+    # Walls sit on the cell borders, corners are always drawn
+    wall = chars == ord("#")
+    vertical = np.repeat(wall[1::2, 0::2], cellSize, axis=0)
+    horizontal = np.repeat(wall[0::2, 1::2], cellSize, axis=1)
+    image[: height * cellSize, ::cellSize][vertical] = colors["wall"]
+    image[::cellSize, : width * cellSize][horizontal] = colors["wall"]
+    image[::cellSize, ::cellSize] = colors["wall"]
+
+    cells = chars[1::2, 1::2]
+    route = np.isin(cells, np.frombuffer(b"*sx", dtype=np.uint8))
+    path = route | (cells == ord("."))
+
+    sides = {
+        LEFT: chars[1::2, 0:-1:2],
+        RIGHT: chars[1::2, 2::2],
+        TOP: chars[0:-1:2, 1::2],
+        BOTTOM: chars[2::2, 1::2],
+    }
+    view = image[: height * cellSize, : width * cellSize]
+    for side, stroke in _strokes(cellSize).items():
+        tiled = np.tile(stroke, (height, width))
+        for role, drawn, char in (("path", path, "."), ("route", route, "*")):
+            mask = drawn & (sides[side] == ord(char))
+            if mask.any():
+                mask = np.repeat(np.repeat(mask, cellSize, axis=0), cellSize, axis=1)
+                view[mask & tiled] = colors[role]
+
+    # Mark the start and exit
+    marked = np.isin(cells, np.frombuffer(b"SsXx", dtype=np.uint8))
+    if marked.any():
+        size = max(1, cellSize // 3)
+        low = (cellSize - size) // 2
+        square = np.zeros((cellSize, cellSize), dtype=bool)
+        square[low : low + size, low : low + size] = True
+        mask = np.repeat(np.repeat(marked, cellSize, axis=0), cellSize, axis=1)
+        view[mask & np.tile(square, (height, width))] = colors["text"]
+
+    return image
+
+
+def renderThumbnails(
+    frames: np.ndarray,
+    colors: dict[str, tuple[int, int, int]],
+    scale: int,
+    columns: int,
+    margin: int = 4,
+    labelHeight: int = 0,
+) -> np.ndarray:
+    """Renders many mazes of the same size into one image in a single pass.
+
+    Note:
+        Thumbnails draw every character as a square block, so walls are as
+        thick as cells and the path and route fill whole cells.
+
+    Args:
+        frames (np.ndarray): The characters of every maze, shape (N, 2H+1, 2W+1) uint8.
+        colors (dict[str, tuple[int, int, int]]): The RGB color of each role from paletteColors.
+        scale (int): The size of a character in pixels.
+        columns (int): The number of thumbnails per row.
+        margin (int): The space around each thumbnail in pixels. Defaults to 4.
+        labelHeight (int): Extra space above each thumbnail for a label. Defaults to 0.
+
+    Returns:
+        np.ndarray: The image, thumbnails in row-major order, shape (rows * tileHeight, columns * tileWidth, 3) uint8.
+    """
+    table = np.empty((256, 3), dtype=np.uint8)
+    table[:] = colors["active"]
+    table[ord("#")] = colors["wall"]
+    table[ord(".")] = colors["path"]
+    table[list(b"*sx")] = colors["route"]
+    table[ord(":")] = colors["observing"]
+    table[list(b"Qq")] = colors["queued"]
+    table[list(b"SX")] = colors["text"]
+
+    count, height, width = frames.shape
+    image = table[frames]
+
+    # Empty cells closed on every side haven't been visited yet
+    wall = frames == ord("#")
+    closed = wall[:, 1::2, 0:-1:2] & wall[:, 1::2, 2::2] & wall[:, 0:-1:2, 1::2] & wall[:, 2::2, 1::2]
+    image[:, 1::2, 1::2][closed & (frames[:, 1::2, 1::2] == ord(" "))] = colors["inactive"]
+
+    image = np.repeat(np.repeat(image, scale, axis=1), scale, axis=2)
+
+    # Pad every thumbnail into a tile and lay the tiles out in a grid
+    rows = -(-count // columns)
+    image = np.pad(image, ((0, rows * columns - count), (margin + labelHeight, margin), (margin, margin), (0, 0)))
+    tileHeight, tileWidth = image.shape[1:3]
+    image = image.reshape(rows, columns, tileHeight, tileWidth, 3).transpose(0, 2, 1, 3, 4)
+    return np.ascontiguousarray(image.reshape(rows * tileHeight, columns * tileWidth, 3))
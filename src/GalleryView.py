@@ -0,0 +1,356 @@
+"""The view for watching every generator build the same maze.
+
+This file utilizes the layout of a ui file, and adds the control
+logic to it.
+"""
+from PyQt6.QtWidgets import QWidget, QMessageBox
+from PyQt6 import uic
+from PyQt6.QtCore import QTimerEvent, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap, QPainter, QColor
+from concurrent.futures import ProcessPoolExecutor, Future
+from GrowingTreeDialog import GrowingTreeMethods, methodToString
+from BinaryTreeDialog import BinaryTreeBiases, biasToString
+from SpeedDialog import MAX_SPEED, FRAME_INTERVAL
+from MazeCache import MazeCache
+from MazeFile import MazeFile
+from StepStore import StepStore
+from CellPalette import CellPalette
+from FrameRenderer import paletteColors, renderThumbnails
+import numpy as np
+import multiprocessing
+import subprocess
+import random
+import math
+import os
+
+GENERATORS = [
+    ("Kruskal", ["kruskal"]),
+    ("Prim", ["prim"]),
+    ("Backtracking", ["back"]),
+    ("Aldous-Broder", ["aldous-broder"]),
+    ("Growing-Tree", ["growing-tree", methodToString(GrowingTreeMethods.NEWEST, None)]),
+    ("Hunt-and-Kill", ["hunt-and-kill"]),
+    ("Wilson", ["wilson"]),
+    ("Eller", ["eller"]),
+    ("Division", ["divide"]),
+    ("Sidewinder", ["sidewinder"]),
+    ("Binary-Tree", ["binary-tree", biasToString(BinaryTreeBiases.SOUTH_WEST)]),
+]
+LABEL_HEIGHT = 16
+MARGIN = 4
+
+
+def runGenerator(
+    genBin: str, generator: list[str], width: int, height: int, seed: int, stepsFile: str
+) -> str:
+    """Runs a generator binary.
+
+    Note:
+        The generator runs in a worker process. Its steps stay in stepsFile,
+        only the final maze is pickled back to the view.
+
+    Args:
+        genBin (str): The binary for generating mazes.
+        generator (list[str]): The generator and its options.
+        width (int): The width of the maze.
+        height (int): The height of the maze.
+        seed (int): The seed of the run.
+        stepsFile (str): The file for storing the generator's steps.
+
+    Raises:
+        subprocess.CalledProcessError: If the generator failed.
+
+    Returns:
+        str: The generated maze.
+    """
+    cmd = [genBin, "-q", "-v", stepsFile, "-s", str(seed), "-a", *generator, str(width), str(height)]
+    process = subprocess.run(cmd, stdout=subprocess.PIPE)
+    process.check_returncode()
+    return "\n".join(
+        [line.strip("\r") for line in process.stdout.decode("ASCII").split("\n")]
+    ).strip("\n")
+
+
+class GalleryView(QWidget):
+    """The view for playing every generator in lockstep on the same seed.
+
+    Note:
+        All mazes are drawn into a single image per frame by
+        FrameRenderer.renderThumbnails instead of a scene per maze.
+
+    Args:
+        *args (list): List of arguments to pass to QWidget.
+        **kwargs (dict): Dictionary of key-word arguments to pass to QWidget.
+
+    Attributes:
+        step (int): The current step of the shared playback clock.
+        speed (int): The speed to run through the steps in steps/s.
+        genBin (str): The binary for generating mazes.
+        cache (MazeCache): The cache of generated mazes.
+        cellPalette (CellPalette): The colors of the thumbnails.
+        width (int): The width of the mazes.
+        height (int): The height of the mazes.
+        seed (int | None): The seed shared by every generator, or None for a random one.
+        runSeed (int | None): The seed of the current gallery.
+        steps (list[StepStore]): The steps of each generator, in GENERATORS order.
+
+    Signals:
+        generatorFinished (int, int, str, Future): Emitted from the pool's thread when
+            a generator of a gallery is done, delivered to the GUI thread.
+    """
+
+    generatorFinished = pyqtSignal(int, int, str, Future)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        uic.loadUi("ui/GalleryView.ui", self)
+
+        self.step = 0
+        self.speed = 50
+        self.genBin = ""
+        self.cache = MazeCache()
+        self.cellPalette = CellPalette()
+        self.width = 10
+        self.height = 10
+        self.seed = None
+        self.runSeed = None
+        self.steps = []
+        self._frames = None
+        self._timerId = None
+        self._stride = 1
+        self._pool = None
+        self._gallery = 0
+        self._keys = []
+        self._pending = set()
+
+        self.generateButton.clicked.connect(self.generate)
+        self.generatorFinished.connect(self.finishGenerator)
+        self.runButton.clicked.connect(self.run)
+
+    def setMaze(self, width: int, height: int, seed: int = None):
+        """Sets the size and seed of the gallery.
+
+        Args:
+            width (int): The width of the mazes.
+            height (int): The height of the mazes.
+            seed (int): The seed shared by every generator. Defaults to None (random).
+        """
+        if (width, height, seed) == (self.width, self.height, self.seed):
+            return
+
+        self.stop()
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.clear()
+
+    def clear(self):
+        """Removes the current gallery.
+
+        Note:
+            Generators still running are abandoned, their results are dropped.
+        """
+        self._gallery += 1
+        self._pending = set()
+        self.steps = []
+        self._frames = None
+        self.seedLabel.clear()
+        self.generateButton.setEnabled(True)
+        self.runButton.setEnabled(False)
+        self.canvasLabel.clear()
+
+    def generate(self):
+        """Generates the maze of every generator concurrently.
+
+        Note:
+            Cached mazes are reused, the rest run in a process pool without
+            blocking the view. The gallery is shown once every generator is done.
+        """
+        self.stop()
+        self.clear()
+        self.runSeed = self.seed if self.seed is not None else random.randrange(2**31)
+
+        self._keys = [self.cache.key(generator, self.width, self.height, self.runSeed) for _, generator in GENERATORS]
+        self.steps = [None] * len(GENERATORS)
+        for i, key in enumerate(self._keys):
+            cached = self.cache.load(key)
+            if cached is not None:
+                self.steps[i] = StepStore.fromSteps(cached[1])
+            else:
+                self._pending.add(i)
+
+        if self._pending == set():
+            self.showGallery()
+            return
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context("forkserver"))
+
+        self.generateButton.setEnabled(False)
+        gallery = self._gallery
+        for i in sorted(self._pending):
+            # Abandoned generators may still be writing, so every gallery gets its own files
+            stepsFile = f"gallery.{gallery}.{i}.steps"
+            future = self._pool.submit(
+                runGenerator, self.genBin, GENERATORS[i][1], self.width, self.height, self.runSeed, stepsFile
+            )
+            future.add_done_callback(
+                lambda future, i=i, stepsFile=stepsFile: self.generatorFinished.emit(gallery, i, stepsFile, future)
+            )
+
+    def finishGenerator(self, gallery: int, index: int, stepsFile: str, future: Future):
+        """Loads the steps of a finished generator.
+
+        Note:
+            The steps file is removed once its steps are loaded and cached.
+
+        Args:
+            gallery (int): The gallery the generator belongs to.
+            index (int): The index of the generator in GENERATORS.
+            stepsFile (str): The file holding the generator's steps.
+            future (Future): The generator's run, holding the generated maze.
+        """
+        try:
+            if gallery != self._gallery:
+                return
+
+            try:
+                maze = future.result()
+                with MazeFile(stepsFile) as steps:
+                    self.steps[index] = StepStore.fromArrays(steps)
+            except Exception as error:
+                # Generators that succeeded are cached, the failed one isn't
+                self.clear()
+                QMessageBox.warning(self, "Gallery", f"The {GENERATORS[index][0]} generator failed:\n{error}")
+                return
+
+            self.cache.store(self._keys[index], maze, stepsFile)
+
+            self._pending.discard(index)
+            if self._pending == set():
+                self.showGallery()
+        finally:
+            if os.path.exists(stepsFile):
+                os.remove(stepsFile)
+
+    def showGallery(self):
+        """Shows every generator's finished maze."""
+        # Every thumbnail starts from the finished maze
+        for steps in self.steps:
+            steps.seek(len(steps) - 1)
+        self._frames = np.stack([steps.state for steps in self.steps])
+        self.step = max(len(steps) for steps in self.steps) - 1
+
+        self.seedLabel.setText(f"Seed: {self.runSeed}")
+        self.generateButton.setEnabled(True)
+        self.runButton.setEnabled(True)
+        self.render()
+
+    def run(self):
+        """Plays every generator's steps in lockstep from the start."""
+        self.stop()
+        self.step = 0
+
+        # The waiting time is based on milliseconds.
+        # 1000 ms / s => 1000 * 1/speed
+        # Faster speeds skip steps between frames instead
+        waitTime = max(FRAME_INTERVAL, int(1000 * 1 / self.speed))
+        if self.speed >= MAX_SPEED:
+            self._stride = max([len(steps) for steps in self.steps], default=1)
+        else:
+            self._stride = max(1, round(self.speed * waitTime / 1000))
+
+        self.seekAll(0)
+        self.render()
+
+        self.generateButton.setEnabled(False)
+        self.runButton.setEnabled(False)
+        self._timerId = self.startTimer(waitTime)
+
+    def stop(self):
+        """Stops the playback clock."""
+        if self._timerId is not None:
+            self.killTimer(self._timerId)
+            self._timerId = None
+
+        self.generateButton.setEnabled(self._pending == set())
+        self.runButton.setEnabled(self._frames is not None)
+
+    def seekAll(self, step: int):
+        """Moves every generator to a step of the shared clock.
+
+        Note:
+            Generators that already finished stay on their last step.
+
+        Args:
+            step (int): The step to show.
+        """
+        for i, steps in enumerate(self.steps):
+            steps.seek(min(step, len(steps) - 1))
+            self._frames[i] = steps.state
+
+    def timerEvent(self, e: QTimerEvent):
+        """Override of the timerEvent method
+
+        Note:
+            Advances the shared playback clock for every generator.
+
+        Args:
+            e (QTimerEvent): The timer event.
+        """
+        super().timerEvent(e)
+
+        self.step += self._stride
+        self.seekAll(self.step)
+        self.render()
+
+        if self.step >= max(len(steps) for steps in self.steps) - 1:
+            self.stop()
+
+    def render(self):
+        """Draws every thumbnail into the canvas."""
+        if self._frames is None:
+            return
+
+        count, rows, columns = self._frames.shape
+
+        # Pick the grid with the largest thumbnails that fits the canvas
+        best = (0, math.ceil(math.sqrt(count)))
+        for gridColumns in range(1, count + 1):
+            gridRows = math.ceil(count / gridColumns)
+            tileWidth = (self.canvasLabel.width() // gridColumns - 2 * MARGIN) // columns
+            tileHeight = ((self.canvasLabel.height() // gridRows) - 2 * MARGIN - LABEL_HEIGHT) // rows
+            if min(tileWidth, tileHeight) > best[0]:
+                best = (min(tileWidth, tileHeight), gridColumns)
+        scale, gridColumns = max(1, best[0]), best[1]
+
+        pixels = renderThumbnails(
+            self._frames, paletteColors(self.cellPalette), scale, gridColumns, MARGIN, LABEL_HEIGHT
+        )
+        height, width, _ = pixels.shape
+        image = QImage(pixels.data, width, height, 3 * width, QImage.Format.Format_RGB888).copy()
+
+        # Name every thumbnail above its maze
+        tileWidth, tileHeight = width // gridColumns, height // math.ceil(count / gridColumns)
+        painter = QPainter(image)
+        painter.setPen(QColor(255, 255, 255))
+        for i, (name, _) in enumerate(GENERATORS[:count]):
+            x = (i % gridColumns) * tileWidth + MARGIN
+            y = (i // gridColumns) * tileHeight
+            painter.drawText(x, y, tileWidth - 2 * MARGIN, LABEL_HEIGHT, Qt.AlignmentFlag.AlignLeft, name)
+        painter.end()
+
+        self.canvasLabel.setPixmap(QPixmap.fromImage(image))
+
+    def refresh(self):
+        """Redraws the thumbnails, e.g. after a color change."""
+        self.render()
+
+    def resizeEvent(self, e):
+        """Override of the resizeEvent method.
+
+        Fits the thumbnails to the new size.
+        """
+        super().resizeEvent(e)
+
+        self.render()
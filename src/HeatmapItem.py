@@ -0,0 +1,106 @@
+"""The heatmap layer drawn over the maze.
+
+The whole maze is colored from a single image with one pixel per cell,
+instead of changing the brush of every Cell.
+"""
+from PyQt6.QtWidgets import QGraphicsPixmapItem, QWidget, QStyleOptionGraphicsItem
+from PyQt6.QtGui import QImage, QPixmap, QPainter, QTransform
+import numpy as np
+
+# Anchor colors of the colormap, from near to far
+ANCHORS = np.array(
+    [
+        (68, 1, 84),
+        (59, 82, 139),
+        (33, 145, 140),
+        (94, 201, 98),
+        (253, 231, 37),
+    ],
+    dtype=np.float64,
+)
+
+
+def colormapTable(anchors: np.ndarray = ANCHORS) -> np.ndarray:
+    """Builds a 256 entry lookup table by interpolating anchor colors.
+
+    Args:
+        anchors (np.ndarray): The anchor colors as (N, 3) RGB values.
+
+    Returns:
+        np.ndarray: The lookup table as (256, 4) RGBA uint8.
+    """
+    positions = np.linspace(0, 255, len(anchors))
+    table = np.empty((256, 4), dtype=np.uint8)
+    for channel in range(3):
+        table[:, channel] = np.interp(np.arange(256), positions, anchors[:, channel])
+    table[:, 3] = 255
+    return table
+
+
+class HeatmapItem(QGraphicsPixmapItem):
+    """An image layer coloring every cell by a value.
+
+    Note:
+        The layer is multiplied onto the cells, so white cells take the
+        heatmap color while the black walls stay black.
+
+    Args:
+        *args (list): The list of arguments to pass to the parent class.
+        **kwargs (dict): Dictionary of key-word arguments to pass to the parent class.
+
+    Attributes:
+        table (np.ndarray): The colormap lookup table, (256, 4) RGBA uint8.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.table = colormapTable()
+
+    def setValues(self, values: np.ndarray):
+        """Colors the cells by their values.
+
+        Args:
+            values (np.ndarray): The value of each cell, shape (H, W). Negative
+                values mark cells that are left uncolored.
+        """
+        height, width = values.shape
+        valid = values >= 0
+        top = values.max() if valid.any() else 0
+
+        if top > 0:
+            indices = (values.clip(0) * (255 / top)).astype(np.uint8)
+        else:
+            indices = np.zeros(values.shape, dtype=np.uint8)
+
+        rgba = self.table[indices]
+        rgba[~valid] = 255
+
+        image = QImage(rgba.data, width, height, 4 * width, QImage.Format.Format_RGBA8888)
+        self.setPixmap(QPixmap.fromImage(image))
+
+    def setCellSize(self, cellWidth: float, cellHeight: float):
+        """Scales the layer so each pixel covers one cell.
+
+        Args:
+            cellWidth (float): The width of a cell in the scene.
+            cellHeight (float): The height of a cell in the scene.
+        """
+        self.setTransform(QTransform.fromScale(cellWidth, cellHeight))
+
+    def paint(
+        self,
+        painter: QPainter,
+        option: QStyleOptionGraphicsItem,
+        widget: QWidget = None,
+    ):
+        """Override of the paint method.
+
+        Multiplies the layer onto the cells underneath it.
+
+        Args:
+            painter (QPainter): The painter.
+            option (QStyleOptionGraphicsItem): The style options.
+            widget (QWidget): The widget.
+        """
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Multiply)
+        super().paint(painter, option, widget)
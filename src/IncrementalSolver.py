@@ -0,0 +1,183 @@
+"""An incremental solver for edited mazes.
+
+Implements Lifelong Planning A* (LPA*), which keeps the search state between
+queries so that toggling a wall only re-examines the cells whose distance
+from the start actually changed.
+"""
+
+import heapq
+import math
+from MazeGrid import LEFT, RIGHT, TOP, BOTTOM, OPPOSITE, neighbor
+
+
+class IncrementalSolver:
+    """Lifelong Planning A* over the wall bitmasks of a maze.
+
+    Args:
+        width (int): The width of the maze.
+        height (int): The height of the maze.
+        walls (list[int]): The wall bitmask of each cell.
+        start (int): The index of the start cell.
+        goal (int): The index of the exit cell.
+
+    Attributes:
+        width (int): The width of the maze.
+        height (int): The height of the maze.
+        walls (list[int]): The wall bitmask of each cell.
+        start (int): The index of the start cell.
+        goal (int): The index of the exit cell.
+        g (list[float]): The settled distance of each cell from the start.
+        rhs (list[float]): The one-step lookahead distance of each cell.
+    """
+
+    def __init__(self, width: int, height: int, walls: list[int], start: int, goal: int):
+        self.width = width
+        self.height = height
+        self.walls = list(walls)
+        self.start = start
+        self.goal = goal
+
+        size = width * height
+        self.g = [math.inf] * size
+        self.rhs = [math.inf] * size
+        self._heap = []
+        self._queued = {}
+
+        self.rhs[start] = 0
+        self._push(start)
+
+    def heuristic(self, i: int) -> int:
+        """The manhattan distance from a cell to the exit.
+
+        Args:
+            i (int): The index of the cell.
+
+        Returns:
+            int: The distance to the exit ignoring walls.
+        """
+        x, y = i % self.width, i // self.width
+        gx, gy = self.goal % self.width, self.goal // self.width
+        return abs(x - gx) + abs(y - gy)
+
+    def calculateKey(self, i: int) -> tuple[float, float]:
+        """Calculates the priority of a cell.
+
+        Args:
+            i (int): The index of the cell.
+
+        Returns:
+            tuple[float, float]: The LPA* key of the cell.
+        """
+        best = min(self.g[i], self.rhs[i])
+        return best + self.heuristic(i), best
+
+    def neighbors(self, i: int) -> list[int]:
+        """Gets the cells reachable from a cell in one step.
+
+        Args:
+            i (int): The index of the cell.
+
+        Returns:
+            list[int]: The indices of the open neighbors.
+        """
+        mask = self.walls[i]
+        return [
+            neighbor(i, wall, self.width)
+            for wall in (LEFT, RIGHT, TOP, BOTTOM)
+            if not mask & wall
+        ]
+
+    def updateVertex(self, i: int):
+        """Recomputes the lookahead distance of a cell and requeues it.
+
+        Args:
+            i (int): The index of the cell.
+        """
+        if i != self.start:
+            self.rhs[i] = min(
+                (self.g[j] + 1 for j in self.neighbors(i)), default=math.inf
+            )
+
+        self._queued.pop(i, None)
+        if self.g[i] != self.rhs[i]:
+            self._push(i)
+
+    def computeShortestPath(self):
+        """Settles every cell whose distance affects the route to the exit."""
+        while True:
+            top = self._topKey()
+            if top is None:
+                break
+            if top >= self.calculateKey(self.goal) and self.rhs[self.goal] == self.g[self.goal]:
+                break
+
+            _, i = heapq.heappop(self._heap)
+            del self._queued[i]
+
+            if self.g[i] > self.rhs[i]:
+                self.g[i] = self.rhs[i]
+                for j in self.neighbors(i):
+                    self.updateVertex(j)
+            else:
+                self.g[i] = math.inf
+                self.updateVertex(i)
+                for j in self.neighbors(i):
+                    self.updateVertex(j)
+
+    def setWall(self, i: int, wall: int, closed: bool):
+        """Opens or closes a wall between two cells.
+
+        Note:
+            computeShortestPath has to be called to update the route.
+
+        Args:
+            i (int): The index of the cell.
+            wall (int): The wall bit of the cell.
+            closed (bool): True to close the wall, False to open it.
+        """
+        j = neighbor(i, wall, self.width)
+
+        if closed:
+            self.walls[i] |= wall
+            self.walls[j] |= OPPOSITE[wall]
+        else:
+            self.walls[i] &= ~wall
+            self.walls[j] &= ~OPPOSITE[wall]
+
+        self.updateVertex(i)
+        self.updateVertex(j)
+
+    def route(self) -> list[int]:
+        """Gets the shortest route from the start to the exit.
+
+        Returns:
+            list[int]: The indices of the cells on the route, or an empty list
+                when the exit is unreachable.
+        """
+        if math.isinf(self.g[self.goal]):
+            return []
+
+        route = [self.goal]
+        i = self.goal
+        while i != self.start:
+            i = min(self.neighbors(i), key=lambda j: self.g[j])
+            route.append(i)
+
+        route.reverse()
+        return route
+
+    def _push(self, i: int):
+        """Queues a cell with its current key."""
+        key = self.calculateKey(i)
+        self._queued[i] = key
+        heapq.heappush(self._heap, (key, i))
+
+    def _topKey(self) -> tuple[float, float] | None:
+        """Gets the smallest key in the queue, dropping stale entries."""
+        while self._heap:
+            key, i = self._heap[0]
+            if self._queued.get(i) == key:
+                return key
+            heapq.heappop(self._heap)
+
+        return None
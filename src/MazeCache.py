@@ -0,0 +1,168 @@
+"""The on-disk cache for generated and solved mazes.
+
+Runs of the generator and solver binaries are deterministic for a given set
+of parameters and seed, so their results can be stored and replayed without
+invoking the binaries or re-reading their step files.
+"""
+
+from StepStream import openSteps
+import gzip
+import hashlib
+import os
+
+
+def defaultCacheDir() -> str:
+    """Gets the default directory for the cache.
+
+    Returns:
+        str: $XDG_CACHE_HOME/MazeViewer, or ~/.cache/MazeViewer when unset.
+    """
+    base = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(base, "MazeViewer")
+
+
+class MazeCache:
+    """A persistent cache of maze runs with size-based LRU eviction.
+
+    Each entry is a single gzip file holding the final maze followed by
+    the steps, separated by blank lines like the step files themselves.
+
+    Args:
+        directory (str): The directory for the cache files. Defaults to defaultCacheDir().
+        maxSize (int): The maximum size of the cache in bytes. Defaults to 256 MiB.
+
+    Attributes:
+        directory (str): The directory for the cache files.
+        maxSize (int): The maximum size of the cache in bytes.
+    """
+
+    def __init__(self, directory: str = None, maxSize: int = 256 * 1024 * 1024):
+        self.directory = directory if directory is not None else defaultCacheDir()
+        self.maxSize = maxSize
+
+    def key(self, *parts) -> str:
+        """Builds a cache key from the parameters of a run.
+
+        Args:
+            *parts (list): The parameters identifying the run.
+
+        Returns:
+            str: The key for the run.
+        """
+        return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> str:
+        """Gets the file path of an entry.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            str: The path of the entry.
+        """
+        return os.path.join(self.directory, key + ".gz")
+
+    def load(self, key: str) -> tuple[str, list[str]] | None:
+        """Loads an entry from the cache.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            tuple[str, list[str]] | None: The maze and steps, or None on a miss.
+        """
+        path = self.path(key)
+
+        try:
+            with gzip.open(path, "rt", encoding="ascii") as file:
+                maze, steps = file.read().split("\n\n", 1)
+        except (OSError, EOFError, ValueError):
+            return None
+
+        # Mark the entry as recently used
+        os.utime(path)
+
+        return maze, steps.split("\n\n")
+
+    def loadMaze(self, key: str) -> str | None:
+        """Loads only the maze of an entry, without reading its steps.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            str | None: The maze, or None on a miss.
+        """
+        path = self.path(key)
+
+        try:
+            with gzip.open(path, "rt", encoding="ascii") as file:
+                rows = []
+                for line in file:
+                    if line.strip() == "":
+                        break
+                    rows.append(line.rstrip("\r\n"))
+        except (OSError, EOFError, ValueError):
+            return None
+
+        if rows == []:
+            return None
+
+        # Mark the entry as recently used
+        os.utime(path)
+
+        return "\n".join(rows)
+
+    def store(self, key: str, maze: str, stepsFile: str):
+        """Stores a run in the cache.
+
+        Args:
+            key (str): The key of the entry.
+            maze (str): The final maze.
+            stepsFile (str): The file holding the steps of the run, plain or compressed.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+
+        path = self.path(key)
+        tmpPath = path + ".tmp"
+
+        with openSteps(stepsFile) as src, gzip.open(tmpPath, "wb", compresslevel=6) as dst:
+            dst.write(maze.encode("ascii") + b"\n\n")
+            while chunk := src.read(1 << 20):
+                dst.write(chunk)
+
+        os.replace(tmpPath, path)
+
+        self.evict()
+
+    def evict(self):
+        """Removes the least recently used entries until the cache fits maxSize."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+
+        entries = []
+        total = 0
+        for name in names:
+            if not name.endswith(".gz"):
+                continue
+
+            stat = os.stat(os.path.join(self.directory, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, name in entries:
+            if total <= self.maxSize:
+                break
+
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+
+    def clear(self):
+        """Removes every entry from the cache."""
+        maxSize = self.maxSize
+        self.maxSize = 0
+        self.evict()
+        self.maxSize = maxSize
@@ -0,0 +1,134 @@
+"""The memory-mapped reader for maze and step files.
+
+A maze file holds one snapshot and a step file holds many, separated by
+blank lines. The file is mapped into memory and every snapshot is exposed
+as a NumPy view over the mapping, so no Python strings are created and only
+the pages being read are resident.
+"""
+
+import mmap
+import numpy as np
+
+
+class MazeFile:
+    """Random access to the snapshots of a maze or step file.
+
+    Note:
+        The views share memory with the file, so they must be copied before
+        the file is closed or rewritten.
+
+    Args:
+        fileName (str): The file to map.
+
+    Attributes:
+        fileName (str): The mapped file.
+        offsets (np.ndarray): The byte offset of each snapshot, int64.
+        shape (tuple[int, int]): The shape of a snapshot, (2H+1, 2W+1).
+    """
+
+    def __init__(self, fileName: str):
+        self.fileName = fileName
+        self.offsets = np.zeros(0, dtype=np.int64)
+        self.shape = (0, 0)
+        self._stride = 0
+        self._mmap = None
+
+        with open(fileName, "rb") as file:
+            try:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files can't be mapped
+                return
+
+        self._index()
+
+    def _index(self):
+        """Finds the offset of every snapshot and the shape they share."""
+        data = self._mmap
+        size = len(data)
+
+        # Skip blank lines before the first snapshot
+        start = 0
+        while start < size and data[start] in b"\r\n":
+            start += 1
+
+        end = data.find(b"\n", start)
+        if end == -1:
+            end = size
+        self._stride = end - start + 1
+        columns = end - start
+        if columns > 0 and data[end - 1] == ord("\r"):
+            columns -= 1
+        newline = b"\r\n" if columns < end - start else b"\n"
+        separator = newline * 2
+
+        spans = []
+        while start < size:
+            end = data.find(separator, start)
+            if end == -1:
+                end = size
+            spans.append((start, end))
+            start = end + len(separator)
+
+            # Runs of blank lines are a single separator
+            while start < size and data[start] in b"\r\n":
+                start += 1
+
+        if spans == []:
+            return
+
+        # The last row may or may not end with a newline
+        first, last = spans[0]
+        rows = (last - first + len(newline)) // self._stride
+        length = rows * self._stride - len(newline)
+
+        # Snapshots that don't match the first one can't be viewed, skip them
+        self.offsets = np.array(
+            [start for start, end in spans if end - start in (length, length + len(newline))],
+            dtype=np.int64,
+        )
+        self.shape = (rows, columns)
+
+    @property
+    def stride(self) -> int:
+        """int: The number of bytes per row, newline included."""
+        return self._stride
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        """Gets a view of a snapshot.
+
+        Args:
+            i (int): The index of the snapshot.
+
+        Returns:
+            np.ndarray: The characters of the snapshot, shape (2H+1, 2W+1) uint8.
+        """
+        if not -len(self) <= i < len(self):
+            raise IndexError("snapshot index out of range")
+
+        return np.ndarray(
+            self.shape,
+            dtype=np.uint8,
+            buffer=self._mmap,
+            offset=int(self.offsets[i]),
+            strides=(self._stride, 1),
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def close(self):
+        """Unmaps the file."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "MazeFile":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,191 @@
+"""Helpers for decoding the walls of a maze.
+
+A maze is stored as (2H+1) rows of (2W+1) characters, with cells at odd
+coordinates and walls between them. The walls of each cell are decoded
+into a bitmask so algorithms can work on the maze without the Qt items.
+"""
+
+import numpy as np
+
+LEFT = 1
+RIGHT = 2
+TOP = 4
+BOTTOM = 8
+
+WALLS = {"left": LEFT, "right": RIGHT, "top": TOP, "bottom": BOTTOM}
+OFFSETS = {LEFT: (-1, 0), RIGHT: (1, 0), TOP: (0, -1), BOTTOM: (0, 1)}
+OPPOSITE = {LEFT: RIGHT, RIGHT: LEFT, TOP: BOTTOM, BOTTOM: TOP}
+
+
+def mazeArray(maze: str) -> np.ndarray:
+    """Converts a maze into an array of its characters.
+
+    Args:
+        maze (str): The maze.
+
+    Returns:
+        np.ndarray: The characters of the maze, shape (2H+1, 2W+1) uint8.
+    """
+    rows = [row for row in maze.split("\n") if row != ""]
+    data = np.frombuffer("".join(rows).encode("ascii"), dtype=np.uint8)
+    return data.reshape(len(rows), len(rows[0]))
+
+
+def mazeSize(maze: str) -> tuple[int, int]:
+    """Gets the size of a maze in cells.
+
+    Args:
+        maze (str): The maze.
+
+    Returns:
+        tuple[int, int]: The width and height of the maze.
+    """
+    rows = [row for row in maze.split("\n") if row != ""]
+    return (len(rows[0]) - 1) // 2, (len(rows) - 1) // 2
+
+
+def wallArray(chars: np.ndarray) -> np.ndarray:
+    """Decodes the walls of every cell from the maze characters.
+
+    Args:
+        chars (np.ndarray): The characters of the maze from mazeArray.
+
+    Returns:
+        np.ndarray: The wall bitmask of each cell, shape (H, W) uint8.
+    """
+    wall = chars == ord("#")
+    walls = wall[1::2, 0:-1:2] * np.uint8(LEFT)
+    walls |= wall[1::2, 2::2] * np.uint8(RIGHT)
+    walls |= wall[0:-1:2, 1::2] * np.uint8(TOP)
+    walls |= wall[2::2, 1::2] * np.uint8(BOTTOM)
+    return walls
+
+
+def decodeWalls(maze: str) -> list[int]:
+    """Decodes the walls of every cell.
+
+    Args:
+        maze (str): The maze.
+
+    Returns:
+        list[int]: The wall bitmask of each cell, in row-major order.
+    """
+    return wallArray(mazeArray(maze)).ravel().tolist()
+
+
+def cellEndpoints(chars: np.ndarray) -> tuple[int, int]:
+    """Finds the start and exit cells from the maze characters.
+
+    Args:
+        chars (np.ndarray): The characters of the maze from mazeArray.
+
+    Returns:
+        tuple[int, int]: The indices of the start and exit cells. They default
+            to the first and last cell when the symbols are missing.
+    """
+    cells = chars[1::2, 1::2].ravel()
+    starts = np.flatnonzero((cells == ord("S")) | (cells == ord("s")))
+    goals = np.flatnonzero((cells == ord("X")) | (cells == ord("x")))
+    start = int(starts[0]) if starts.size else 0
+    goal = int(goals[0]) if goals.size else cells.size - 1
+    return start, goal
+
+
+def findEndpoints(maze: str) -> tuple[int, int]:
+    """Finds the start and exit cells of a maze.
+
+    Args:
+        maze (str): The maze.
+
+    Returns:
+        tuple[int, int]: The indices of the start and exit cells. They default
+            to the first and last cell when the symbols are missing.
+    """
+    return cellEndpoints(mazeArray(maze))
+
+
+def degrees(walls: np.ndarray) -> np.ndarray:
+    """Counts the open sides of every cell.
+
+    Args:
+        walls (np.ndarray): The wall bitmasks from wallArray.
+
+    Returns:
+        np.ndarray: The number of open sides of each cell, same shape as walls.
+    """
+    closed = np.zeros(walls.shape, dtype=np.uint8)
+    for wall in (LEFT, RIGHT, TOP, BOTTOM):
+        closed += (walls & wall) != 0
+    return 4 - closed
+
+
+def bfsDistances(walls: np.ndarray, source: int, small: int = 48) -> np.ndarray:
+    """Computes the distance of every cell from a source cell.
+
+    Note:
+        Wide frontiers are expanded a whole level at a time with array
+        operations. Narrow frontiers, common in long winding corridors, are
+        expanded cell by cell since the array call overhead would dominate.
+
+    Args:
+        walls (np.ndarray): The wall bitmasks from wallArray, shape (H, W).
+        source (int): The index of the source cell.
+        small (int): The frontier size below which cells are expanded one by one.
+
+    Returns:
+        np.ndarray: The distance of each cell in row-major order as int32,
+            with -1 for unreachable cells.
+    """
+    width = walls.shape[1]
+    flat = walls.ravel()
+    masks = flat.tobytes()
+    dist = np.full(flat.size, -1, dtype=np.int32)
+    view = memoryview(dist)
+    view[source] = 0
+
+    offsets = [(wall, OFFSETS[wall][1] * width + OFFSETS[wall][0]) for wall in OFFSETS]
+    frontier = [source]
+    level = 0
+
+    while len(frontier):
+        level += 1
+
+        if len(frontier) < small:
+            if isinstance(frontier, np.ndarray):
+                frontier = frontier.tolist()
+
+            reached = []
+            for i in frontier:
+                mask = masks[i]
+                for wall, offset in offsets:
+                    if not mask & wall and view[i + offset] < 0:
+                        view[i + offset] = level
+                        reached.append(i + offset)
+        else:
+            frontier = np.asarray(frontier, dtype=np.int64)
+            frontierMasks = flat[frontier]
+            reached = np.concatenate(
+                [frontier[(frontierMasks & wall) == 0] + offset for wall, offset in offsets]
+            )
+            # Cells reached from several frontier cells are kept once
+            reached = np.unique(reached[dist[reached] < 0])
+            dist[reached] = level
+
+        frontier = reached
+
+    return dist
+
+
+def neighbor(i: int, wall: int, width: int) -> int:
+    """Gets the cell on the other side of a wall.
+
+    Args:
+        i (int): The index of the cell.
+        wall (int): The wall bit.
+        width (int): The width of the maze.
+
+    Returns:
+        int: The index of the neighboring cell.
+    """
+    dx, dy = OFFSETS[wall]
+    return i + dy * width + dx
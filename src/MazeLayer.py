@@ -0,0 +1,107 @@
+"""The layer drawing every cell of the maze.
+
+The cells are not items of the scene. This single item draws all of them
+from a SpriteAtlas with one QPainter::drawPixmapFragments call per paint.
+"""
+from PyQt6.QtWidgets import QGraphicsItem, QWidget, QStyleOptionGraphicsItem
+from PyQt6.QtGui import QPainter
+from PyQt6.QtCore import QPointF, QRectF
+from cells import Cell
+from CellPalette import CellPalette
+from SpriteAtlas import SpriteAtlas, spriteKey, WIDER, TALLER
+import math
+
+
+class MazeLayer(QGraphicsItem):
+    """An item drawing a grid of cells from a sprite atlas.
+
+    Args:
+        cellSize (float): The size of a cell in the scene.
+        cellPalette (CellPalette): The palette the cells are painted with.
+        *args (list): The list of arguments to pass to the parent class.
+        **kwargs (dict): Dictionary of key-word arguments to pass to the parent class.
+
+    Attributes:
+        atlas (SpriteAtlas): The sprites of the cells.
+        cells (list[Cell]): The cells drawn, row by row.
+        columns (int): The number of cells in a row.
+    """
+
+    def __init__(self, cellSize: float, cellPalette: CellPalette = None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cellSize = cellSize
+        self.atlas = SpriteAtlas(cellSize, cellPalette)
+        self.cells: list[Cell] = []
+        self.columns = 1
+
+    def setCells(self, cells: list[Cell], columns: int):
+        """Sets the cells to draw.
+
+        Args:
+            cells (list[Cell]): The cells, row by row.
+            columns (int): The number of cells in a row.
+        """
+        self.prepareGeometryChange()
+        self.cells = cells
+        self.columns = columns
+
+    def boundingRect(self) -> QRectF:
+        """Override of the boundingRect method.
+
+        Returns:
+            QRectF: The cells with room for the walls on the far edges.
+        """
+        rows = -(-len(self.cells) // self.columns)
+        return QRectF(0, 0, self.columns * self.cellSize + 2, rows * self.cellSize + 2)
+
+    def paint(
+        self,
+        painter: QPainter,
+        option: QStyleOptionGraphicsItem,
+        widget: QWidget = None,
+    ):
+        """Override of the paint method.
+
+        Draws every cell with a single batched call.
+
+        Args:
+            painter (QPainter): The painter.
+            option (QStyleOptionGraphicsItem): The style options.
+            widget (QWidget): The widget.
+        """
+        transform = painter.worldTransform()
+        ratio = painter.device().devicePixelRatioF()
+        scale = transform.m11() * ratio
+        if scale <= 0 or self.cells == []:
+            return
+
+        atlas = self.atlas
+        atlas.prepare(scale)
+
+        # Every cell starts on the whole device pixel the scene would have
+        # painted it at and ends where its neighbor starts, so sprites are
+        # copied without resampling and shared walls land on the same pixels
+        dx = transform.dx() * ratio
+        dy = transform.dy() * ratio
+        rows = -(-len(self.cells) // self.columns)
+        xs = [math.floor((x * self.cellSize + 1) * scale + dx) for x in range(self.columns + 1)]
+        ys = [math.floor((y * self.cellSize + 1) * scale + dy) for y in range(rows + 1)]
+        shift = atlas.spriteSize / 2 - atlas.margin
+        fragments = []
+        for i, cell in enumerate(self.cells):
+            x, y = i % self.columns, i // self.columns
+            key = spriteKey(cell)
+            if xs[x + 1] - xs[x] > atlas.cellPixels:
+                key |= WIDER
+            if ys[y + 1] - ys[y] > atlas.cellPixels:
+                key |= TALLER
+            fragments.append(
+                QPainter.PixmapFragment.create(
+                    QPointF((xs[x] + shift - dx) / scale, (ys[y] + shift - dy) / scale),
+                    atlas.sourceRect(key),
+                    1 / scale,
+                    1 / scale,
+                )
+            )
+
+        painter.drawPixmapFragments(fragments, atlas.pixmap)
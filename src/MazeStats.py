@@ -0,0 +1,111 @@
+"""Statistics describing the structure of a maze.
+
+Every statistic is computed from the wall bitmasks with NumPy array
+operations, so the cost stays low even for mazes with millions of cells.
+
+The viewer caps mazes at 30 cells a side, so run as a script to compute the
+statistics of a maze or step file of any size as JSON:
+
+    python MazeStats.py maze.mz
+"""
+
+import numpy as np
+import json
+import sys
+from MazeGrid import RIGHT, BOTTOM, mazeArray, wallArray, cellEndpoints, degrees, bfsDistances
+
+
+def runLengths(openings: np.ndarray) -> np.ndarray:
+    """Measures the runs of consecutive openings along each row.
+
+    Args:
+        openings (np.ndarray): 2D boolean array, True where a passage is open.
+
+    Returns:
+        np.ndarray: The length of every run of True values.
+    """
+    padded = np.zeros((openings.shape[0], openings.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = openings
+    edges = np.diff(padded.ravel())
+    return np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+
+
+def corridorLengths(walls: np.ndarray) -> np.ndarray:
+    """Measures the straight corridors of a maze.
+
+    Args:
+        walls (np.ndarray): The wall bitmasks from wallArray.
+
+    Returns:
+        np.ndarray: The length in cells of every horizontal and vertical corridor.
+    """
+    horizontal = (walls[:, :-1] & RIGHT) == 0
+    vertical = ((walls[:-1, :] & BOTTOM) == 0).T
+    return np.concatenate([runLengths(horizontal), runLengths(vertical)]) + 1
+
+
+def mazeStats(maze: str) -> dict:
+    """Computes the statistics of a maze.
+
+    Args:
+        maze (str): The maze.
+
+    Returns:
+        dict: The statistics, as described in charStats.
+    """
+    return charStats(mazeArray(maze))
+
+
+def charStats(chars: np.ndarray) -> dict:
+    """Computes the statistics of a maze from its characters.
+
+    Note:
+        The river factor is the share of cells that are plain passages
+        (exactly two openings), so winding mazes with few branches score high.
+
+    Args:
+        chars (np.ndarray): The characters of the maze, shape (2H+1, 2W+1) uint8.
+
+    Returns:
+        dict: The statistics, with the keys
+            width, height, deadEnds, junctions, branchingFactor, riverFactor,
+            solutionLength (cells on the route, 0 if unreachable),
+            corridorHistogram (dict of corridor length to count),
+            longestCorridor and maxDistance (the largest BFS distance from the start).
+    """
+    walls = wallArray(chars)
+    height, width = walls.shape
+    start, goal = cellEndpoints(chars)
+
+    degree = degrees(walls)
+    junctions = degree >= 3
+    branchingFactor = float((degree[junctions] - 1).mean()) if junctions.any() else 0.0
+
+    lengths = corridorLengths(walls)
+    counts = np.bincount(lengths) if lengths.size else np.zeros(0, dtype=np.int64)
+    histogram = {int(length): int(counts[length]) for length in np.flatnonzero(counts)}
+
+    distances = bfsDistances(walls, start)
+    goalDistance = int(distances[goal])
+
+    return {
+        "width": width,
+        "height": height,
+        "deadEnds": int((degree == 1).sum()),
+        "junctions": int(junctions.sum()),
+        "branchingFactor": branchingFactor,
+        "riverFactor": float((degree == 2).mean()),
+        "solutionLength": goalDistance + 1 if goalDistance >= 0 else 0,
+        "corridorHistogram": histogram,
+        "longestCorridor": int(lengths.max()) if lengths.size else 0,
+        "maxDistance": int(distances.max()),
+    }
+
+
+if __name__ == "__main__":
+    from MazeFile import MazeFile
+
+    with MazeFile(sys.argv[1]) as maze:
+        # Step files are analyzed at their last step
+        json.dump(charStats(maze[len(maze) - 1]), sys.stdout, indent=2)
+    print()
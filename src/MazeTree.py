@@ -0,0 +1,150 @@
+"""The path queries between any two cells of a maze.
+
+A perfect maze is a spanning tree of its cells, so the path between two
+cells goes up to their lowest common ancestor and back down. The tree is
+rooted once per maze and binary lifting tables find the ancestor of any two
+cells in O(log n). Mazes with loops or closed off cells, such as edited
+ones, are answered with a breadth first search instead.
+"""
+
+import numpy as np
+from MazeGrid import bfsDistances, OFFSETS, RIGHT, BOTTOM
+
+
+class MazeTree:
+    """The shortest paths between the cells of a maze.
+
+    Args:
+        walls (np.ndarray): The wall bitmasks from wallArray, shape (H, W).
+
+    Attributes:
+        walls (np.ndarray): The wall bitmasks of the maze.
+        perfect (bool): True if every cell is reached by exactly one path.
+        depth (np.ndarray): The distance of each cell from the root (cell 0), int32.
+        parent (np.ndarray): The next cell towards the root, the root is its own parent.
+        up (np.ndarray): up[k][i] is the ancestor 2^k levels above cell i,
+            shape (log2(n) + 1, n). Only built for perfect mazes.
+    """
+
+    def __init__(self, walls: np.ndarray):
+        self.walls = walls
+        height, width = walls.shape
+        flat = walls.ravel()
+        count = flat.size
+
+        self.depth = bfsDistances(walls, 0)
+
+        # A tree reaches every cell and has one less passage than cells
+        x = np.arange(count) % width
+        y = np.arange(count) // width
+        passages = np.count_nonzero((flat & RIGHT == 0) & (x < width - 1))
+        passages += np.count_nonzero((flat & BOTTOM == 0) & (y < height - 1))
+        self.perfect = bool((self.depth >= 0).all()) and passages == count - 1
+
+        # Every reached cell's parent is the open neighbor one step closer
+        self.parent = np.arange(count)
+        for wall, (dx, dy) in OFFSETS.items():
+            inside = (0 <= x + dx) & (x + dx < width) & (0 <= y + dy) & (y + dy < height)
+            cells = np.flatnonzero(inside & (flat & wall == 0))
+            other = cells + dy * width + dx
+            closer = (self.depth[other] == self.depth[cells] - 1) & (self.depth[cells] > 0)
+            self.parent[cells[closer]] = other[closer]
+
+        self.up = None
+        if self.perfect:
+            levels = max(1, int(self.depth.max()).bit_length())
+            self.up = np.empty((levels, count), dtype=np.int64)
+            self.up[0] = self.parent
+            for k in range(1, levels):
+                self.up[k] = self.up[k - 1][self.up[k - 1]]
+
+    def ancestor(self, a: int, b: int) -> int:
+        """Finds the lowest common ancestor of two cells.
+
+        Note:
+            Only meaningful for perfect mazes.
+
+        Args:
+            a (int): The index of a cell.
+            b (int): The index of the other cell.
+
+        Returns:
+            int: The index of the deepest cell both paths to the root share.
+        """
+        if self.depth[a] < self.depth[b]:
+            a, b = b, a
+
+        # Lift the deeper cell to the other's depth
+        lift = int(self.depth[a] - self.depth[b])
+        k = 0
+        while lift:
+            if lift & 1:
+                a = int(self.up[k][a])
+            lift >>= 1
+            k += 1
+
+        if a == b:
+            return a
+
+        # Lift both to just below their ancestor
+        for k in range(len(self.up) - 1, -1, -1):
+            if self.up[k][a] != self.up[k][b]:
+                a = int(self.up[k][a])
+                b = int(self.up[k][b])
+
+        return int(self.parent[a])
+
+    def distance(self, a: int, b: int) -> int:
+        """Gets the length of the shortest path between two cells.
+
+        Args:
+            a (int): The index of a cell.
+            b (int): The index of the other cell.
+
+        Returns:
+            int: The number of moves between the cells, or -1 if they aren't connected.
+        """
+        if self.perfect:
+            return int(self.depth[a] + self.depth[b] - 2 * self.depth[self.ancestor(a, b)])
+
+        return int(bfsDistances(self.walls, a)[b])
+
+    def path(self, a: int, b: int) -> list[int]:
+        """Gets the shortest path between two cells.
+
+        Args:
+            a (int): The index of the first cell.
+            b (int): The index of the last cell.
+
+        Returns:
+            list[int]: The cells on the path from a to b, empty if they aren't connected.
+        """
+        if self.perfect:
+            top = self.ancestor(a, b)
+            down = []
+            while b != top:
+                down.append(b)
+                b = int(self.parent[b])
+            up = [a]
+            while a != top:
+                a = int(self.parent[a])
+                up.append(a)
+            return up + down[::-1]
+
+        # Walk back from b towards a through ever closer cells
+        dist = bfsDistances(self.walls, a)
+        if dist[b] < 0:
+            return []
+
+        width = self.walls.shape[1]
+        flat = self.walls.ravel()
+        path = [b]
+        while b != a:
+            for wall, (dx, dy) in OFFSETS.items():
+                other = b + dy * width + dx
+                if not flat[b] & wall and dist[other] == dist[b] - 1:
+                    b = other
+                    break
+            path.append(b)
+
+        return path[::-1]
@@ -3,14 +3,53 @@
 This file utilizes the layout of a ui file, and adds the control
 logic to it.
 """
-from PyQt6.QtWidgets import QWidget
+from PyQt6.QtWidgets import QWidget, QFileDialog, QInputDialog, QProgressDialog, QMessageBox
 from PyQt6 import uic
-from PyQt6.QtCore import QCoreApplication, QTimerEvent, Qt
-from PyQt6.QtGui import QResizeEvent, QKeyEvent
+from PyQt6.QtCore import QElapsedTimer, QTimerEvent, Qt, pyqtSignal
+from PyQt6.QtGui import QKeyEvent, QIntValidator
 from GrowingTreeDialog import GrowingTreeMethods, methodToString
 from BinaryTreeDialog import BinaryTreeBiases, biasToString
+from SpeedDialog import MIN_SPEED, MAX_SPEED, FRAME_INTERVAL, speedToString
+from MazeCache import MazeCache
+from MazeGrid import WALLS, mazeSize, decodeWalls, findEndpoints, wallArray, cellEndpoints
+from IncrementalSolver import IncrementalSolver
+from StepStore import StepStore
+from StepIndex import StepIndex
+from MazeTree import MazeTree
+from Minimap import Minimap
+from PlaybackThread import PlaybackThread
+from MazeFile import MazeFile
+from StepStream import StepStream, StepPipe, detectCompression
+from StepLoader import loadParallel, PARALLEL_MIN_BYTES
+from SessionFile import saveSession, openSession
+from RunLog import logRun
+from FrameRenderer import paletteColors
+from VideoExport import VideoExportThread, FfmpegEncoder, ImageSequenceEncoder
+from PosterExport import exportPoster
+import numpy as np
 import subprocess
+import queue
+import random
+import time
 import os
+from enum import Enum
+
+# The details of a run every session holds
+SESSION_DETAILS = {"maze", "generated", "generator", "width", "height", "seed", "solver", "mazeKey", "step"}
+
+
+class PlaybackState(Enum):
+    """Enumeration for the state of the run operation.
+
+    Attributes:
+        STOPPED = 0
+        PLAYING = 1
+        PAUSED = 2
+    """
+
+    STOPPED = 0
+    PLAYING = 1
+    PAUSED = 2
 
 
 class MazeView(QWidget):
@@ -23,22 +62,43 @@ class MazeView(QWidget):
     Attributes:
         step (int): The current step for the maze view.
         speed (int): The speed to run through the steps in steps/s.
-        steps (list[str]): The list of steps to generate/solve a maze.
+        state (PlaybackState): The state of the run operation.
+        steps (StepStore | None): The steps to generate/solve a maze.
         stepsFile (str): The filename for storing the generated steps.
+        compression (str | None): The compression of stepsFile (gzip, lzma or zstd),
+            or None for plain text.
         mazeFile (str): The filename for storing the generated maze.
         genBin (str): The binary for generating mazes.
         solveBin (str): The binary for solving mazes.
         generator (str): The name of the generator to use (default: kruskal).
+        seed (int | None): The seed for the generator, or None for a random seed.
+        runSeed (int | None): The seed used by the last generation.
+        runGenerator (list[str]): The generator and options of the last generation.
+        runSolver (str | None): The solver of the shown run, or None for a generation.
+        mazeKey (str | None): The cache key of the generated maze, or None once edited.
+        editor (IncrementalSolver | None): The solver keeping the route up to date while editing.
+        mazeTree (MazeTree | None): The path queries of the generated maze while finding paths.
+        cache (MazeCache): The cache of generated and solved mazes.
+        minimap (Minimap): The overview shown while the maze is zoomed in.
+
+    Signals:
+        mazeGenerated (str, dict): Emitted after generation with the maze and
+            the run's details (generator, seed).
     """
 
+    mazeGenerated = pyqtSignal(str, dict)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         uic.loadUi("ui/MazeViewing.ui", self)
+        self.minimap = Minimap(self.mazeViewer)
 
         self.step = -1
+        self.state = PlaybackState.STOPPED
         self.speed = 50
-        self.steps = []
+        self.steps = None
         self.stepsFile = "maze.steps"
+        self.compression = None
         self.mazeFile = "maze.mz"
         self.genBin = os.environ["MAZE_GEN"]
         self.solveBin = os.environ["MAZE_SOLVE"]
@@ -48,21 +108,63 @@ class MazeView(QWidget):
         self.secondMethod = None
         self.split = 0.5
         self.bias = BinaryTreeBiases.SOUTH_WEST
+        self.seed = None
+        self.runSeed = None
+        self.runGenerator = []
+        self.runSolver = None
+        self.cache = MazeCache()
+        self.mazeKey = None
+        self.editor = None
+        self.mazeTree = None
+        self._pathStart = None
+        self._stepIndex = None
+        self._mazeRows = []
+        self._mazeDirty = False
+        self._direction = 1
+        self._synced = False
+        self._exporter = None
+        self._player = None
+        self._timerId = None
+        self._clock = QElapsedTimer()
+        self._stepsDue = 0.0
+        self._rateClock = QElapsedTimer()
+        self._rateSteps = 0
 
         # Connect control buttons for mazeView page
         self.generateButton.clicked.connect(self.generate)
         self.stepBackButton.clicked.connect(self.stepBack)
+        self.rewindButton.clicked.connect(self.rewind)
         self.stepForwardButton.clicked.connect(self.stepForward)
         self.clearButton.clicked.connect(self.clear)
         self.runButton.clicked.connect(self.run)
+        self.stopButton.clicked.connect(self.stop)
         self.solveButton.clicked.connect(self.solve)
+        self.editButton.toggled.connect(self.setEditing)
+        self.heatmapButton.toggled.connect(self.setHeatmap)
+        self.ageButton.toggled.connect(self.setAgeOverlay)
+        self.pathButton.toggled.connect(self.setPathFinding)
+        self.mazeViewer.cellClicked.connect(self.clickCell)
+        self.exportButton.clicked.connect(self.exportVideo)
+        self.posterButton.clicked.connect(self.exportPoster)
+        self.mazeViewer.wallToggled.connect(self.updateRoute)
+        self.seedEdit.setValidator(QIntValidator(0, 2**31 - 1, self))
+        self.seedEdit.textChanged.connect(self.setSeedText)
 
         # Set visibility for buttons
         self.stepBackButton.setVisible(False)
         self.stepForwardButton.setVisible(False)
         self.clearButton.setVisible(False)
         self.runButton.setVisible(False)
+        self.stopButton.setVisible(False)
+        self.rewindButton.setVisible(False)
         self.solveButton.setVisible(False)
+        self.compareButton.setVisible(False)
+        self.editButton.setVisible(False)
+        self.heatmapButton.setVisible(False)
+        self.ageButton.setVisible(False)
+        self.pathButton.setVisible(False)
+        self.exportButton.setVisible(False)
+        self.posterButton.setVisible(False)
 
     @property
     def speed(self):
@@ -71,13 +173,21 @@ class MazeView(QWidget):
 
     @speed.setter
     def speed(self, speed: int):
-        if speed > 100:
-            self._speed = 100
-        elif speed < 1:
-            self._speed = 1
+        if speed > MAX_SPEED:
+            self._speed = MAX_SPEED
+        elif speed < MIN_SPEED:
+            self._speed = MIN_SPEED
         else:
             self._speed = speed
 
+        # A run in progress continues from its position at the new speed
+        if self.state != PlaybackState.STOPPED:
+            paused = self.state == PlaybackState.PAUSED
+            self.stop()
+            self.play(self._direction)
+            if paused:
+                self.pause()
+
     @property
     def generator(self):
         return self._generator
@@ -86,85 +196,63 @@ class MazeView(QWidget):
     def generator(self, generator: str):
         self._generator = generator
 
-    def resizeEvent(self, e: QResizeEvent):
-        """Override of the resizeEvent method
-
-        Note:
-            The override is due to QGraphicsView improper resizing.
-
-        Args:
-            e (QResizeEvent): The resize event.
-        """
-        super().resizeEvent(e)
-
-        # For whatever reason, the QGraphicsView won't
-        # center the box when center layout is selected.
-        # Instead, it centers the left edge. Therefore,
-        # we must manually handle the view's geometry.
-
-        # Gather properties
-        width = e.size().width()
-        height = e.size().height()
-        rect = self.mazeViewer.geometry()
-        y = rect.y()
-        margins = self.verticalLayout.getContentsMargins()
-        sepSpacing = self.verticalLayout.spacing()
-        sceneRect = self.mazeViewer.sceneRect()
-
-        # Determine the length of the sides
-        horSpacing = margins[0] + margins[2]  # left and right margin
-        verSpacing = margins[1] + margins[3]  # top and bottom margin
-        heightBuf = y + 2 * sepSpacing + verSpacing  # total space consumed from height
-        minSz = int(min(width - horSpacing, height - heightBuf))
-
-        # determine X location
-        if width > minSz:
-            x = int(width - minSz) // 2
-        else:
-            x = 0
-
-        # Determine ratio
-        if sceneRect.width() > sceneRect.height():
-            widthScale = 1
-            heightScale = sceneRect.height() / sceneRect.width()
-        else:
-            widthScale = sceneRect.width() / sceneRect.height()
-            heightScale = 1
-
-        # Set properties of the rectangle
-        rect.setX(x)
-        rect.setWidth(int(minSz * widthScale))
-        rect.setHeight(int(minSz * heightScale))
-
-        # Scale the GraphicsView's view
-        self.mazeViewer.setGeometry(rect)
-
     def timerEvent(self, e: QTimerEvent):
         """Override of the timerEvent method
 
         Note:
-            The override is mainly to handle the run operation.
+            The override is mainly to handle the run operation. Every tick
+            applies all the frames due since the last tick and repaints once.
+            The frames are decoded ahead of time by the playback thread.
 
         Args:
             e (QTimerEvent): The timer event.
         """
         super().timerEvent(e)
 
-        self.mazeViewer.drawMaze(self.steps[self.step])
-        self.mazeViewer.refresh()
-
-        if self.step == len(self.steps) - 1:
-            self.killTimer(e.timerId())
-
-            # Enable all controls until the run finishes
-            self.backButton.setEnabled(True)
-            self.generateButton.setEnabled(True)
-            self.clearButton.setEnabled(True)
-            self.stepBackButton.setEnabled(True)
-            self.runButton.setEnabled(True)
-            self.solveButton.setEnabled(True)
+        frames = self._player.frames
+        stride = self._player.stride
+        if self.speed >= MAX_SPEED:
+            due = frames.maxsize
         else:
-            self.step += 1
+            self._stepsDue += self._clock.restart() * self.speed / 1000
+            due = int(self._stepsDue // stride)
+            self._stepsDue -= due * stride
+
+        finished = False
+        shown = self.step
+        for _ in range(due):
+            try:
+                frame = frames.get_nowait()
+            except queue.Empty:
+                # The decoder fell behind, don't catch up in a burst later
+                self._stepsDue = 0.0
+                break
+
+            if frame is None:
+                finished = True
+                break
+
+            self.step, updates = frame
+            self.mazeViewer.applyCellUpdates(updates)
+
+        if self.step != shown:
+            self._rateSteps += abs(self.step - shown)
+            self.mazeViewer.refresh()
+
+        # Measure the achieved speed over windows of half a second
+        if self._rateClock.elapsed() >= 500:
+            self.updateRate()
+
+        if finished or not 0 <= self.step + self._direction < len(self.steps):
+            self.updateRate()
+            self.stop()
+
+    def updateRate(self):
+        """Displays the speed achieved since the last update next to the target."""
+        elapsed = max(1, self._rateClock.restart())
+        rate = round(self._rateSteps * 1000 / elapsed)
+        self.rateLabel.setText(f"{rate} steps/s (target {speedToString(self.speed)})")
+        self._rateSteps = 0
 
     def keyPressEvent(self, e: QKeyEvent):
         """Override for the keyPressEvent.
@@ -179,25 +267,42 @@ class MazeView(QWidget):
 
         kCode = Qt.Key
         match (e.key()):
+            case kCode.Key_Space if self.state == PlaybackState.PLAYING:
+                self.pause()
+
+            case kCode.Key_Space if self.state == PlaybackState.PAUSED:
+                self.resume()
+
+            case kCode.Key_Escape:
+                self.stop()
+
             case kCode.Key_Home:
-                self.step = 0
-                self.mazeViewer.drawMaze(self.steps[self.step])
+                self.stop()
+                self.showStep(0)
                 self.stepBackButton.setEnabled(False)
                 self.stepForwardButton.setEnabled(True)
                 self.refreshMazeView()
 
             case kCode.Key_End:
-                self.step = len(self.steps) - 1
-                self.mazeViewer.drawMaze(self.steps[self.step])
+                self.stop()
+                self.showStep(len(self.steps) - 1)
                 self.stepBackButton.setEnabled(True)
                 self.stepForwardButton.setEnabled(False)
                 self.refreshMazeView()
 
-    def generate(self):
-        """Generates the maze and steps for building the maze.
+    def setSeedText(self, text: str):
+        """Sets the seed from the text of the seed field.
 
-        Note:
-            This function will generate a file names after stepsFile attribute.
+        Args:
+            text (str): The seed, or an empty string for a random seed.
+        """
+        self.seed = int(text) if text != "" else None
+
+    def generatorArgs(self) -> list[str]:
+        """Gets the generator arguments for the current settings.
+
+        Returns:
+            list[str]: The generator and its options.
         """
         generator = [self.generator]
 
@@ -213,25 +318,100 @@ class MazeView(QWidget):
         elif self.generator == "binary-tree":
             generator.append(biasToString(self.bias))
 
-        cmd = [
-            self.genBin,
-            "-q",
-            "-v",
-            self.stepsFile,
-            "-a",
-            *generator,
-            str(self.mazeViewer.width),
-            str(self.mazeViewer.height),
-        ]
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE)
-        process.wait()
-        self.maze = "\n".join(
-            [line.decode("ASCII").strip("\r\n") for line in process.stdout]
-        )
+        return generator
+
+    def generate(self):
+        """Generates the maze and steps for building the maze.
+
+        Note:
+            This function will generate a file names after stepsFile attribute.
+        """
+        self.generateWith(self.generatorArgs())
+
+    def generateWith(self, generator: list[str]):
+        """Generates the maze with a generator at the current size and seed.
+
+        Note:
+            With Result Only checked, the steps aren't captured and the run
+            only holds the finished maze.
+
+        Args:
+            generator (list[str]): The generator and its options.
+        """
+        self.stop()
+        self.editButton.setChecked(False)
+        self.pathButton.setChecked(False)
+        self.heatmapButton.setChecked(False)
+        self.ageButton.setChecked(False)
+
+        # Every run gets a seed so it can be cached and reproduced
+        seed = self.seed if self.seed is not None else random.randrange(2**31)
+
+        width = self.mazeViewer.width
+        height = self.mazeViewer.height
+        key = self.cache.key(generator, width, height, seed)
+
+        args = ["-s", str(seed), "-a", *generator, str(width), str(height)]
+
+        start = time.perf_counter()
+        try:
+            if self.resultOnlyBox.isChecked():
+                # The finished maze of a full run in the cache will do
+                cached = self.cache.loadMaze(key)
+                maze = cached if cached is not None else self.runBinary(self.genBin, args)
+                steps = [maze]
+            else:
+                cached = self.cache.load(key)
+                if cached is not None:
+                    maze, steps = cached
+                else:
+                    with StepPipe(self.stepsFile, self.compression) as stepsPath:
+                        maze = self.runBinary(self.genBin, ["-v", stepsPath, *args])
+                    steps = self.importSteps(self.stepsFile)
+                    self.cache.store(key, maze, self.stepsFile)
+        except subprocess.CalledProcessError as error:
+            # The shown run is kept, a failed run isn't cached
+            QMessageBox.warning(self, "Generate", f"The generator failed:\n{error}")
+            return
+
+        self.maze = maze
+        self.runSeed = seed
+        self.runGenerator = generator
+        self.runSolver = None
+        self.mazeKey = key
+        self.seedEdit.setPlaceholderText(f"Random seed (last: {self.runSeed})")
+
         file = open(self.mazeFile, "w")
         file.write(self.maze)
         file.close()
 
+        self._mazeRows = [bytearray(row, "ascii") for row in self.maze.split("\n")]
+        self._mazeDirty = False
+        self.editor = None
+
+        self.showRunControls()
+
+        # Prep steps and maze
+        self.loadSteps(steps)
+        logRun(
+            generator,
+            width,
+            height,
+            self.runSeed,
+            len(self.steps),
+            time.perf_counter() - start,
+            cached=cached is not None,
+        )
+
+        self.mazeViewer.drawMaze(self.maze)
+        self.refreshMazeView()
+
+        self.mazeGenerated.emit(
+            self.maze, {"generator": " ".join(generator), "seed": self.runSeed}
+        )
+
+    def showRunControls(self):
+        """Shows the controls for a run once there is a maze."""
         # Change button text
         self.generateButton.setText("Re&generate")
 
@@ -239,39 +419,189 @@ class MazeView(QWidget):
         self.stepBackButton.setVisible(True)
         self.stepForwardButton.setVisible(True)
         self.runButton.setVisible(True)
+        self.stopButton.setVisible(True)
+        self.rewindButton.setVisible(True)
         self.solveButton.setVisible(True)
+        self.compareButton.setVisible(True)
+        self.editButton.setVisible(True)
+        self.heatmapButton.setVisible(True)
+        self.ageButton.setVisible(True)
+        self.pathButton.setVisible(True)
+        self.exportButton.setVisible(True)
+        self.posterButton.setVisible(True)
         self.clearButton.setVisible(True)
-        self.stepForwardButton.setEnabled(True)
 
-        # Prep steps and maze
-        self.step = 0
-        self.steps = self.importSteps(self.stepsFile)
+    def saveSession(self, fileName: str):
+        """Saves the shown run, its maze and its parameters.
 
-        self.mazeViewer.drawMaze(self.maze)
+        Args:
+            fileName (str): The session file to write.
+        """
+        self.stop()
+        details = {
+            "maze": self.maze,
+            "generated": "\n".join(row.decode("ascii") for row in self._mazeRows),
+            "generator": self.runGenerator,
+            "width": self.mazeViewer.width,
+            "height": self.mazeViewer.height,
+            "seed": self.runSeed,
+            "solver": self.runSolver,
+            "mazeKey": self.mazeKey,
+            "step": self.step,
+        }
+        saveSession(fileName, self.steps, details)
+
+    def openSession(self, fileName: str):
+        """Opens a saved run at the step it was saved at.
+
+        Note:
+            The steps stay memory-mapped and are paged in as they are shown.
+
+        Args:
+            fileName (str): The session file to open.
+
+        Raises:
+            ValueError: If the file isn't a session file or is damaged.
+            KeyError: If the session lacks a detail of the run.
+            OSError: If the file can't be read.
+        """
+        # The file is checked before anything changes, so a bad one leaves the view as it was
+        steps, details = openSession(fileName)
+        missing = SESSION_DETAILS - details.keys()
+        if missing:
+            raise KeyError(f"{fileName} has no {', '.join(sorted(missing))}")
+
+        self.stop()
+        self.editButton.setChecked(False)
+        self.pathButton.setChecked(False)
+        self.heatmapButton.setChecked(False)
+        self.ageButton.setChecked(False)
+
+        if (details["width"], details["height"]) != (self.mazeViewer.width, self.mazeViewer.height):
+            self.mazeViewer.width = details["width"]
+            self.mazeViewer.height = details["height"]
+            self.mazeViewer.reset()
+
+        self.maze = details["maze"]
+        self.runGenerator = details["generator"]
+        self.runSeed = details["seed"]
+        self.runSolver = details["solver"]
+        self.mazeKey = details["mazeKey"]
+
+        file = open(self.mazeFile, "w")
+        file.write(details["generated"])
+        file.close()
+
+        self._mazeRows = [bytearray(row, "ascii") for row in details["generated"].split("\n")]
+        self._mazeDirty = False
+        self.editor = None
+
+        self.showRunControls()
+
+        self.steps = steps
+        self._stepIndex = None
+        self._synced = False
+        self.showStep(details["step"])
+        self.stepBackButton.setEnabled(self.step > 0)
+        self.stepForwardButton.setEnabled(self.step < len(self.steps) - 1)
         self.refreshMazeView()
 
-    def importSteps(self, fileName: str) -> list[str]:
-        """Imports and parses the steps from fileName.
+        self.mazeGenerated.emit(
+            details["generated"], {"generator": " ".join(self.runGenerator), "seed": self.runSeed}
+        )
+
+    def runBinary(self, binary: str, args: list[str]) -> str:
+        """Runs a generator or solver binary quietly.
+
+        Args:
+            binary (str): The binary to run.
+            args (list[str]): The arguments after -q.
+
+        Raises:
+            subprocess.CalledProcessError: If the binary failed, its output
+                can't be trusted.
+
+        Returns:
+            str: The maze printed by the binary.
+        """
+        process = subprocess.Popen([binary, "-q", *args], stdout=subprocess.PIPE)
+        maze = "\n".join([line.decode("ASCII").strip("\r\n") for line in process.stdout])
+        if process.wait() != 0:
+            raise subprocess.CalledProcessError(process.returncode, binary)
+        return maze
+
+    def importSteps(self, fileName: str) -> MazeFile | StepStream:
+        """Opens the steps from fileName.
+
+        Note:
+            Plain text files are mapped into memory, compressed files are
+            decompressed as they are read.
 
         Args:
             fileName (str): The file to import.
 
         Returns:
-            list[str]: The list of steps, with each step being a string.
+            MazeFile | StepStream: The steps, with each step being a view over the file.
+        """
+        if detectCompression(fileName) is None:
+            return MazeFile(fileName)
+        return StepStream(fileName)
+
+    def loadSteps(self, steps: list[str] | MazeFile | StepStream):
+        """Loads the steps of a run, positioned at its last step.
+
+        Note:
+            A MazeFile or StepStream is closed once its steps are loaded.
+            Large mapped files are decoded in a process pool.
+
+        Args:
+            steps (list[str] | MazeFile | StepStream): The steps, either as strings or read from a file.
+        """
+        if isinstance(steps, MazeFile) and os.path.getsize(steps.fileName) >= PARALLEL_MIN_BYTES:
+            with steps:
+                self.steps = loadParallel(steps)
+        elif isinstance(steps, (MazeFile, StepStream)):
+            with steps:
+                self.steps = StepStore.fromArrays(steps)
+        else:
+            self.steps = StepStore.fromSteps(steps)
+        self.steps.seek(len(self.steps) - 1)
+        self.step = self.steps.step
+        self._stepIndex = None
+
+        # The final maze is drawn instead of the last step
+        self._synced = False
+
+        self.stepBackButton.setEnabled(self.step > 0)
+        self.stepForwardButton.setEnabled(False)
+
+    def showStep(self, step: int):
+        """Moves the maze state to a step.
+
+        Note:
+            Only the cells changed since the shown step are redrawn.
+            MazeViewer::refresh will have to be called in order to update view.
+
+        Args:
+            step (int): The step to show.
         """
-        file = open(fileName, "r")
+        changed = self.steps.seek(step)
+        self.step = self.steps.step
 
-        steps = file.read().split("\n\n")
-        return steps
+        if self._synced:
+            self.mazeViewer.applyChanges(self.steps.state, changed)
+        else:
+            self.mazeViewer.drawChars(self.steps.state)
+            self._synced = True
 
     def stepBack(self):
         """Reverts the maze state to its previous state."""
+        self.stop()
+
         if self.step == len(self.steps) - 1:
             self.stepForwardButton.setEnabled(True)
 
-        self.step -= 1
-
-        self.mazeViewer.drawMaze(self.steps[self.step])
+        self.showStep(self.step - 1)
         self.refreshMazeView()
 
         if self.step == 0:
@@ -279,11 +609,12 @@ class MazeView(QWidget):
 
     def stepForward(self):
         """Progresses the maze state to its next state."""
+        self.stop()
+
         if self.step == 0:
             self.stepBackButton.setEnabled(True)
 
-        self.step += 1
-        self.mazeViewer.drawMaze(self.steps[self.step])
+        self.showStep(self.step + 1)
         self.mazeViewer.refresh()
 
         if self.step == len(self.steps) - 1:
@@ -291,6 +622,12 @@ class MazeView(QWidget):
 
     def clear(self):
         """Clear the maze and revert it to its original state."""
+        self.stop()
+        self.editButton.setChecked(False)
+        self.pathButton.setChecked(False)
+        self.heatmapButton.setChecked(False)
+        self.ageButton.setChecked(False)
+
         # clear the maze
         self.mazeViewer.clearMaze()
         self.generateButton.setText("&Generate")
@@ -300,64 +637,591 @@ class MazeView(QWidget):
         self.stepForwardButton.setVisible(False)
         self.clearButton.setVisible(False)
         self.runButton.setVisible(False)
+        self.stopButton.setVisible(False)
+        self.rewindButton.setVisible(False)
         self.solveButton.setVisible(False)
+        self.compareButton.setVisible(False)
+        self.editButton.setVisible(False)
+        self.heatmapButton.setVisible(False)
+        self.ageButton.setVisible(False)
+        self.pathButton.setVisible(False)
+        self.exportButton.setVisible(False)
+        self.posterButton.setVisible(False)
 
         self.refreshMazeView()
 
     def refreshMazeView(self):
-        """Resizes and redraws the maze view."""
-        # Resize has to be called every time the maze will be redrawn
-        sz = self.geometry().size()
-        e = QResizeEvent(sz, sz)
-        QCoreApplication.postEvent(self, e)
+        """Redraws the maze view.
+
+        Note:
+            Fitting the maze to the window is left to MazeViewer's transform.
+        """
         self.mazeViewer.refresh()
 
     def run(self):
-        """Run through the steps from start to finish.
+        """Run through the steps from the current step to the end.
+
         Note:
-            The buttons will be disabled during the course of the run.
+            Starts over from the first step when already at the end.
+            Pauses the run when it is already playing forwards, and resumes
+            it when paused.
         """
-        self.step = 0
+        self.toggle(1)
 
+    def rewind(self):
+        """Run backwards through the steps from the current step to the start.
+
+        Note:
+            Starts over from the last step when already at the start.
+            Pauses the run when it is already playing backwards, and resumes
+            it when paused.
+        """
+        self.toggle(-1)
+
+    def toggle(self, direction: int):
+        """Starts, pauses or resumes playing in a direction.
+
+        Args:
+            direction (int): 1 to play forwards, -1 to play backwards.
+        """
+        if self._direction == direction and self.state == PlaybackState.PLAYING:
+            self.pause()
+            return
+
+        if self._direction == direction and self.state == PlaybackState.PAUSED:
+            self.resume()
+            return
+
+        self.stop()
+
+        # Start over when there is nothing left to play
+        if direction > 0 and self.step >= len(self.steps) - 1:
+            self.showStep(0)
+            self.mazeViewer.refresh()
+        elif direction < 0 and self.step <= 0:
+            self.showStep(len(self.steps) - 1)
+            self.mazeViewer.refresh()
+
+        self.play(direction)
+
+    def waitTime(self) -> int:
+        """Gets the time between two frames of a run.
+
+        Returns:
+            int: The time in ms.
+        """
         # The waiting time is based on milliseconds.
         # The setting is steps/s, so 1/speed = s/steps
         # 1000 ms / s => 1000 * 1/speed
-        waitTime = int(1000 * 1 / self.speed)
+        # Faster speeds apply several steps per frame instead
+        return max(FRAME_INTERVAL, int(1000 * 1 / self.speed))
 
-        # Disable all controls until the run finishes
-        self.backButton.setEnabled(False)
-        self.generateButton.setEnabled(False)
-        self.clearButton.setEnabled(False)
-        self.stepBackButton.setEnabled(False)
-        self.stepForwardButton.setEnabled(False)
-        self.runButton.setEnabled(False)
-        self.solveButton.setEnabled(False)
+    def play(self, direction: int):
+        """Starts playing the steps from the current step.
 
-        # Start the timer
-        self.startTimer(waitTime)
+        Args:
+            direction (int): 1 to play forwards, -1 to play backwards.
+        """
+        self.stop()
+        self._direction = direction
+
+        if self.speed >= MAX_SPEED:
+            stride = len(self.steps)
+        else:
+            stride = max(1, round(self.speed * self.waitTime() / 1000))
+
+        # Frames are applied incrementally, so the viewer must match the store
+        if not self._synced:
+            self.showStep(self.step)
+
+        self._player = PlaybackThread(self.steps, direction, stride)
+        self._player.start()
+        self._rateSteps = 0
+        self._rateClock.start()
+        self.resume()
+
+    def pause(self):
+        """Pauses the run, keeping the frames decoded so far for resuming."""
+        if self.state != PlaybackState.PLAYING:
+            return
+
+        self.killTimer(self._timerId)
+        self._timerId = None
+        self.setState(PlaybackState.PAUSED)
+
+    def resume(self):
+        """Resumes a paused run at the step it was paused at."""
+        if self._player is None or self.state == PlaybackState.PLAYING:
+            return
+
+        self._stepsDue = 0.0
+        self._clock.start()
+        self._timerId = self.startTimer(self.waitTime())
+        self.setState(PlaybackState.PLAYING)
+
+    def stop(self):
+        """Stops the run at the current step."""
+        if self.state == PlaybackState.STOPPED:
+            return
+
+        if self._timerId is not None:
+            self.killTimer(self._timerId)
+            self._timerId = None
+
+        # The viewer already shows the step, only the store has to catch up
+        self._player.stop()
+        self._player = None
+        self.steps.seek(self.step)
+
+        self.setState(PlaybackState.STOPPED)
+
+    def setState(self, state: PlaybackState):
+        """Sets the state of the run operation and updates the controls.
+
+        Args:
+            state (PlaybackState): The new state.
+        """
+        self.state = state
+        idle = state != PlaybackState.PLAYING
+
+        # Disable the other controls while playing
+        self.backButton.setEnabled(idle)
+        self.generateButton.setEnabled(idle)
+        self.clearButton.setEnabled(idle)
+        self.stepBackButton.setEnabled(idle and self.step > 0)
+        self.stepForwardButton.setEnabled(idle and self.step < len(self.steps) - 1)
+        self.solveButton.setEnabled(idle)
+        self.compareButton.setEnabled(idle)
+        self.editButton.setEnabled(idle)
+        self.exportButton.setEnabled(idle)
+        self.posterButton.setEnabled(idle)
+        self.stopButton.setEnabled(state != PlaybackState.STOPPED)
+
+        labels = {
+            PlaybackState.STOPPED: None,
+            PlaybackState.PLAYING: "Pa&use",
+            PlaybackState.PAUSED: "Resu&me",
+        }
+        label = labels[state]
+        self.runButton.setText(label if label and self._direction > 0 else "&Run")
+        self.rewindButton.setText(label if label and self._direction < 0 else "Re&wind")
+
+    def exportVideo(self):
+        """Exports the steps as a video chosen by the user.
+
+        Note:
+            The video is encoded with ffmpeg when it is installed, otherwise
+            the frames are written as a PNG sequence. The video plays at the
+            run speed, up to about 60 frames per second.
+        """
+        if FfmpegEncoder.available():
+            filters = "Video (*.mp4 *.mkv *.webm);;PNG Sequence (*.png)"
+            default = "maze.mp4"
+        else:
+            filters = "PNG Sequence (*.png)"
+            default = "maze.png"
+
+        fileName, selected = QFileDialog.getSaveFileName(self, "Export Video", default, filters)
+        if fileName == "":
+            return
+
+        self.cancelExport()
+
+        every, ok = QInputDialog.getInt(
+            self, "Export Video", "Render every Nth step:", 1, 1, max(1, len(self.steps))
+        )
+        if not ok:
+            return
+
+        # Aim for frames about 720 pixels across
+        cellSize = max(4, 720 // max(self.mazeViewer.width, self.mazeViewer.height))
+        height, width = self.steps.shape
+
+        if selected.startswith("PNG") or fileName.endswith(".png"):
+            encoder = ImageSequenceEncoder(fileName)
+        else:
+            encoder = FfmpegEncoder(
+                fileName,
+                (width // 2) * cellSize + 1,
+                (height // 2) * cellSize + 1,
+                min(self.speed, 1000 // FRAME_INTERVAL),
+            )
+
+        self._exporter = VideoExportThread(
+            self.steps, encoder, paletteColors(self.mazeViewer.cellPalette), cellSize, every
+        )
+
+        dialog = QProgressDialog("Exporting video...", "Cancel", 0, len(self._exporter.frames), self)
+        dialog.setWindowTitle("Export Video")
+        dialog.setMinimumDuration(0)
+        dialog.canceled.connect(self._exporter.cancel)
+        self._exporter.frameWritten.connect(dialog.setValue)
+        self._exporter.finished.connect(dialog.reset)
+        self._exporter.failed.connect(self.videoExportFailed)
+        self._exporter.start()
+
+    def videoExportFailed(self, error: str):
+        """Tells the user why the video export stopped.
+
+        Args:
+            error (str): The error of the export.
+        """
+        QMessageBox.warning(self, "Export Video", f"The video couldn't be exported:\n{error}")
+
+    def exportPoster(self):
+        """Exports the last step of the run as a poster image chosen by the user.
+
+        Note:
+            The poster is rendered in tiles and streamed to the file, so its
+            size is only limited by the disk. A maze with unsolved wall edits
+            is exported as edited.
+        """
+        fileName, selected = QFileDialog.getSaveFileName(
+            self, "Export Poster", "maze.png", "PNG Image (*.png);;SVG Image (*.svg)"
+        )
+        if fileName == "":
+            return
+
+        extension = ".svg" if selected.startswith("SVG") else ".png"
+        if not fileName.lower().endswith((".png", ".svg")):
+            fileName += extension
+
+        cellSize, ok = QInputDialog.getInt(self, "Export Poster", "Cell size in pixels:", 40, 4, 400)
+        if not ok:
+            return
+
+        if self._mazeDirty:
+            chars = self.mazeChars()
+        else:
+            steps = self.steps.copy()
+            steps.seek(len(steps) - 1)
+            chars = steps.state
+
+        dialog = QProgressDialog("Exporting poster...", "Cancel", 0, chars.shape[0] // 2, self)
+        dialog.setWindowTitle("Export Poster")
+        dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        dialog.setMinimumDuration(500)
+
+        def progress(done: int, total: int) -> bool:
+            dialog.setValue(done)
+            return not dialog.wasCanceled()
+
+        try:
+            exportPoster(chars, fileName, self.mazeViewer.cellPalette, cellSize, progress)
+        except OSError as error:
+            QMessageBox.warning(self, "Export Poster", f"The poster couldn't be exported:\n{error}")
+        finally:
+            dialog.reset()
+
+    def cancelExport(self):
+        """Cancels a running video export and waits until its resources are freed."""
+        if self._exporter is not None:
+            self._exporter.cancel()
+            self._exporter.wait()
+            self._exporter = None
 
     def solve(self):
-        cmd = [
-            self.solveBin,
-            "-q",
-            "-v",
-            self.stepsFile,
-            "-i",
-            self.mazeFile,
-            "-a",
+        """Solves the maze and generates the steps for solving it.
+
+        Note:
+            This function will generate a file names after stepsFile attribute.
+            With Result Only checked, the steps aren't captured and the run
+            only holds the solved maze.
+        """
+        self.stop()
+        self.editButton.setChecked(False)
+        self.pathButton.setChecked(False)
+        self.saveMaze()
+
+        key = self.cache.key(self.mazeKey, self.solver)
+
+        args = ["-i", self.mazeFile, "-a", self.solver]
+
+        start = time.perf_counter()
+        try:
+            if self.resultOnlyBox.isChecked():
+                # The solved maze of a full run in the cache will do
+                cached = self.cache.loadMaze(key) if self.mazeKey is not None else None
+                maze = cached if cached is not None else self.runBinary(self.solveBin, args)
+                steps = [maze]
+            else:
+                cached = self.cache.load(key) if self.mazeKey is not None else None
+                if cached is not None:
+                    maze, steps = cached
+                else:
+                    with StepPipe(self.stepsFile, self.compression) as stepsPath:
+                        maze = self.runBinary(self.solveBin, ["-v", stepsPath, *args])
+                    steps = self.importSteps(self.stepsFile)
+                    if self.mazeKey is not None:
+                        self.cache.store(key, maze, self.stepsFile)
+        except subprocess.CalledProcessError as error:
+            # The shown run is kept, a failed run isn't cached
+            QMessageBox.warning(self, "Solve", f"The solver failed:\n{error}")
+            return
+
+        self.maze = maze
+        self.loadSteps(steps)
+        self.runSolver = self.solver
+
+        # The overlay follows the new run
+        if self.ageButton.isChecked():
+            self.setAgeOverlay(True)
+
+        # An edited maze can't be reproduced from its seed
+        seed = self.runSeed if self.mazeKey is not None else None
+        logRun(
+            self.runGenerator,
+            self.mazeViewer.width,
+            self.mazeViewer.height,
+            seed,
+            len(self.steps),
+            time.perf_counter() - start,
             self.solver,
-        ]
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE)
-        process.wait()
-        self.maze = "\n".join(
-            [line.decode("ASCII").strip("\r\n") for line in process.stdout]
+            cached is not None,
         )
 
-        self.step = 0
-        self.steps = self.importSteps(self.stepsFile)
+        self.mazeViewer.drawMaze(self.maze)
+        self.refreshMazeView()
 
-        self.stepForwardButton.setEnabled(True)
-        self.stepBackButton.setEnabled(False)
+    def replay(self, run: dict):
+        """Reproduces a logged run.
 
-        self.mazeViewer.drawMaze(self.maze)
+        Note:
+            The seed field is set to the run's seed, and the run is solved
+            again if it was a solver run.
+
+        Args:
+            run (dict): The run from RunLog.loadRuns.
+        """
+        self.stop()
+        if (run["width"], run["height"]) != (self.mazeViewer.width, self.mazeViewer.height):
+            self.mazeViewer.width = run["width"]
+            self.mazeViewer.height = run["height"]
+            self.mazeViewer.reset()
+
+        self.seedEdit.setText(str(run["seed"]))
+        self.generateWith(run["generator"])
+
+        if run["solver"] is not None:
+            self.solver = run["solver"]
+            self.solve()
+
+    def saveMaze(self):
+        """Writes the edited maze to mazeFile if it changed since the last write."""
+        if not self._mazeDirty:
+            return
+
+        file = open(self.mazeFile, "w")
+        file.write("\n".join(row.decode("ascii") for row in self._mazeRows))
+        file.close()
+        self._mazeDirty = False
+
+    def setEditing(self, editing: bool):
+        """Enters or leaves wall editing mode.
+
+        Note:
+            While editing, the generated maze is shown with the shortest route,
+            which is updated incrementally as walls are toggled.
+
+        Args:
+            editing (bool): True to start editing.
+        """
+        self.stop()
+        if editing:
+            self.pathButton.setChecked(False)
+        self.mazeViewer.editable = editing
+        self.runButton.setEnabled(not editing)
+        self.rewindButton.setEnabled(not editing)
+        self.stepBackButton.setEnabled(not editing and self.step > 0)
+        self.stepForwardButton.setEnabled(not editing and self.step < len(self.steps) - 1)
+
+        if not editing:
+            self.mazeViewer.drawChars(self.steps.state)
+            self._synced = True
+            self.refreshMazeView()
+            return
+
+        maze = "\n".join(row.decode("ascii") for row in self._mazeRows)
+        if self.editor is None:
+            width, height = mazeSize(maze)
+            start, goal = findEndpoints(maze)
+            self.editor = IncrementalSolver(width, height, decodeWalls(maze), start, goal)
+            self.editor.computeShortestPath()
+
+        self.mazeViewer.drawMaze(maze)
+        self.mazeViewer.drawRoute(self.editor.route())
+        self.refreshMazeView()
+
+    def updateRoute(self, x: int, y: int, side: str, closed: bool):
+        """Applies a wall toggle to the maze and re-solves incrementally.
+
+        Args:
+            x (int): The x coordinate of the cell.
+            y (int): The y coordinate of the cell.
+            side (str): The side of the wall (left, right, top, bottom).
+            closed (bool): True if the wall is now closed.
+        """
+        wall = WALLS[side]
+        dx = {"left": -1, "right": 1}.get(side, 0)
+        dy = {"top": -1, "bottom": 1}.get(side, 0)
+        self._mazeRows[2 * y + 1 + dy][2 * x + 1 + dx] = ord("#" if closed else " ")
+
+        # The edited maze no longer matches any cached run
+        self._mazeDirty = True
+        self.mazeKey = None
+
+        self.editor.setWall(y * self.editor.width + x, wall, closed)
+        self.editor.computeShortestPath()
+        self.mazeViewer.drawRoute(self.editor.route())
+
+        if self.heatmapButton.isChecked():
+            self.mazeViewer.updateHeatmap(wallArray(self.mazeChars()))
+
+        self.mazeViewer.refresh()
+
+    def mazeChars(self) -> np.ndarray:
+        """Gets the characters of the generated maze, including edits.
+
+        Returns:
+            np.ndarray: The characters of the maze, shape (2H+1, 2W+1) uint8.
+        """
+        data = np.frombuffer(b"".join(self._mazeRows), dtype=np.uint8)
+        return data.reshape(len(self._mazeRows), -1)
+
+    def setHeatmap(self, shown: bool):
+        """Shows or hides the distance heatmap.
+
+        Note:
+            Distances are measured from the start until a cell is clicked.
+
+        Args:
+            shown (bool): True to show the heatmap.
+        """
+        if shown:
+            self.ageButton.setChecked(False)
+            chars = self.mazeChars()
+            start, _ = cellEndpoints(chars)
+            self.mazeViewer.showHeatmap(wallArray(chars), start)
+        else:
+            self.mazeViewer.hideHeatmap()
+
+        self.mazeViewer.refresh()
+
+    def stepIndex(self) -> StepIndex:
+        """Gets the index of when every cell changed in the shown run.
+
+        Note:
+            The index is built on first use and kept until the steps change.
+
+        Returns:
+            StepIndex: The index of the run's steps.
+        """
+        if self._stepIndex is None:
+            self._stepIndex = StepIndex(self.steps)
+        return self._stepIndex
+
+    def setAgeOverlay(self, shown: bool):
+        """Shows or hides the overlay coloring cells by age.
+
+        Note:
+            Generation runs color cells by when they were carved, solve runs
+            by when they were observed. Clicking a cell jumps to that step.
+
+        Args:
+            shown (bool): True to show the overlay.
+        """
+        if shown:
+            self.heatmapButton.setChecked(False)
+            ages = self.stepIndex().ages(self.runSolver is not None)
+            self.mazeViewer.showAges(ages)
+        elif not self.heatmapButton.isChecked():
+            self.mazeViewer.hideHeatmap()
+
+        self.mazeViewer.refresh()
+
+    def jumpToCell(self, cell: int):
+        """Shows the step a cell's age is measured from.
+
+        Args:
+            cell (int): The index of the cell.
+        """
+        step = int(self.stepIndex().ages(self.runSolver is not None).flat[cell])
+        if step < 0:
+            return
+
+        self.stop()
+        self.showStep(step)
+        self.stepBackButton.setEnabled(self.step > 0)
+        self.stepForwardButton.setEnabled(self.step < len(self.steps) - 1)
+        self.refreshMazeView()
+
+    def clickCell(self, cell: int):
+        """Handles a click on a cell of the maze.
+
+        Args:
+            cell (int): The index of the cell.
+        """
+        if self.pathButton.isChecked():
+            self.pickPathCell(cell)
+        elif self.ageButton.isChecked():
+            self.jumpToCell(cell)
+
+    def setPathFinding(self, finding: bool):
+        """Enters or leaves path finding mode.
+
+        Note:
+            While finding paths, the generated maze is shown and the shortest
+            path between the last two clicked cells is drawn as its route.
+
+        Args:
+            finding (bool): True to start finding paths.
+        """
+        self.stop()
+        if finding:
+            self.editButton.setChecked(False)
+        self.mazeViewer.picking = finding
+        self.runButton.setEnabled(not finding)
+        self.rewindButton.setEnabled(not finding)
+        self.stepBackButton.setEnabled(not finding and self.step > 0)
+        self.stepForwardButton.setEnabled(not finding and self.step < len(self.steps) - 1)
+        self._pathStart = None
+
+        if not finding:
+            self.mazeTree = None
+            self.pathLabel.setText("")
+            self.mazeViewer.drawChars(self.steps.state)
+            self._synced = True
+            self.refreshMazeView()
+            return
+
+        chars = self.mazeChars()
+        self.mazeTree = MazeTree(wallArray(chars))
+        self.pathLabel.setText("Click two cells")
+        self.mazeViewer.drawChars(chars)
+        self.mazeViewer.drawRoute([])
         self.refreshMazeView()
+
+    def pickPathCell(self, cell: int):
+        """Picks an end of the path to find.
+
+        Note:
+            Every second click draws the path from the previous click.
+
+        Args:
+            cell (int): The index of the cell.
+        """
+        width = self.mazeViewer.width
+        if self._pathStart is None:
+            self._pathStart = cell
+            self.mazeViewer.drawRoute([])
+            self.pathLabel.setText(f"From ({cell % width}, {cell // width})")
+        else:
+            path = self.mazeTree.path(self._pathStart, cell)
+            self.mazeViewer.drawRoute(path)
+            if path == []:
+                self.pathLabel.setText("No path")
+            else:
+                self.pathLabel.setText(f"Path length: {len(path) - 1}")
+            self._pathStart = None
+
+        self.mazeViewer.refresh()
@@ -1,9 +1,29 @@
 """The viewer for the maze."""
 
 from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene
-from PyQt6.QtGui import QColor
-from PyQt6.QtCore import QRectF, Qt
+from PyQt6.QtGui import QColor, QMouseEvent, QWheelEvent
+from PyQt6.QtCore import QRectF, Qt, pyqtSignal
 from cells import Cell
+from CellPalette import CellPalette, CellState
+from HeatmapItem import HeatmapItem
+from MazeLayer import MazeLayer
+from SpriteAtlas import spriteKey
+from MazeGrid import bfsDistances, mazeArray, LEFT, RIGHT, TOP, BOTTOM
+from CellUpdates import CellUpdates, affectedCells
+from typing import Iterable
+import numpy as np
+
+WALL = ord("#")
+PATH = ord(".")
+ROUTE = ord("*")
+OBSERVING = ord(":")
+
+# The size of a cell in the scene, the view's transform scales it to fit
+CELL_SIZE = 40
+
+# The zoom factor of one wheel notch and the largest zoom
+ZOOM_STEP = 1.25
+MAX_ZOOM = 8.0
 
 
 class MazeViewer(QGraphicsView):
@@ -16,32 +36,67 @@ class MazeViewer(QGraphicsView):
     Attributes:
         scene (QGraphicsScene): The scene of the view.
         rects (list[Cell]): The list of cells in the maze.
+        layer (MazeLayer): The item drawing the cells.
+        cellPalette (CellPalette): The colors shared by every cell.
         inactiveColor (QColor): The color of an inactive cell.
         activeColor (QColor): The color of an active cell.
+        queuedColor (QColor): The color of a queued cell.
+        observingColor (QColor): The color of an observing cell.
+        pathColor (QColor): The color of a path.
+        routeColor (QColor): The color of a route.
         width (int): The width of the maze.
         height (int): The height of the maze.
+        editable (bool): True when clicking near a wall toggles it.
+        picking (bool): True when clicking a cell emits cellClicked.
+        zoom (float): The magnification over fitting the whole maze, at least 1.
+        heatmap (HeatmapItem): The layer coloring cells by distance.
+        heatmapSource (int): The index of the cell the distances are measured from.
+
+    Signals:
+        wallToggled (int, int, str, bool): Emitted with the cell's x and y, the
+            wall's side (left, right, top, bottom) and whether it is now closed.
+        cellClicked (int): Emitted with the index of a cell clicked while
+            picking or while the age overlay is shown.
+        cellsChanged (CellUpdates): Emitted with the new values of the cells
+            whenever cells are drawn.
+        viewChanged: Emitted when the visible area of the maze changes.
     """
 
+    wallToggled = pyqtSignal(int, int, str, bool)
+    cellClicked = pyqtSignal(int)
+    cellsChanged = pyqtSignal(object)
+    viewChanged = pyqtSignal()
+
     def __init__(self, width: int = 10, height: int = 10, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.scene = QGraphicsScene()
         self.rects: list[Cell] = []
+        self._pool: list[Cell] = []
 
-        self.inactiveColor = QColor(127, 127, 127, 255)
-        self.activeColor = QColor(255, 255, 255, 255)
-        self.pathColor = QColor(63, 162, 242, 255)
-        self.routeColor = QColor(242, 150, 53, 255)
-        self.observingColor = QColor(245, 100, 100, 255)
-        self.queuedColor = QColor(163, 57, 57, 255)
+        self.cellPalette = CellPalette()
         self.width = width
         self.height = height
-        self._sceneWidth = 1000
-        self._sceneHeight = 1000
+        self._routeCells: list[int] = []
+        self.editable = False
+        self.picking = False
+        self.zoom = 1.0
+
+        self.layer = MazeLayer(CELL_SIZE, self.cellPalette)
+        self.scene.addItem(self.layer)
+
+        self.heatmap = HeatmapItem()
+        self.heatmap.setZValue(1)
+        self.heatmap.hide()
+        self.heatmapSource = 0
+        self._heatmapWalls = None
+        self.scene.addItem(self.heatmap)
 
         self.generateMaze()
 
         self.setScene(self.scene)
+        self.horizontalScrollBar().valueChanged.connect(self.viewChanged)
+        self.verticalScrollBar().valueChanged.connect(self.viewChanged)
 
     def resizeEvent(self, e):
         """Override of the resizeEvent method.
@@ -49,7 +104,46 @@ class MazeViewer(QGraphicsView):
         Needed to keep the scene in view.
         """
         super().resizeEvent(e)
-        self.fitInView(self.sceneRect(), Qt.AspectRatioMode.KeepAspectRatioByExpanding)
+        self.fitScene()
+
+    def fitScene(self):
+        """Scales the view so the whole maze fits, keeping its aspect ratio.
+
+        Note:
+            The zoom is applied on top, centered on the view.
+        """
+        self.fitInView(self.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+        self.scale(self.zoom, self.zoom)
+        self.viewChanged.emit()
+
+    def wheelEvent(self, e: QWheelEvent):
+        """Override of the wheelEvent method.
+
+        Zooms in or out around the cursor.
+
+        Args:
+            e (QWheelEvent): The wheel event.
+        """
+        zoom = self.zoom * ZOOM_STEP ** (e.angleDelta().y() / 120)
+        zoom = min(max(zoom, 1.0), MAX_ZOOM)
+        if zoom == self.zoom:
+            return
+
+        factor = zoom / self.zoom
+        self.zoom = zoom
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+        self.scale(factor, factor)
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorViewCenter)
+        self.viewChanged.emit()
+
+    def visibleRect(self) -> QRectF:
+        """Gets the part of the scene in view.
+
+        Returns:
+            QRectF: The visible area, in scene coordinates.
+        """
+        visible = self.mapToScene(self.viewport().rect()).boundingRect()
+        return visible.intersected(self.sceneRect())
 
     @property
     def width(self):
@@ -90,126 +184,110 @@ class MazeViewer(QGraphicsView):
     @property
     def inactiveColor(self):
         """QColor: The color of an inactive cell."""
-        return self._inactiveColor
+        return self.cellPalette["inactive"]
 
     @inactiveColor.setter
     def inactiveColor(self, color: QColor):
-        self._inactiveColor = color
+        self.cellPalette["inactive"] = color
 
     @property
     def activeColor(self):
         """QColor: The color of an active cell."""
-        return self._activeColor
+        return self.cellPalette["active"]
 
     @activeColor.setter
     def activeColor(self, color: QColor):
-        self._activeColor = color
+        self.cellPalette["active"] = color
 
     @property
-    def routeColor(self):
-        """QColor: The color of a route cell."""
-        return self._routeColor
+    def queuedColor(self):
+        """QColor: The color of a queued cell."""
+        return self.cellPalette["queued"]
 
-    @routeColor.setter
-    def routeColor(self, color: QColor):
-        self._routeColor = color
+    @queuedColor.setter
+    def queuedColor(self, color: QColor):
+        self.cellPalette["queued"] = color
+
+    @property
+    def observingColor(self):
+        """QColor: The color of an observing cell."""
+        return self.cellPalette["observing"]
+
+    @observingColor.setter
+    def observingColor(self, color: QColor):
+        self.cellPalette["observing"] = color
+
+    @property
+    def pathColor(self):
+        """QColor: The color of a path."""
+        return self.cellPalette["path"]
+
+    @pathColor.setter
+    def pathColor(self, color: QColor):
+        self.cellPalette["path"] = color
 
     @property
     def routeColor(self):
-        """QColor: The color of a route cell."""
-        return self._routeColor
+        """QColor: The color of a route."""
+        return self.cellPalette["route"]
 
     @routeColor.setter
     def routeColor(self, color: QColor):
-        self._routeColor = color
+        self.cellPalette["route"] = color
 
     def generateMaze(self):
-        """Generates the maze.
+        """Lays the cells out for the current width and height.
 
         Note:
-            Will clear any existing maze before generating.
+            Cells are kept between sizes. Only missing cells are created and
+            extra cells are left out of the layer, so the scene is never
+            rebuilt. The cells keep their contents, call clearMaze or drawMaze
+            afterwards.
             MazeViewer::refresh will have to be called in order to update view.
         """
-        if self.rects != []:
-            for rect in self.rects:
-                self.scene.removeItem(rect)
+        count = self.width * self.height
+        cellRect = QRectF(0, 0, CELL_SIZE, CELL_SIZE)
 
-        self.rects = []
+        while len(self._pool) < count:
+            rect = Cell(cellRect, cellPalette=self.cellPalette)
+            self._pool.append(rect)
 
-        if self.width > self.height:
-            self._sceneWidth = 1000
-            self._sceneHeight = 1000 * self.height / self.width
-        else:
-            self._sceneWidth = 1000 * self.width / self.height
-            self._sceneHeight = 1000
+        for i, rect in enumerate(self._pool[:count]):
+            rect.setPos((i % self.width) * CELL_SIZE + 1, (i // self.width) * CELL_SIZE + 1)
 
-        cellWidth = self._sceneWidth / self.width
-        cellHeight = self._sceneHeight / self.height
-        cellRect = QRectF(0, 0, cellWidth, cellHeight)
+        self.rects = self._pool[:count]
+        self.layer.setCells(self.rects, self.width)
+        self.zoom = 1.0
+        self._routeCells = []
 
-        for y in range(self.height):
-            for x in range(self.width):
-                rect = Cell(cellRect)
-                rect.setPos(x * cellWidth + 1, y * cellHeight + 1)
-                rect.setBrush(self.inactiveColor)
-                self.scene.addItem(rect)
-                self.rects.append(rect)
+        self.hideHeatmap()
+        self.heatmap.setPos(1, 1)
+        self.heatmap.setCellSize(CELL_SIZE, CELL_SIZE)
 
-        self.setSceneRect(0, 0, self._sceneWidth, self._sceneHeight)
+        # Leave room for the walls on the far edges
+        self.setSceneRect(0, 0, self.width * CELL_SIZE + 2, self.height * CELL_SIZE + 2)
+        self.fitScene()
 
     def redrawMaze(self):
         """Redraws the cells in the maze.
 
         Note:
+            Cells look their colors up in cellPalette, so only a repaint is
+            needed. The layer renders its sprites again when the colors change.
             MazeViewer::refresh will have to be called in order to update view.
         """
-        for y in range(self.height):
-            for x in range(self.width):
-                i = y * self.width + x
-
-                color = self.inactiveColor
-
-                rect = self.rects[i]
-
-                # Observing
-                if x > 0:
-                    leftObserve = self.rects[i - 1].observing
-                else:
-                    leftObserve = True
-
-                if leftObserve and x < self.width - 1:
-                    rightObserve = self.rects[i + 1].observing
-                else:
-                    rightObserve = True
-
-                if leftObserve and rightObserve and y > 0:
-                    topObserve = self.rects[i - self.width].observing
-                else:
-                    topObserve = True
-
-                if leftObserve and rightObserve and topObserve and y < self.height - 1:
-                    bottomObserve = self.rects[i + self.width].observing
-                else:
-                    bottomObserve = True
-
-                # If all the neighbors are observers, the current cell is active
-                if leftObserve and rightObserve and topObserve and bottomObserve:
-                    color = self.activeColor
+        self.scene.update()
 
-                if not (rect.left and rect.right and rect.top and rect.bottom):
-                    color = self.activeColor
+    def setCellPalette(self, cellPalette: CellPalette):
+        """Shares a palette with every cell.
 
-                # Queued cells take precedence over active cells
-                if rect.queued:
-                    color = self.queuedColor
-
-                # Observer cells take precedence over active cells and queued cells
-                if rect.observing:
-                    color = self.observingColor
-
-                self.rects[i].setBrush(color)
-                self.rects[i].pathColor = self.pathColor
-                self.rects[i].routeColor = self.routeColor
+        Args:
+            cellPalette (CellPalette): The palette to use.
+        """
+        self.cellPalette = cellPalette
+        for rect in self._pool:
+            rect.cellPalette = cellPalette
+        self.layer.atlas.setCellPalette(cellPalette)
 
     def isRoute(self, c: str) -> bool:
         """Determines if a character is a route.
@@ -231,96 +309,164 @@ class MazeViewer(QGraphicsView):
         Note:
             MazeViewer::refresh will have to be called in order to update view.
         """
-        rows = maze.split("\n")
+        self.drawChars(mazeArray(maze))
 
-        for y in range(self.height):
-            for x in range(self.width):
-                i = y * self.width + x
+    def drawChars(self, chars: np.ndarray, cells: Iterable[int] = None):
+        """Draws the maze from its characters.
 
-                xStr = 2 * x + 1
-                yStr = 2 * y + 1
-
-                color = self.inactiveColor
-
-                rect = self.rects[i]
-
-                # Walls
-                rect.left = rows[yStr][xStr - 1] == "#"
-                rect.right = rows[yStr][xStr + 1] == "#"
-                rect.top = rows[yStr - 1][xStr] == "#"
-                rect.bottom = rows[yStr + 1][xStr] == "#"
-
-                # Paths
-                if rows[yStr][xStr] == "." or self.isRoute(rows[yStr][xStr]):
-                    rect.leftPath = rows[yStr][xStr - 1] == "."
-                    rect.rightPath = rows[yStr][xStr + 1] == "."
-                    rect.topPath = rows[yStr - 1][xStr] == "."
-                    rect.bottomPath = rows[yStr + 1][xStr] == "."
-                else:
-                    rect.leftPath = False
-                    rect.rightPath = False
-                    rect.topPath = False
-                    rect.bottomPath = False
-
-                # Routes
-                if self.isRoute(rows[yStr][xStr]):
-                    rect.leftRoute = rows[yStr][xStr - 1] == "*"
-                    rect.rightRoute = rows[yStr][xStr + 1] == "*"
-                    rect.topRoute = rows[yStr - 1][xStr] == "*"
-                    rect.bottomRoute = rows[yStr + 1][xStr] == "*"
-                else:
-                    rect.leftRoute = False
-                    rect.rightRoute = False
-                    rect.topRoute = False
-                    rect.bottomRoute = False
-
-                # Observing
-                if x > 0:
-                    leftObserve = rows[yStr][xStr - 2] == ":"
-                else:
-                    leftObserve = True
-
-                if leftObserve and x < self.width - 1:
-                    rightObserve = rows[yStr][xStr + 2] == ":"
-                else:
-                    rightObserve = True
-
-                if leftObserve and rightObserve and y > 0:
-                    topObserve = rows[2 * y - 1][xStr] == ":"
-                else:
-                    topObserve = True
-
-                if leftObserve and rightObserve and topObserve and y < self.height - 1:
-                    bottomObserve = rows[2 * y + 3][xStr] == ":"
-                else:
-                    bottomObserve = True
-
-                # If all the neighbors are observers, the current cell is active
-                if leftObserve and rightObserve and topObserve and bottomObserve:
-                    color = self.activeColor
-
-                if not (rect.left and rect.right and rect.top and rect.bottom):
-                    color = self.activeColor
-
-                # Queued cells take precedence over active cells
-                if rows[yStr][xStr] in ['Q', 'q']:
-                    rect.queued = True
-                    color = self.queuedColor
-                else:
-                    rect.observing = False
-
-                # Observer cells take precedence over active cells and queued cells
-                if rows[yStr][xStr] == ":":
-                    rect.observing = True
-                    color = self.observingColor
-                else:
-                    rect.observing = False
-
-                self.rects[i].char = rows[yStr][xStr]
-
-                self.rects[i].setBrush(color)
-                self.rects[i].pathColor = self.pathColor
-                self.rects[i].routeColor = self.routeColor
+        Args:
+            chars (np.ndarray): The characters of the maze, shape (2H+1, 2W+1) uint8.
+            cells (Iterable[int]): The indices of the cells to redraw. Defaults to all.
+
+        Note:
+            MazeViewer::refresh will have to be called in order to update view.
+        """
+        if cells is None:
+            rows = [row.tobytes() for row in chars]
+            cells = range(self.width * self.height)
+            self._routeCells = []
+        else:
+            rows = chars
+            cells = list(cells)
+
+        for i in cells:
+            x = i % self.width
+            y = i // self.width
+
+            xStr = 2 * x + 1
+            yStr = 2 * y + 1
+
+            state = CellState.INACTIVE
+
+            rect = self.rects[i]
+            char = chr(rows[yStr][xStr])
+
+            # Walls
+            rect.left = rows[yStr][xStr - 1] == WALL
+            rect.right = rows[yStr][xStr + 1] == WALL
+            rect.top = rows[yStr - 1][xStr] == WALL
+            rect.bottom = rows[yStr + 1][xStr] == WALL
+
+            # Paths
+            if char == "." or self.isRoute(char):
+                rect.leftPath = rows[yStr][xStr - 1] == PATH
+                rect.rightPath = rows[yStr][xStr + 1] == PATH
+                rect.topPath = rows[yStr - 1][xStr] == PATH
+                rect.bottomPath = rows[yStr + 1][xStr] == PATH
+            else:
+                rect.leftPath = False
+                rect.rightPath = False
+                rect.topPath = False
+                rect.bottomPath = False
+
+            # Routes
+            if self.isRoute(char):
+                rect.leftRoute = rows[yStr][xStr - 1] == ROUTE
+                rect.rightRoute = rows[yStr][xStr + 1] == ROUTE
+                rect.topRoute = rows[yStr - 1][xStr] == ROUTE
+                rect.bottomRoute = rows[yStr + 1][xStr] == ROUTE
+            else:
+                rect.leftRoute = False
+                rect.rightRoute = False
+                rect.topRoute = False
+                rect.bottomRoute = False
+
+            # Observing
+            if x > 0:
+                leftObserve = rows[yStr][xStr - 2] == OBSERVING
+            else:
+                leftObserve = True
+
+            if leftObserve and x < self.width - 1:
+                rightObserve = rows[yStr][xStr + 2] == OBSERVING
+            else:
+                rightObserve = True
+
+            if leftObserve and rightObserve and y > 0:
+                topObserve = rows[2 * y - 1][xStr] == OBSERVING
+            else:
+                topObserve = True
+
+            if leftObserve and rightObserve and topObserve and y < self.height - 1:
+                bottomObserve = rows[2 * y + 3][xStr] == OBSERVING
+            else:
+                bottomObserve = True
+
+            # If all the neighbors are observers, the current cell is active
+            if leftObserve and rightObserve and topObserve and bottomObserve:
+                state = CellState.ACTIVE
+
+            if not (rect.left and rect.right and rect.top and rect.bottom):
+                state = CellState.ACTIVE
+
+            # Queued cells take precedence over active cells
+            if char in ["Q", "q"]:
+                rect.queued = True
+                state = CellState.QUEUED
+            else:
+                rect.queued = False
+
+            # Observer cells take precedence over active cells and queued cells
+            if char == ":":
+                rect.observing = True
+                state = CellState.OBSERVING
+            else:
+                rect.observing = False
+
+            rect.char = char
+            rect.state = state
+
+        self.cellsChanged.emit(CellUpdates.fromChars(chars, np.fromiter(cells, dtype=np.int64)))
+
+    def applyChanges(self, chars: np.ndarray, positions: np.ndarray):
+        """Redraws only the cells affected by changed characters.
+
+        Args:
+            chars (np.ndarray): The characters of the maze, shape (2H+1, 2W+1) uint8.
+            positions (np.ndarray): The flat positions of the changed characters.
+
+        Note:
+            MazeViewer::refresh will have to be called in order to update view.
+        """
+        if positions.size == 0:
+            return
+
+        cells = affectedCells(positions, chars.shape[1], self.width, self.height)
+        self.applyCellUpdates(CellUpdates.fromChars(chars, cells))
+
+    def applyCellUpdates(self, updates: CellUpdates):
+        """Copies decoded values onto their cells.
+
+        Args:
+            updates (CellUpdates): The decoded cells.
+
+        Note:
+            MazeViewer::refresh will have to be called in order to update view.
+        """
+        for i, walls, paths, routes, state, char in zip(*(values.tolist() for values in updates)):
+            rect = self.rects[i]
+
+            rect.left = walls & LEFT != 0
+            rect.right = walls & RIGHT != 0
+            rect.top = walls & TOP != 0
+            rect.bottom = walls & BOTTOM != 0
+
+            rect.leftPath = paths & LEFT != 0
+            rect.rightPath = paths & RIGHT != 0
+            rect.topPath = paths & TOP != 0
+            rect.bottomPath = paths & BOTTOM != 0
+
+            rect.leftRoute = routes & LEFT != 0
+            rect.rightRoute = routes & RIGHT != 0
+            rect.topRoute = routes & TOP != 0
+            rect.bottomRoute = routes & BOTTOM != 0
+
+            rect.queued = state == CellState.QUEUED
+            rect.observing = state == CellState.OBSERVING
+            rect.char = chr(char)
+            rect.state = state
+
+        self.cellsChanged.emit(updates)
 
     def clearMaze(self):
         """Resets the maze to factory default.
@@ -329,6 +475,8 @@ class MazeViewer(QGraphicsView):
             Only restores walls and symbols. It does not revert to original size.
             MazeViewer::refresh will have to be called in order to update view.
         """
+        self._routeCells = []
+
         for y in range(self.height):
             for x in range(self.width):
                 i = y * self.width + x
@@ -352,21 +500,208 @@ class MazeViewer(QGraphicsView):
 
                 self.rects[i].char = " "
 
-                self.rects[i].setBrush(self.inactiveColor)
-                self.rects[i].pathColor = self.pathColor
-                self.rects[i].routeColor = self.routeColor
+                self.rects[i].queued = False
+                self.rects[i].state = CellState.INACTIVE
+
+        self.cellsChanged.emit(self.cellUpdates(range(len(self.rects))))
+
+    def mousePressEvent(self, e: QMouseEvent):
+        """Override of the mousePressEvent method.
+
+        Toggles the wall nearest to the click when the maze is editable.
+
+        Args:
+            e (QMouseEvent): The mouse event.
+        """
+        editing = self.editable or self.picking or self.heatmap.isVisible()
+        if not editing or e.button() != Qt.MouseButton.LeftButton:
+            super().mousePressEvent(e)
+            return
+
+        pos = self.mapToScene(e.position().toPoint())
+        cellX = (pos.x() - 1) / CELL_SIZE
+        cellY = (pos.y() - 1) / CELL_SIZE
+        x = int(cellX)
+        y = int(cellY)
+
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return
+
+        # The age overlay has no source, clicks pick a cell instead
+        if not self.editable and (self.picking or self._heatmapWalls is None):
+            self.cellClicked.emit(y * self.width + x)
+            return
+
+        # Without editing, clicks move the heatmap's source
+        if not self.editable:
+            self.heatmapSource = y * self.width + x
+            self.updateHeatmap()
+            self.refresh()
+            return
+
+        # Pick the wall closest to the click
+        fracX = cellX - x
+        fracY = cellY - y
+        distances = {
+            "left": fracX,
+            "right": 1 - fracX,
+            "top": fracY,
+            "bottom": 1 - fracY,
+        }
+        side = min(distances, key=distances.get)
+
+        if self.toggleWall(x, y, side):
+            rect = self.rects[y * self.width + x]
+            self.wallToggled.emit(x, y, side, getattr(rect, side))
+            self.refresh()
+
+    def toggleWall(self, x: int, y: int, side: str) -> bool:
+        """Toggles the wall between a cell and its neighbor.
+
+        Args:
+            x (int): The x coordinate of the cell.
+            y (int): The y coordinate of the cell.
+            side (str): The side of the wall (left, right, top, bottom).
+
+        Returns:
+            bool: False if the wall is on the border and was left untouched.
+        """
+        offsets = {
+            "left": (-1, 0, "right"),
+            "right": (1, 0, "left"),
+            "top": (0, -1, "bottom"),
+            "bottom": (0, 1, "top"),
+        }
+        dx, dy, opposite = offsets[side]
+
+        if not (0 <= x + dx < self.width and 0 <= y + dy < self.height):
+            return False
+
+        i = y * self.width + x
+        j = (y + dy) * self.width + x + dx
+        rect = self.rects[i]
+        other = self.rects[j]
+        closed = not getattr(rect, side)
+        setattr(rect, side, closed)
+        setattr(other, opposite, closed)
+
+        for cell in (rect, other):
+            if cell.left and cell.right and cell.top and cell.bottom:
+                cell.state = CellState.INACTIVE
+            else:
+                cell.state = CellState.ACTIVE
+
+        self.cellsChanged.emit(self.cellUpdates([i, j]))
+        return True
+
+    def drawRoute(self, route: list[int]):
+        """Draws a route, replacing the previously drawn route.
+
+        Note:
+            Only the cells of the old and new route are touched.
+            MazeViewer::refresh will have to be called in order to update view.
+
+        Args:
+            route (list[int]): The indices of the cells on the route, in order.
+        """
+        for i in self._routeCells:
+            rect = self.rects[i]
+            rect.leftRoute = False
+            rect.rightRoute = False
+            rect.topRoute = False
+            rect.bottomRoute = False
+
+        for prev, i in zip(route, route[1:]):
+            rect = self.rects[i]
+            prevRect = self.rects[prev]
+
+            if i == prev - 1:
+                prevRect.leftRoute = rect.rightRoute = True
+            elif i == prev + 1:
+                prevRect.rightRoute = rect.leftRoute = True
+            elif i < prev:
+                prevRect.topRoute = rect.bottomRoute = True
+            else:
+                prevRect.bottomRoute = rect.topRoute = True
+
+        self.cellsChanged.emit(self.cellUpdates(set(self._routeCells) | set(route)))
+        self._routeCells = list(route)
+
+    def cellUpdates(self, cells: Iterable[int]) -> CellUpdates:
+        """Reads the values of cells back from the cells.
+
+        Args:
+            cells (Iterable[int]): The indices of the cells.
+
+        Returns:
+            CellUpdates: The current values of the cells.
+        """
+        cells = np.fromiter(cells, dtype=np.int64)
+        keys = np.array([spriteKey(self.rects[i]) for i in cells], dtype=np.int64)
+        chars = np.array([ord(self.rects[i].char) for i in cells], dtype=np.uint8)
+        return CellUpdates(
+            cells,
+            (keys & 0xF).astype(np.uint8),
+            (keys >> 4 & 0xF).astype(np.uint8),
+            (keys >> 8 & 0xF).astype(np.uint8),
+            (keys >> 12 & 0x3).astype(np.uint8),
+            chars,
+        )
+
+    def showHeatmap(self, walls: np.ndarray, source: int = None):
+        """Shows the distance heatmap.
+
+        Args:
+            walls (np.ndarray): The wall bitmasks of the maze, shape (H, W).
+            source (int): The index of the cell to measure from. Defaults to
+                the current heatmapSource.
+        """
+        self._heatmapWalls = walls
+        if source is not None:
+            self.heatmapSource = source
+
+        self.updateHeatmap()
+        self.heatmap.show()
+
+    def updateHeatmap(self, walls: np.ndarray = None):
+        """Recomputes the heatmap's distances.
+
+        Args:
+            walls (np.ndarray): The new wall bitmasks, if the walls changed.
+        """
+        if walls is not None:
+            self._heatmapWalls = walls
+        if self._heatmapWalls is None:
+            return
+
+        distances = bfsDistances(self._heatmapWalls, self.heatmapSource)
+        self.heatmap.setValues(distances.reshape(self._heatmapWalls.shape))
+
+    def showAges(self, ages: np.ndarray):
+        """Shows the age overlay in place of the distance heatmap.
+
+        Args:
+            ages (np.ndarray): The step of each cell, shape (H, W). Negative
+                steps mark cells that are left uncolored.
+        """
+        self._heatmapWalls = None
+        self.heatmap.setValues(ages)
+        self.heatmap.show()
+
+    def hideHeatmap(self):
+        """Hides the distance heatmap or the age overlay."""
+        self.heatmap.hide()
+        self._heatmapWalls = None
 
     def refresh(self):
         """Refresh the view of the maze."""
-        # self.fitInView(self.sceneRect(), Qt.AspectRatioMode.KeepAspectRatioByExpanding)
-        self.fitInView(self.sceneRect())
         self.viewport().update()
 
     def reset(self):
         """Reset the maze.
 
         Note:
-            Generates and clears the existing maze.
+            Lays out and clears the existing maze.
         """
         self.generateMaze()
         self.clearMaze()
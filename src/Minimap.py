@@ -0,0 +1,233 @@
+"""The overview of the whole maze shown over a zoomed in view.
+
+The minimap keeps one code per character of the maze, holding the role of
+its color, and a colored image of at most MINIMAP_SIZE pixels a side sampled
+from them. Only the codes and pixels of the cells that changed are written,
+the image is only recolored when the palette changes and drawn a few times a
+second, so fast playback barely pays for it.
+"""
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtGui import QPainter, QImage, QColor, QPaintEvent, QMouseEvent
+from PyQt6.QtCore import QEvent, QObject, QPointF, QRectF, QTimer, Qt
+from MazeViewer import MazeViewer
+from CellUpdates import CellUpdates
+from FrameRenderer import paletteColors
+from MazeGrid import OFFSETS
+import numpy as np
+
+# The color role of each code held by the minimap
+ROLES = ("wall", "inactive", "active", "queued", "observing", "path", "route")
+WALL, FILL, PATH, ROUTE = 0, 1, 5, 6
+
+# The longest side of the minimap and its distance to the view's corner
+MINIMAP_SIZE = 160
+MARGIN = 8
+
+# The time between repaints while the maze changes, in ms
+UPDATE_INTERVAL = 100
+
+
+class Minimap(QWidget):
+    """An overview of a viewer's maze with a draggable view rectangle.
+
+    Note:
+        The minimap floats in the top right corner of the viewer and is only
+        shown while the viewer is zoomed in.
+
+    Args:
+        viewer (MazeViewer): The viewer to follow, also the parent widget.
+        *args (list): The list of arguments to pass to QWidget.
+        **kwargs (dict): Dictionary of key-word arguments to pass to QWidget.
+
+    Attributes:
+        viewer (MazeViewer): The viewer followed.
+        codes (np.ndarray): The color role of each character, shape (2H+1, 2W+1) uint8.
+    """
+
+    def __init__(self, viewer: MazeViewer, *args, **kwargs):
+        super().__init__(viewer, *args, **kwargs)
+        self.viewer = viewer
+        self.codes = np.zeros((1, 1), dtype=np.uint8)
+        self._table = self.colorTable()
+        self._resample()
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(UPDATE_INTERVAL)
+        self._timer.timeout.connect(self.update)
+
+        self.setCursor(Qt.CursorShape.OpenHandCursor)
+        viewer.cellsChanged.connect(self.applyCellUpdates)
+        viewer.viewChanged.connect(self.updateView)
+        viewer.installEventFilter(self)
+        self.hide()
+
+    def applyCellUpdates(self, updates: CellUpdates):
+        """Writes the pixels of changed cells.
+
+        Note:
+            The minimap is repainted at most every UPDATE_INTERVAL.
+
+        Args:
+            updates (CellUpdates): The new values of the cells.
+        """
+        width = self.viewer.width
+        height = self.viewer.height
+        if self.codes.shape != (2 * height + 1, 2 * width + 1):
+            self.codes = np.full((2 * height + 1, 2 * width + 1), WALL, dtype=np.uint8)
+            self._resample()
+
+        y, x = np.divmod(np.asarray(updates.cells, dtype=np.int64), width)
+        cy = 2 * y + 1
+        cx = 2 * x + 1
+
+        fill = FILL + np.asarray(updates.states, dtype=np.uint8)
+        routes = np.asarray(updates.routes)
+        paths = np.asarray(updates.paths)
+        walls = np.asarray(updates.walls)
+
+        self.codes[cy, cx] = np.where(routes != 0, ROUTE, np.where(paths != 0, PATH, fill))
+        self._patch(cy, cx)
+        for side, (dx, dy) in OFFSETS.items():
+            code = np.where(paths & side, PATH, fill)
+            code = np.where(routes & side, ROUTE, code)
+            self.codes[cy + dy, cx + dx] = np.where(walls & side, WALL, code)
+            self._patch(cy + dy, cx + dx)
+
+        if self.isVisible() and not self._timer.isActive():
+            self._timer.start()
+
+    def colorTable(self) -> np.ndarray:
+        """Gets the RGBA color of each code from the viewer's palette.
+
+        Returns:
+            np.ndarray: The colors, shape (len(ROLES), 4) uint8.
+        """
+        colors = paletteColors(self.viewer.cellPalette)
+        return np.array([(*colors[role], 255) for role in ROLES], dtype=np.uint8)
+
+    def _resample(self):
+        """Picks the characters sampled into the image and colors it.
+
+        Note:
+            Mazes larger than MINIMAP_SIZE characters a side are sampled
+            evenly, so every character maps to at most one pixel.
+        """
+        rows, columns = self.codes.shape
+        self._rows = np.unique(np.linspace(0, rows - 1, min(rows, MINIMAP_SIZE)).round().astype(np.int64))
+        self._columns = np.unique(np.linspace(0, columns - 1, min(columns, MINIMAP_SIZE)).round().astype(np.int64))
+
+        # The pixel of each character, -1 if it isn't sampled
+        self._rowPixels = np.full(rows, -1, dtype=np.int64)
+        self._rowPixels[self._rows] = np.arange(self._rows.size)
+        self._columnPixels = np.full(columns, -1, dtype=np.int64)
+        self._columnPixels[self._columns] = np.arange(self._columns.size)
+
+        self._recolor()
+
+    def _recolor(self):
+        """Colors the whole image from the codes."""
+        self._rgba = np.ascontiguousarray(self._table[self.codes[np.ix_(self._rows, self._columns)]])
+
+    def _patch(self, ys: np.ndarray, xs: np.ndarray):
+        """Colors the pixels of changed characters.
+
+        Args:
+            ys (np.ndarray): The rows of the characters.
+            xs (np.ndarray): The columns of the characters.
+        """
+        py = self._rowPixels[ys]
+        px = self._columnPixels[xs]
+        sampled = (py >= 0) & (px >= 0)
+        self._rgba[py[sampled], px[sampled]] = self._table[self.codes[ys[sampled], xs[sampled]]]
+
+    def updateView(self):
+        """Follows the viewer's zoom and scroll position."""
+        self.setVisible(self.viewer.zoom > 1)
+        self.place()
+        self.update()
+
+    def place(self):
+        """Moves the minimap to the viewer's top right corner, sized like the maze."""
+        rows, columns = self.codes.shape
+        scale = MINIMAP_SIZE / max(rows, columns)
+        self.resize(round(columns * scale), round(rows * scale))
+        self.move(self.viewer.size().width() - self.width() - MARGIN, MARGIN)
+
+    def eventFilter(self, watched: QObject, e: QEvent) -> bool:
+        """Override of the eventFilter method.
+
+        Keeps the minimap in the corner when the viewer is resized.
+        """
+        if watched is self.viewer and e.type() == QEvent.Type.Resize:
+            self.place()
+        return super().eventFilter(watched, e)
+
+    def paintEvent(self, e: QPaintEvent):
+        """Override of the paintEvent method.
+
+        Draws the maze and the rectangle of the viewer's visible area.
+
+        Args:
+            e (QPaintEvent): The paint event.
+        """
+        table = self.colorTable()
+        if not np.array_equal(table, self._table):
+            self._table = table
+            self._recolor()
+
+        rows, columns, _ = self._rgba.shape
+        image = QImage(self._rgba.data, columns, rows, 4 * columns, QImage.Format.Format_RGBA8888)
+
+        painter = QPainter(self)
+        painter.drawImage(QRectF(self.rect()), image)
+
+        # The visible area, in the minimap's coordinates
+        scene = self.viewer.sceneRect()
+        visible = self.viewer.visibleRect()
+        scaleX = self.width() / scene.width()
+        scaleY = self.height() / scene.height()
+        painter.setPen(QColor(self.viewer.cellPalette["route"]))
+        painter.drawRect(
+            QRectF(
+                (visible.x() - scene.x()) * scaleX,
+                (visible.y() - scene.y()) * scaleY,
+                visible.width() * scaleX - 1,
+                visible.height() * scaleY - 1,
+            )
+        )
+        painter.setPen(QColor(self.viewer.cellPalette["wall"]))
+        painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+        painter.end()
+
+    def mousePressEvent(self, e: QMouseEvent):
+        """Override of the mousePressEvent method.
+
+        Centers the viewer on the clicked point.
+        """
+        self.setCursor(Qt.CursorShape.ClosedHandCursor)
+        self.centerOn(e.position())
+
+    def mouseMoveEvent(self, e: QMouseEvent):
+        """Override of the mouseMoveEvent method.
+
+        Drags the viewer's visible area along.
+        """
+        if e.buttons() & Qt.MouseButton.LeftButton:
+            self.centerOn(e.position())
+
+    def mouseReleaseEvent(self, e: QMouseEvent):
+        """Override of the mouseReleaseEvent method."""
+        self.setCursor(Qt.CursorShape.OpenHandCursor)
+
+    def centerOn(self, pos: QPointF):
+        """Centers the viewer on a point of the minimap.
+
+        Args:
+            pos (QPointF): The point, in the minimap's coordinates.
+        """
+        scene = self.viewer.sceneRect()
+        self.viewer.centerOn(
+            scene.x() + pos.x() * scene.width() / self.width(),
+            scene.y() + pos.y() * scene.height() / self.height(),
+        )
@@ -0,0 +1,80 @@
+"""The producer of frames for playing back a run.
+
+The steps are decoded into ready-to-apply cell updates on a worker thread,
+ahead of the timer that shows them. The GUI thread only copies the updates
+onto the cells and repaints.
+"""
+
+from PyQt6.QtCore import QThread
+from CellUpdates import CellUpdates, affectedCells
+from StepStore import StepStore
+import queue
+
+
+class PlaybackThread(QThread):
+    """Decodes the upcoming frames of a run into a bounded buffer.
+
+    Args:
+        steps (StepStore): The steps of the run. Its state is left untouched.
+        direction (int): 1 to play forwards, -1 to play backwards.
+        stride (int): The number of steps per frame.
+        depth (int): The number of frames decoded ahead. Defaults to 64.
+        *args (list): List of arguments to pass to QThread.
+        **kwargs (dict): Dictionary of key-word arguments to pass to QThread.
+
+    Attributes:
+        frames (queue.Queue): The decoded frames as (step, CellUpdates), in
+            order, followed by None once the run is exhausted.
+    """
+
+    def __init__(
+        self, steps: StepStore, direction: int, stride: int, depth: int = 64, *args, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+
+        # Decode on a private state, starting from the shown step
+        self.steps = steps.copy()
+        self.direction = direction
+        self.stride = max(1, stride)
+        self.frames = queue.Queue(maxsize=depth)
+        self._stopped = False
+
+    def run(self):
+        """Decodes frames until the run ends or the thread is stopped."""
+        steps = self.steps
+        height, width = steps.shape[0] // 2, steps.shape[1] // 2
+
+        while True:
+            target = max(0, min(steps.step + self.direction * self.stride, len(steps) - 1))
+            if target == steps.step:
+                break
+
+            changed = steps.seek(target)
+            cells = affectedCells(changed, steps.shape[1], width, height)
+            if not self._put((target, CellUpdates.fromChars(steps.state, cells))):
+                return
+
+        self._put(None)
+
+    def _put(self, frame) -> bool:
+        """Waits for room in the buffer and adds a frame.
+
+        Args:
+            frame ((int, CellUpdates) | None): The frame to add.
+
+        Returns:
+            bool: False if the thread was stopped while waiting.
+        """
+        while not self._stopped:
+            try:
+                self.frames.put(frame, timeout=0.05)
+                return True
+            except queue.Full:
+                pass
+
+        return False
+
+    def stop(self):
+        """Stops decoding and waits for the thread to finish."""
+        self._stopped = True
+        self.wait()
@@ -0,0 +1,434 @@
+"""The tiled export of a maze as a poster sized PNG or SVG image.
+
+A poster of a large maze is far too big to render as one image. The maze is
+rendered in tiles of at most TILE_PIXELS pixels a side, drawn from a
+SpriteAtlas so cells follow the rules of Cell.paint, and every band of tiles
+is streamed into a PNG encoder before the next is rendered. SVG posters are
+written band by band too, with the fills, walls and strokes of a band merged
+into runs. Memory stays bounded by a band, whatever the size of the maze.
+
+Run as a script to export a maze or step file of any size:
+
+    python PosterExport.py maze.mz poster.png [cell size]
+"""
+
+from PyQt6.QtGui import QImage, QPainter
+from PyQt6.QtCore import QPointF, Qt
+from typing import Callable
+from CellPalette import CellPalette, CellState, FILL_ROLES
+from CellUpdates import CellUpdates
+from FrameRenderer import paletteColors
+from MazeGrid import LEFT, RIGHT, TOP, BOTTOM
+from MazeViewer import CELL_SIZE
+from SpriteAtlas import SpriteAtlas, spriteKeys
+import numpy as np
+import struct
+import time
+import zlib
+import sys
+import os
+
+# The largest side of a rendered tile, in pixels
+TILE_PIXELS = 512
+
+# The number of cell rows written at once to an SVG poster
+SVG_BAND_ROWS = 64
+
+# The amount of compressed data held before it is written as a PNG chunk
+PNG_CHUNK_SIZE = 1 << 20
+
+
+class PngWriter:
+    """Encodes an RGB image into a PNG file, rows streamed in order.
+
+    Args:
+        fileName (str): The file to write.
+        width (int): The width of the image in pixels.
+        height (int): The height of the image in pixels.
+    """
+
+    def __init__(self, fileName: str, width: int, height: int):
+        self.fileName = fileName
+        self.width = width
+        self.height = height
+        self._file = open(fileName, "wb")
+        self._compressor = zlib.compressobj(6)
+        self._pending = []
+        self._pendingSize = 0
+
+        self._file.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, kind: bytes, data: bytes):
+        """Writes a PNG chunk.
+
+        Args:
+            kind (bytes): The chunk type.
+            data (bytes): The chunk data.
+        """
+        self._file.write(struct.pack(">I", len(data)) + kind + data)
+        self._file.write(struct.pack(">I", zlib.crc32(kind + data)))
+
+    def _flush(self):
+        """Writes the compressed data held as an image data chunk."""
+        if self._pending:
+            self._chunk(b"IDAT", b"".join(self._pending))
+            self._pending = []
+            self._pendingSize = 0
+
+    def write(self, rows: np.ndarray):
+        """Appends rows to the image.
+
+        Args:
+            rows (np.ndarray): The rows, shape (N, width, 3) uint8.
+        """
+        # Every row starts with its filter type, none
+        scanlines = np.zeros((len(rows), 1 + 3 * self.width), dtype=np.uint8)
+        scanlines[:, 1:] = rows.reshape(len(rows), -1)
+
+        data = self._compressor.compress(scanlines.data)
+        if data:
+            self._pending.append(data)
+            self._pendingSize += len(data)
+            if self._pendingSize >= PNG_CHUNK_SIZE:
+                self._flush()
+
+    def close(self, cancelled: bool = False):
+        """Finishes the image.
+
+        Args:
+            cancelled (bool): True to remove the unfinished file instead.
+        """
+        if cancelled:
+            self._file.close()
+            os.remove(self.fileName)
+            return
+
+        self._pending.append(self._compressor.flush())
+        self._flush()
+        self._chunk(b"IEND", b"")
+        self._file.close()
+
+
+def decodeRegion(
+    chars: np.ndarray, x0: int, y0: int, x1: int, y1: int
+) -> tuple[CellUpdates, np.ndarray, np.ndarray]:
+    """Decodes the cells of a region like MazeViewer.drawChars.
+
+    Note:
+        A cell's state depends on its neighbors, so one cell of context is
+        decoded along with the region.
+
+    Args:
+        chars (np.ndarray): The characters of the maze, shape (2H+1, 2W+1) uint8.
+        x0 (int): The first column of cells.
+        y0 (int): The first row of cells.
+        x1 (int): The column of cells past the region.
+        y1 (int): The row of cells past the region.
+
+    Returns:
+        tuple[CellUpdates, np.ndarray, np.ndarray]: The decoded cells in row-major
+            order, and the column and row of each.
+    """
+    height, width = chars.shape[0] // 2, chars.shape[1] // 2
+    left, top = max(0, x0 - 1), max(0, y0 - 1)
+    right, bottom = min(width, x1 + 1), min(height, y1 + 1)
+    context = chars[2 * top : 2 * bottom + 1, 2 * left : 2 * right + 1]
+
+    y, x = np.mgrid[y0:y1, x0:x1]
+    y = y.ravel()
+    x = x.ravel()
+    updates = CellUpdates.fromChars(context, (y - top) * (right - left) + (x - left))
+    return updates, x, y
+
+
+def renderTile(
+    chars: np.ndarray, atlas: SpriteAtlas, cellSize: int, x0: int, y0: int, x1: int, y1: int
+) -> np.ndarray:
+    """Renders the cells of a region into an RGB image.
+
+    Note:
+        Cells are drawn at the grid position of renderFrame: cell (x, y)
+        starts at pixel (x * cellSize, y * cellSize), and the last row and
+        column of the maze end with one more pixel for the far walls.
+
+    Args:
+        chars (np.ndarray): The characters of the maze, shape (2H+1, 2W+1) uint8.
+        atlas (SpriteAtlas): The sprites, prepared at cellSize / CELL_SIZE.
+        cellSize (int): The size of a cell in pixels.
+        x0 (int): The first column of cells.
+        y0 (int): The first row of cells.
+        x1 (int): The column of cells past the tile.
+        y1 (int): The row of cells past the tile.
+
+    Returns:
+        np.ndarray: The tile, shape (rows, columns, 3) uint8.
+    """
+    height, width = chars.shape[0] // 2, chars.shape[1] // 2
+    tileWidth = (x1 - x0) * cellSize + (x1 == width)
+    tileHeight = (y1 - y0) * cellSize + (y1 == height)
+
+    # Sprites reach past their cell, so the cells around the tile are drawn too
+    updates, x, y = decodeRegion(
+        chars, max(0, x0 - 1), max(0, y0 - 1), min(width, x1 + 1), min(height, y1 + 1)
+    )
+    keys = spriteKeys(updates)
+    slots = {key: atlas.sourceRect(key) for key in np.unique(keys).tolist()}
+
+    # Sprites start on whole pixels so every cell is drawn alike
+    offset = atlas.margin - atlas.spriteSize / 2
+    fragments = [
+        QPainter.PixmapFragment.create(
+            QPointF((cellX - x0) * cellSize - offset, (cellY - y0) * cellSize - offset), slots[key]
+        )
+        for cellX, cellY, key in zip(x.tolist(), y.tolist(), keys.tolist())
+    ]
+
+    image = QImage(tileWidth, tileHeight, QImage.Format.Format_RGBX8888)
+    image.fill(Qt.GlobalColor.white)
+    painter = QPainter(image)
+    painter.drawPixmapFragments(fragments, atlas.pixmap)
+    painter.end()
+
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    pixels = np.frombuffer(bits, dtype=np.uint8).reshape(tileHeight, image.bytesPerLine())
+    return pixels[:, : 4 * tileWidth].reshape(tileHeight, tileWidth, 4)[:, :, :3].copy()
+
+
+def exportPng(
+    chars: np.ndarray,
+    fileName: str,
+    cellPalette: CellPalette,
+    cellSize: int,
+    progress: Callable[[int, int], bool] = None,
+) -> bool:
+    """Exports a maze as a PNG poster.
+
+    Note:
+        Uses pixmaps, so it must run in the GUI thread.
+
+    Args:
+        chars (np.ndarray): The characters of the maze, shape (2H+1, 2W+1) uint8.
+        fileName (str): The file to write.
+        cellPalette (CellPalette): The colors of the poster.
+        cellSize (int): The size of a cell in pixels.
+        progress (Callable[[int, int], bool]): Called with the rows done and the
+            total after every band, returns False to cancel. Defaults to None.
+
+    Returns:
+        bool: False if the export was cancelled and the file removed.
+    """
+    height, width = chars.shape[0] // 2, chars.shape[1] // 2
+    atlas = SpriteAtlas(CELL_SIZE, cellPalette)
+    atlas.prepare(cellSize / CELL_SIZE)
+    tileCells = max(1, TILE_PIXELS // cellSize)
+
+    png = PngWriter(fileName, width * cellSize + 1, height * cellSize + 1)
+    cancelled = False
+    try:
+        for y0 in range(0, height, tileCells):
+            y1 = min(height, y0 + tileCells)
+            band = np.empty(((y1 - y0) * cellSize + (y1 == height), png.width, 3), dtype=np.uint8)
+            for x0 in range(0, width, tileCells):
+                tile = renderTile(chars, atlas, cellSize, x0, y0, min(width, x0 + tileCells), y1)
+                band[:, x0 * cellSize : x0 * cellSize + tile.shape[1]] = tile
+            png.write(band)
+
+            if progress is not None and not progress(y1, height):
+                cancelled = True
+                break
+
+        png.close(cancelled)
+    except BaseException:
+        # A failed export leaves no partial file behind
+        png.close(cancelled=True)
+        raise
+
+    return not cancelled
+
+
+def _runs(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Finds the runs of True in a row.
+
+    Args:
+        mask (np.ndarray): The row, bool.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The start and length of every run.
+    """
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return edges[0::2], edges[1::2] - edges[0::2]
+
+
+def _color(rgb: tuple[int, int, int]) -> str:
+    """Formats a color for SVG."""
+    return "#{:02x}{:02x}{:02x}".format(*rgb)
+
+
+def exportSvg(
+    chars: np.ndarray,
+    fileName: str,
+    cellPalette: CellPalette,
+    cellSize: int,
+    progress: Callable[[int, int], bool] = None,
+) -> bool:
+    """Exports a maze as an SVG poster.
+
+    Note:
+        The poster is drawn in scene units, CELL_SIZE per cell, with the
+        strokes of Cell.paint: walls one unit wide, paths and routes a tenth
+        of a cell wide, and the start and exit letters 80% of a cell high.
+
+    Args:
+        chars (np.ndarray): The characters of the maze, shape (2H+1, 2W+1) uint8.
+        fileName (str): The file to write.
+        cellPalette (CellPalette): The colors of the poster.
+        cellSize (int): The size of a cell in pixels when the poster is shown.
+        progress (Callable[[int, int], bool]): Called with the rows done and the
+            total after every band, returns False to cancel. Defaults to None.
+
+    Returns:
+        bool: False if the export was cancelled and the file removed.
+    """
+    height, width = chars.shape[0] // 2, chars.shape[1] // 2
+    colors = paletteColors(cellPalette)
+    size = CELL_SIZE
+    half = size // 2
+    stroke = int(size * 0.1)
+
+    file = open(fileName, "w")
+    cancelled = False
+    try:
+        file.write(
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            f'width="{width * cellSize + 1}" height="{height * cellSize + 1}" '
+            f'viewBox="-0.5 -0.5 {width * size + 1} {height * size + 1}">\n<style>\n'
+        )
+        for state in CellState:
+            file.write(f".f{state.value}{{fill:{_color(colors[FILL_ROLES[state]])}}}\n")
+        for name, role, lineWidth in (("w", "wall", 1), ("p", "path", stroke), ("r", "route", stroke)):
+            file.write(
+                f".{name}{{fill:none;stroke:{_color(colors[role])};"
+                f"stroke-width:{lineWidth};stroke-linecap:square}}\n"
+            )
+        # Capitals are about 0.72 em high, they fill 80% of the cell like Cell.paint
+        file.write(
+            f".t{{fill:{_color(colors['text'])};font-family:sans-serif;"
+            f"font-size:{round(size * 0.8 / 0.72)}px;text-anchor:middle}}\n</style>\n"
+        )
+
+        for y0 in range(0, height, SVG_BAND_ROWS):
+            y1 = min(height, y0 + SVG_BAND_ROWS)
+            updates, x, y = decodeRegion(chars, 0, y0, width, y1)
+            shape = (y1 - y0, width)
+            parts = []
+
+            # Fills, merged along rows of cells with the same state
+            states = np.asarray(updates.states).reshape(shape)
+            for row in range(shape[0]):
+                changes = np.flatnonzero(np.diff(states[row])) + 1
+                starts = np.concatenate(([0], changes))
+                ends = np.concatenate((changes, [width]))
+                for start, end in zip(starts.tolist(), ends.tolist()):
+                    parts.append(
+                        f'<rect class="f{states[row, start]}" x="{start * size}" y="{(y0 + row) * size}" '
+                        f'width="{(end - start) * size}" height="{size}"/>\n'
+                    )
+
+            # Walls, merged along rows and columns, and the corners of the band
+            wall = chars[2 * y0 : 2 * y1 + 1] == ord("#")
+            path = []
+            for edge in range(y0, y1 + (y1 == height)):
+                for start, length in zip(*_runs(wall[2 * (edge - y0), 1::2])):
+                    path.append(f"M{start * size} {edge * size}h{length * size}")
+            for column in range(width + 1):
+                for start, length in zip(*_runs(wall[1::2, 2 * column])):
+                    path.append(f"M{column * size} {(y0 + start) * size}v{length * size}")
+            for edge in range(y0, y1 + (y1 == height)):
+                for column in np.flatnonzero(wall[2 * (edge - y0), 0::2]).tolist():
+                    path.append(f"M{column * size} {edge * size}h0")
+            parts.append(f'<path class="w" d="{"".join(path)}"/>\n')
+
+            # Paths and routes, merged from half cells along rows and columns
+            for name, bits in (("p", np.asarray(updates.paths)), ("r", np.asarray(updates.routes))):
+                bits = bits.reshape(shape)
+                if not bits.any():
+                    continue
+
+                path = []
+                across = np.stack((bits & LEFT != 0, bits & RIGHT != 0), axis=2).reshape(shape[0], -1)
+                for row in range(shape[0]):
+                    for start, length in zip(*_runs(across[row])):
+                        path.append(f"M{start * half} {(y0 + row) * size + half}h{length * half}")
+                down = np.stack((bits & TOP != 0, bits & BOTTOM != 0), axis=1).reshape(-1, width)
+                for column in range(width):
+                    for start, length in zip(*_runs(down[:, column])):
+                        path.append(f"M{column * size + half} {y0 * size + start * half}v{length * half}")
+                parts.append(f'<path class="{name}" d="{"".join(path)}"/>\n')
+
+            # The start and exit
+            symbols = np.asarray(updates.chars)
+            for i in np.flatnonzero(np.isin(symbols, np.frombuffer(b"SsXx", dtype=np.uint8))).tolist():
+                parts.append(
+                    f'<text class="t" x="{x[i] * size + half}" y="{y[i] * size + half + round(size * 0.4)}">'
+                    f"{chr(symbols[i]).upper()}</text>\n"
+                )
+
+            file.write("".join(parts))
+
+            if progress is not None and not progress(y1, height):
+                cancelled = True
+                break
+
+        if not cancelled:
+            file.write("</svg>\n")
+        file.close()
+    except BaseException:
+        # A failed export leaves no partial file behind
+        file.close()
+        os.remove(fileName)
+        raise
+
+    if cancelled:
+        os.remove(fileName)
+    return not cancelled
+
+
+def exportPoster(
+    chars: np.ndarray,
+    fileName: str,
+    cellPalette: CellPalette,
+    cellSize: int,
+    progress: Callable[[int, int], bool] = None,
+) -> bool:
+    """Exports a maze as a PNG or SVG poster, by the file's extension.
+
+    Args:
+        chars (np.ndarray): The characters of the maze, shape (2H+1, 2W+1) uint8.
+        fileName (str): The file to write, SVG if it ends with .svg, PNG otherwise.
+        cellPalette (CellPalette): The colors of the poster.
+        cellSize (int): The size of a cell in pixels.
+        progress (Callable[[int, int], bool]): Called with the rows done and the
+            total after every band, returns False to cancel. Defaults to None.
+
+    Returns:
+        bool: False if the export was cancelled and the file removed.
+    """
+    if fileName.lower().endswith(".svg"):
+        return exportSvg(chars, fileName, cellPalette, cellSize, progress)
+    return exportPng(chars, fileName, cellPalette, cellSize, progress)
+
+
+if __name__ == "__main__":
+    from PyQt6.QtGui import QGuiApplication
+    from MazeFile import MazeFile
+
+    app = QGuiApplication(sys.argv)
+    cellSize = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+
+    start = time.perf_counter()
+    with MazeFile(sys.argv[1]) as maze:
+        # Step files are exported at their last step
+        exportPoster(maze[len(maze) - 1], sys.argv[2], CellPalette(), cellSize)
+    print(f"{sys.argv[2]}: {os.path.getsize(sys.argv[2]) / 2**20:.2f} MiB in {time.perf_counter() - start:.1f} s")
@@ -0,0 +1,106 @@
+"""The log of generator and solver runs.
+
+Every run is appended as one JSON line with everything needed to reproduce
+it and how long it took, so changes in generation and solving times can be
+traced across sessions.
+"""
+
+import json
+import os
+import time
+
+
+def runLogFile() -> str:
+    """Gets the file the runs are logged in.
+
+    Returns:
+        str: $XDG_STATE_HOME/MazeViewer/runs.jsonl, or ~/.local/state when unset.
+    """
+    base = os.environ.get("XDG_STATE_HOME", os.path.join(os.path.expanduser("~"), ".local", "state"))
+    return os.path.join(base, "MazeViewer", "runs.jsonl")
+
+
+def logRun(
+    generator: list[str],
+    width: int,
+    height: int,
+    seed: int | None,
+    steps: int,
+    seconds: float,
+    solver: str = None,
+    cached: bool = False,
+):
+    """Appends a run to the log.
+
+    Args:
+        generator (list[str]): The generator and its options.
+        width (int): The width of the maze.
+        height (int): The height of the maze.
+        seed (int | None): The seed of the maze, or None if it was edited.
+        steps (int): The number of steps of the run.
+        seconds (float): The wall-clock time of the run.
+        solver (str): The solver of the run. Defaults to None (a generator run).
+        cached (bool): True if the run was replayed from the cache. Defaults to False.
+    """
+    entry = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "generator": generator,
+        "width": width,
+        "height": height,
+        "seed": seed,
+        "solver": solver,
+        "steps": steps,
+        "seconds": round(seconds, 6),
+        "cached": cached,
+    }
+
+    path = runLogFile()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a") as file:
+            file.write(json.dumps(entry) + "\n")
+    except OSError:
+        pass
+
+
+def loadRuns(limit: int = None) -> list[dict]:
+    """Loads the logged runs.
+
+    Args:
+        limit (int): The number of most recent runs to load. Defaults to None (all).
+
+    Returns:
+        list[dict]: The runs, oldest first. Unreadable lines are skipped.
+    """
+    try:
+        with open(runLogFile(), "r") as file:
+            lines = file.readlines()
+    except OSError:
+        return []
+
+    if limit is not None:
+        lines = lines[-limit:]
+
+    runs = []
+    for line in lines:
+        try:
+            runs.append(json.loads(line))
+        except json.JSONDecodeError:
+            pass
+
+    return runs
+
+
+def describeRun(run: dict) -> str:
+    """Formats a logged run for display.
+
+    Args:
+        run (dict): The run from loadRuns.
+
+    Returns:
+        str: A one line summary of the run.
+    """
+    text = f"{run['time']}  {' '.join(run['generator'])} {run['width']}x{run['height']} seed {run['seed']}"
+    if run["solver"] is not None:
+        text += f" / {run['solver']}"
+    return text + f"  ({run['steps']} steps, {run['seconds']:.3f}s{', cached' if run['cached'] else ''})"
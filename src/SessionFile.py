@@ -0,0 +1,132 @@
+"""The container file for saved sessions.
+
+A session holds a run's maze, its parameters and its steps in one file. The
+steps are stored as the deltas of a StepStore plus keyframes, so the file is
+far smaller than the text steps and opens without parsing. The layout is:
+
+    magic | header length (uint64) | JSON header | padding | arrays
+
+The JSON header holds the session's details and the offset, data type and
+shape of every array. Arrays are aligned and memory-mapped when opened, so
+steps are paged in from disk only as playback reaches them.
+"""
+
+from StepStore import StepStore
+import numpy as np
+import struct
+import json
+import os
+
+MAGIC = b"MZSESSN1"
+ALIGN = 64
+EXTENSION = ".mzs"
+
+
+def _align(offset: int) -> int:
+    """Rounds an offset up to the alignment of the arrays."""
+    return -(-offset // ALIGN) * ALIGN
+
+
+def saveSession(fileName: str, steps: StepStore, details: dict):
+    """Saves a run into a session file.
+
+    Note:
+        The file is written next to the target and moved in place once it
+        is complete.
+
+    Args:
+        fileName (str): The file to write.
+        steps (StepStore): The steps of the run. Its state is left untouched.
+        details (dict): The details of the run, anything JSON can hold.
+    """
+    replay = steps.copy()
+    keySteps = steps.keyframeSteps()
+
+    arrays = {
+        "base": steps.base,
+        "offsets": np.asarray(steps.offsets, dtype=np.int64),
+        "positions": np.asarray(steps.positions, dtype=np.int32),
+        "before": np.asarray(steps.before, dtype=np.uint8),
+        "after": np.asarray(steps.after, dtype=np.uint8),
+        "keySteps": keySteps,
+    }
+    shapes = {name: (array.dtype.str, list(array.shape)) for name, array in arrays.items()}
+    shapes["keyframes"] = (np.dtype(np.uint8).str, [len(keySteps), *steps.shape])
+
+    # Lay the arrays out relative to the start of the data
+    layout = {}
+    offset = 0
+    for name, (dtype, shape) in shapes.items():
+        layout[name] = {"offset": offset, "dtype": dtype, "shape": shape}
+        offset = _align(offset + int(np.prod(shape)) * np.dtype(dtype).itemsize)
+
+    header = json.dumps({"details": details, "arrays": layout}).encode("utf-8")
+    dataStart = _align(len(MAGIC) + 8 + len(header))
+
+    tmpName = fileName + ".tmp"
+    try:
+        with open(tmpName, "wb") as file:
+            file.write(MAGIC + struct.pack("<Q", len(header)) + header)
+            for name in shapes:
+                file.seek(dataStart + layout[name]["offset"])
+                if name != "keyframes":
+                    file.write(np.ascontiguousarray(arrays[name]).data)
+                    continue
+
+                # Keyframes are replayed one at a time instead of held in memory
+                for step in keySteps:
+                    replay.seek(int(step))
+                    file.write(replay.state.data)
+    except BaseException:
+        # Don't leave a partial file behind
+        if os.path.exists(tmpName):
+            os.remove(tmpName)
+        raise
+
+    os.replace(tmpName, fileName)
+
+
+def openSession(fileName: str) -> tuple[StepStore, dict]:
+    """Opens a session file.
+
+    Note:
+        Only the header is read, the arrays are memory-mapped.
+
+    Args:
+        fileName (str): The file to open.
+
+    Raises:
+        ValueError: If the file isn't a session file.
+
+    Returns:
+        tuple[StepStore, dict]: The steps, positioned at the first step, and
+            the details of the run.
+    """
+    with open(fileName, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{fileName} is not a session file")
+        (length,) = struct.unpack("<Q", file.read(8))
+        header = json.loads(file.read(length).decode("utf-8"))
+
+    dataStart = _align(len(MAGIC) + 8 + length)
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        shape = tuple(entry["shape"])
+        if 0 in shape:
+            # Empty arrays can't be mapped
+            arrays[name] = np.zeros(shape, dtype=entry["dtype"])
+        else:
+            arrays[name] = np.memmap(
+                fileName, dtype=entry["dtype"], mode="r", offset=dataStart + entry["offset"], shape=shape
+            )
+
+    steps = StepStore(
+        np.array(arrays["base"]),
+        arrays["offsets"],
+        arrays["positions"],
+        arrays["before"],
+        arrays["after"],
+        arrays["keySteps"],
+        arrays["keyframes"],
+    )
+    return steps, header["details"]
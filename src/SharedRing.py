@@ -0,0 +1,120 @@
+"""The shared memory transport for arrays produced by worker processes.
+
+Arrays such as cell states or rendered frames are written by worker
+processes straight into slots of a ring in shared memory and read in place
+by the GUI process, so they are never pickled.
+
+Ownership is explicit: the process that creates a ring owns it and is the
+only one to unlink it, processes that attach only map it. Worker processes
+must be started after the ring is created, so they share the owner's
+resource tracker and exiting never frees memory they don't own.
+"""
+
+from multiprocessing import shared_memory, resource_tracker
+from typing import NamedTuple
+import numpy as np
+
+
+class RingSpec(NamedTuple):
+    """The picklable description of a ring for attaching in another process.
+
+    Attributes:
+        name (str): The name of the shared memory block.
+        slots (int): The number of slots.
+        shape (tuple[int, ...]): The shape of a slot.
+        dtype (str): The data type of a slot.
+    """
+
+    name: str
+    slots: int
+    shape: tuple[int, ...]
+    dtype: str
+
+
+def disown(block: shared_memory.SharedMemory):
+    """Stops the current process from freeing a block when it exits.
+
+    Note:
+        Python registers every block it creates or attaches with the
+        process' resource tracker, which unlinks it when the process exits.
+        A block handed to another process must be disowned first.
+
+    Args:
+        block (shared_memory.SharedMemory): The block.
+    """
+    resource_tracker.unregister(block._name, "shared_memory")
+
+
+class SharedRing:
+    """A ring of equally shaped array slots in shared memory.
+
+    Note:
+        The ring does no locking. The owner decides which slot is written by
+        whom, e.g. by never having more slots in flight than the ring holds.
+        Create the ring before starting the processes that attach to it.
+
+    Args:
+        slots (int): The number of slots.
+        shape (tuple[int, ...]): The shape of a slot.
+        dtype (np.dtype): The data type of a slot. Defaults to uint8.
+
+    Attributes:
+        spec (RingSpec): The description for attaching in another process.
+        owner (bool): True if this process created the ring and frees it.
+    """
+
+    def __init__(self, slots: int, shape: tuple[int, ...], dtype=np.uint8, _block=None):
+        dtype = np.dtype(dtype)
+        slotSize = int(np.prod(shape)) * dtype.itemsize
+        self.owner = _block is None
+        self._block = _block or shared_memory.SharedMemory(create=True, size=max(1, slots * slotSize))
+        self._array = np.ndarray((slots, *shape), dtype=dtype, buffer=self._block.buf)
+        self.spec = RingSpec(self._block.name, slots, tuple(shape), dtype.str)
+
+    @classmethod
+    def attach(cls, spec: RingSpec) -> "SharedRing":
+        """Maps a ring created by another process.
+
+        Args:
+            spec (RingSpec): The ring's spec.
+
+        Returns:
+            SharedRing: The ring, not owned by this process.
+        """
+        block = shared_memory.SharedMemory(spec.name)
+        return cls(spec.slots, spec.shape, spec.dtype, _block=block)
+
+    def __len__(self) -> int:
+        return self.spec.slots
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        """Gets a slot in place.
+
+        Args:
+            i (int): The index of the slot, wrapping around the ring.
+
+        Returns:
+            np.ndarray: The slot, a view over the shared memory.
+        """
+        return self._array[i % self.spec.slots]
+
+    def close(self):
+        """Unmaps the ring, and frees it if this process owns it.
+
+        Note:
+            Views of the slots must not be used afterwards.
+        """
+        if self._block is None:
+            return
+
+        self._array = None
+        self._block.close()
+        if self.owner:
+            self._block.unlink()
+        self._block = None
+
+    def __enter__(self) -> "SharedRing":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -8,6 +8,54 @@ from PyQt6 import uic
 from PyQt6.QtWidgets import QDialog
 from PyQt6.QtGui import QKeyEvent
 from PyQt6.QtCore import Qt
+import math
+
+MIN_SPEED = 1
+MAX_SPEED = 1_000_000  # Fast enough to play any run in a single frame
+
+# The shortest time between two frames of a run in ms (about 60 fps)
+FRAME_INTERVAL = 16
+
+# Slider positions per decade of speed
+SLIDER_SCALE = 100
+
+
+def sliderToSpeed(position: int) -> int:
+    """Converts a slider position to a speed on a logarithmic scale.
+
+    Args:
+        position (int): The slider position.
+
+    Returns:
+        int: The speed in steps/s.
+    """
+    return round(10 ** (position / SLIDER_SCALE))
+
+
+def speedToSlider(speed: int) -> int:
+    """Converts a speed to a slider position on a logarithmic scale.
+
+    Args:
+        speed (int): The speed in steps/s.
+
+    Returns:
+        int: The slider position.
+    """
+    return round(SLIDER_SCALE * math.log10(speed))
+
+
+def speedToString(speed: int) -> str:
+    """Formats a speed for display.
+
+    Args:
+        speed (int): The speed in steps/s.
+
+    Returns:
+        str: The speed, or Instant for the maximum speed.
+    """
+    if speed >= MAX_SPEED:
+        return 'Instant'
+    return f'{speed} steps/s'
 
 
 class SpeedDialog(QDialog):
@@ -29,7 +77,7 @@ class SpeedDialog(QDialog):
         self.speed = speed
         self._firstKey: bool = True
 
-        self.speedSlider.setSliderPosition(self.speed)
+        self.speedSlider.setSliderPosition(speedToSlider(self.speed))
         self.updateDisplay()
 
         self.speedSlider.valueChanged.connect(self.setSpeedFromSlider)
@@ -51,50 +99,53 @@ class SpeedDialog(QDialog):
             case num if kCode.Key_0 <= num <= kCode.Key_9:
                 num -= kCode.Key_0
 
-                if self._firstKey:
+                # Digits are appended until the maximum speed is passed
+                if self._firstKey or self.speed >= MAX_SPEED:
                     self._firstKey = False
                     self.speed = num
-                elif self.speed < 10:
-                    self.speed *= 10
-                    self.speed += num
-                elif self.speed == 10 and num == 0:
-                    self.speed = 100
                 else:
-                    self.speed = num
+                    self.speed = self.speed * 10 + num
 
             case kCode.Key_Backspace:
                 if self.speed >= 10:
                     self.speed //= 10
 
             case kCode.Key_Delete:
+                # Remove the leading digit
                 if self.speed >= 10:
-                    self.speed %= 10
+                    self.speed %= 10 ** (len(str(self.speed)) - 1)
+
+            case kCode.Key_End:
+                self.speed = MAX_SPEED
 
-        self.speedSlider.setSliderPosition(self.speed)
+        # The slider can't represent every speed, so don't let it round the typed one
+        self.speedSlider.blockSignals(True)
+        self.speedSlider.setSliderPosition(speedToSlider(self.speed))
+        self.speedSlider.blockSignals(False)
         self.updateDisplay()
 
     @property
     def speed(self):
         """int: The speed of the run operation in steps/s.
 
-        Current range is limited between 1 and 100, and will bound any input
-        to those values. e.g. speed = 0 => speed = 1.
+        Current range is limited between MIN_SPEED and MAX_SPEED (instant),
+        and will bound any input to those values. e.g. speed = 0 => speed = 1.
         """
         return self._speed
 
     @speed.setter
     def speed(self, speed):
-        if speed > 100:
-            self._speed = 100
-        elif speed < 1:
-            self._speed = 1
+        if speed > MAX_SPEED:
+            self._speed = MAX_SPEED
+        elif speed < MIN_SPEED:
+            self._speed = MIN_SPEED
         else:
             self._speed = speed
 
     def setSpeedFromSlider(self):
         """Sets the speed attribute from the current slider position."""
-        self.speed = self.speedSlider.sliderPosition()
+        self.speed = sliderToSpeed(self.speedSlider.sliderPosition())
 
     def updateDisplay(self):
         """Update the display with the current speed."""
-        self.speedDisplay.setText(f'{self.speed} steps/s')
+        self.speedDisplay.setText(speedToString(self.speed))
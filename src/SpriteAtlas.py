@@ -0,0 +1,196 @@
+"""The sprite atlas the maze is drawn from.
+
+Every cell is one of a small number of looks: its walls, paths, routes, fill
+state and symbol. Each look is painted once by Cell.paint into a slot of a
+single pixmap at the size cells have on screen, so drawing the maze is a
+matter of copying slots instead of stroking lines cell by cell.
+"""
+from PyQt6.QtGui import QPixmap, QPainter
+from PyQt6.QtCore import QRectF, Qt
+from cells import Cell
+from CellPalette import CellPalette, CellState
+from CellUpdates import CellUpdates
+from MazeGrid import LEFT, RIGHT, TOP, BOTTOM
+import numpy as np
+import math
+
+# The number of slots in a row of the atlas
+COLUMNS = 16
+
+SIDES = ((LEFT, "left"), (RIGHT, "right"), (TOP, "top"), (BOTTOM, "bottom"))
+SYMBOLS = {" ": 0, "S": 1, "X": 2}
+
+# Added to a key for a cell one pixel wider or taller than the scale's whole
+# pixels, see SpriteAtlas.cellPixels
+WIDER = 1 << 16
+TALLER = 1 << 17
+
+
+def spriteKey(cell: Cell) -> int:
+    """Packs everything that decides the look of a cell into an integer.
+
+    Args:
+        cell (Cell): The cell.
+
+    Returns:
+        int: The walls in bits 0-3, the paths in bits 4-7, the routes in bits
+            8-11, the fill state in bits 12-13 and the symbol in bits 14-15.
+    """
+    key = 0
+    for bit, side in SIDES:
+        if getattr(cell, side):
+            key |= bit
+        if getattr(cell, side + "Path"):
+            key |= bit << 4
+        if getattr(cell, side + "Route"):
+            key |= bit << 8
+
+    return key | cell.state << 12 | SYMBOLS.get(cell.char.upper(), 0) << 14
+
+
+def spriteKeys(updates: CellUpdates) -> np.ndarray:
+    """Packs the look of decoded cells like spriteKey.
+
+    Args:
+        updates (CellUpdates): The decoded cells.
+
+    Returns:
+        np.ndarray: The key of each cell, int64.
+    """
+    chars = np.asarray(updates.chars)
+    symbols = np.isin(chars, np.frombuffer(b"Ss", dtype=np.uint8)) * 1
+    symbols += np.isin(chars, np.frombuffer(b"Xx", dtype=np.uint8)) * 2
+
+    keys = np.asarray(updates.walls, dtype=np.int64)
+    keys |= np.asarray(updates.paths, dtype=np.int64) << 4
+    keys |= np.asarray(updates.routes, dtype=np.int64) << 8
+    keys |= np.asarray(updates.states, dtype=np.int64) << 12
+    return keys | symbols << 14
+
+
+class SpriteAtlas:
+    """A pixmap holding one sprite per look of a cell, rendered on demand.
+
+    Note:
+        Sprites are rendered at the scale cells are drawn at, so they are
+        copied pixel for pixel. Changing the scale or any color of the palette
+        drops every sprite, they are rendered again as they are needed.
+
+    Args:
+        cellSize (float): The size of a cell in the scene.
+        cellPalette (CellPalette): The palette the sprites are painted with.
+
+    Attributes:
+        pixmap (QPixmap): The atlas, sprites are laid out in rows of COLUMNS.
+        scale (float): The number of device pixels per scene unit.
+        margin (int): The offset of the cell in its sprite, in whole pixels.
+            It leaves room for the walls on the edges.
+        cellPixels (int): The whole pixels a cell spans at the scale. Cells
+            start on whole pixels, so some span one more, and are painted
+            one pixel wider or taller to meet their neighbors exactly.
+        spriteSize (int): The width and height of a sprite, in pixels.
+    """
+
+    def __init__(self, cellSize: float, cellPalette: CellPalette = None):
+        self.cellSize = cellSize
+        self.pixmap = QPixmap()
+        self.scale = 0.0
+        self.margin = 0
+        self.cellPixels = 0
+        self.spriteSize = 0
+
+        # Sprites are painted by a cell that is never shown
+        self._cell = Cell(QRectF(0, 0, cellSize, cellSize))
+        self._slots: dict[int, int] = {}
+        self._colors = None
+        self.setCellPalette(cellPalette if cellPalette is not None else CellPalette())
+
+    def setCellPalette(self, cellPalette: CellPalette):
+        """Paints the sprites with another palette.
+
+        Args:
+            cellPalette (CellPalette): The palette to use.
+        """
+        self._cell.cellPalette = cellPalette
+        self._colors = None
+
+    def prepare(self, scale: float):
+        """Drops the sprites if the scale or the palette changed.
+
+        Args:
+            scale (float): The number of device pixels per scene unit.
+        """
+        colors = tuple(color.rgba() for color in self._cell.cellPalette.colors.values())
+        if scale == self.scale and colors == self._colors:
+            return
+
+        self.scale = scale
+        self._colors = colors
+        self._slots = {}
+
+        # Walls are centered on the cell's edges and the square caps of paths
+        # and routes reach half their width past them. A whole margin keeps
+        # the cell on the pixel grid like the scene did.
+        reach = max(1, int(self.cellSize * 0.1)) / 2
+        self.margin = math.ceil(reach * scale) + 1
+        self.cellPixels = math.floor(self.cellSize * scale)
+        self.spriteSize = self.cellPixels + 1 + 2 * self.margin
+        self.pixmap = QPixmap(COLUMNS * self.spriteSize, self.spriteSize)
+        self.pixmap.fill(Qt.GlobalColor.transparent)
+
+    def sourceRect(self, key: int) -> QRectF:
+        """Gets the slot of a sprite, rendering it if needed.
+
+        Note:
+            Rendering may grow the atlas, so take the pixmap only after every
+            slot of a frame is known.
+
+        Args:
+            key (int): The sprite's key, see spriteKey, plus WIDER and TALLER
+                for cells spanning one more pixel.
+
+        Returns:
+            QRectF: The sprite's rectangle in the atlas, in pixels.
+        """
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = len(self._slots)
+            self._render(key, slot)
+            self._slots[key] = slot
+
+        size = self.spriteSize
+        return QRectF((slot % COLUMNS) * size, (slot // COLUMNS) * size, size, size)
+
+    def _render(self, key: int, slot: int):
+        """Paints a sprite into its slot.
+
+        Args:
+            key (int): The sprite's key.
+            slot (int): The index of the slot.
+        """
+        size = self.spriteSize
+        rows = slot // COLUMNS + 1
+        if rows * size > self.pixmap.height():
+            # Double the rows, keeping the sprites already rendered
+            pixmap = QPixmap(self.pixmap.width(), 2 * self.pixmap.height())
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            painter.drawPixmap(0, 0, self.pixmap)
+            painter.end()
+            self.pixmap = pixmap
+
+        cell = self._cell
+        for bit, side in SIDES:
+            setattr(cell, side, key & bit != 0)
+            setattr(cell, side + "Path", key & bit << 4 != 0)
+            setattr(cell, side + "Route", key & bit << 8 != 0)
+        cell.state = CellState(key >> 12 & 3)
+        cell.char = " SX"[key >> 14 & 3]
+
+        painter = QPainter(self.pixmap)
+        painter.translate((slot % COLUMNS) * size + self.margin, (slot // COLUMNS) * size + self.margin)
+        width = self.cellPixels + (key & WIDER != 0)
+        height = self.cellPixels + (key & TALLER != 0)
+        painter.scale(width / self.cellSize, height / self.cellSize)
+        cell.paint(painter, None)
+        painter.end()
@@ -3,12 +3,21 @@
 This file is the main entry point for the MazeViewer project.
 """
 from PyQt6 import uic
-from PyQt6.QtWidgets import QMainWindow, QColorDialog
+from PyQt6.QtWidgets import QMainWindow, QColorDialog, QDockWidget, QInputDialog, QFileDialog, QMessageBox
+from PyQt6.QtCore import Qt
 from MazeView import MazeView
+from CompareView import CompareView
+from GalleryView import GalleryView
+from StatsPanel import StatsPanel
+from CellPalette import loadThemes, saveTheme
+from StepStream import compressions
+from RunLog import loadRuns, describeRun
+from SessionFile import EXTENSION
 from SizeDialog import SizeDialog
 from SpeedDialog import SpeedDialog
 from GrowingTreeDialog import GrowingTreeDialog
 from BinaryTreeDialog import BinaryTreeDialog
+import struct
 
 
 class MainWindow(QMainWindow):
@@ -23,6 +32,33 @@ class MainWindow(QMainWindow):
         self.mazeView = MazeView()
         self.mazeView.backButton.clicked.connect(self.goToMainMenu)
         self.stackedWidget.addWidget(self.mazeView)
+        self.compareView = CompareView()
+        self.compareView.solveBin = self.mazeView.solveBin
+        self.compareView.cache = self.mazeView.cache
+        self.compareView.cellPalette = self.mazeView.mazeViewer.cellPalette
+        self.compareView.backButton.clicked.connect(self.goToMazeView)
+        self.mazeView.compareButton.clicked.connect(self.goToCompareView)
+        self.stackedWidget.addWidget(self.compareView)
+        self.galleryView = GalleryView()
+        self.galleryView.genBin = self.mazeView.genBin
+        self.galleryView.cache = self.mazeView.cache
+        self.galleryView.cellPalette = self.mazeView.mazeViewer.cellPalette
+        self.galleryView.backButton.clicked.connect(self.goToMainMenu)
+        self.stackedWidget.addWidget(self.galleryView)
+        self.actionGallery.triggered.connect(self.goToGalleryView)
+        self.actionReplay.triggered.connect(self.replayAction)
+        self.actionOpenSession.triggered.connect(self.openSessionAction)
+        self.actionSaveSession.triggered.connect(self.saveSessionAction)
+
+        # Statistics panel
+        self.statsPanel = StatsPanel()
+        self.statsDock = QDockWidget("Maze Statistics", self)
+        self.statsDock.setWidget(self.statsPanel)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.statsDock)
+        self.statsDock.hide()
+        self.actionStatistics.toggled.connect(self.statsDock.setVisible)
+        self.statsDock.visibilityChanged.connect(self.actionStatistics.setChecked)
+        self.mazeView.mazeGenerated.connect(self.statsPanel.analyze)
 
         # Algorithms menu options
         # Generators
@@ -50,8 +86,11 @@ class MainWindow(QMainWindow):
         self.actionObservingColor.triggered.connect(self.observingColorAction)
         self.actionCheckPathColor.triggered.connect(self.checkPathColorAction)
         self.actionSolvePathColor.triggered.connect(self.solvePathColorAction)
+        self.actionSaveTheme.triggered.connect(self.saveThemeAction)
+        self.actionLoadTheme.triggered.connect(self.loadThemeAction)
         self.actionSize.triggered.connect(self.adjustSize)
         self.actionRunSpeed.triggered.connect(self.adjustSpeed)
+        self.actionCompression.triggered.connect(self.adjustCompression)
 
     def resizeEvent(self, e):
         """Override of the resizeEvent method.
@@ -64,51 +103,142 @@ class MainWindow(QMainWindow):
 
     def goToMainMenu(self):
         """Go to the first page."""
+        self.galleryView.stop()
         self.stackedWidget.setCurrentIndex(0)
 
     def goToMazeView(self):
         """Go to the second page."""
+        self.compareView.stop()
+        self.galleryView.stop()
         self.stackedWidget.setCurrentIndex(1)
 
+    def goToCompareView(self):
+        """Go to the solver comparison page."""
+        mazeView = self.mazeView
+        mazeView.stop()
+        mazeView.editButton.setChecked(False)
+        mazeView.saveMaze()
+        self.compareView.setMaze(
+            mazeView.mazeFile,
+            mazeView.mazeViewer.width,
+            mazeView.mazeViewer.height,
+            mazeView.mazeKey,
+        )
+        self.compareView.speed = mazeView.speed
+        self.stackedWidget.setCurrentWidget(self.compareView)
+
+    def goToGalleryView(self):
+        """Go to the generator gallery page."""
+        mazeView = self.mazeView
+        mazeView.stop()
+        self.compareView.stop()
+        self.galleryView.setMaze(mazeView.mazeViewer.width, mazeView.mazeViewer.height, mazeView.seed)
+        self.galleryView.speed = mazeView.speed
+        self.stackedWidget.setCurrentWidget(self.galleryView)
+
+    def openSessionAction(self):
+        """Starts dialog for opening a saved session."""
+        fileName, _ = QFileDialog.getOpenFileName(
+            self, "Open Session", "", f"Maze Session (*{EXTENSION})"
+        )
+        if fileName == "":
+            return
+
+        try:
+            self.mazeView.openSession(fileName)
+        except (OSError, ValueError, KeyError, struct.error) as error:
+            QMessageBox.warning(self, "Open Session", f"The session couldn't be opened:\n{error}")
+            return
+
+        self.compareView.stop()
+        self.galleryView.stop()
+        self.stackedWidget.setCurrentWidget(self.mazeView)
+
+    def saveSessionAction(self):
+        """Starts dialog for saving the shown run as a session."""
+        if self.mazeView.steps is None:
+            return
+
+        fileName, _ = QFileDialog.getSaveFileName(
+            self, "Save Session", f"maze{EXTENSION}", f"Maze Session (*{EXTENSION})"
+        )
+        if fileName == "":
+            return
+
+        try:
+            self.mazeView.saveSession(fileName)
+        except OSError as error:
+            QMessageBox.warning(self, "Save Session", f"The session couldn't be saved:\n{error}")
+
+    def replayAction(self):
+        """Starts dialog for replaying a logged run by its seed."""
+        runs = [run for run in reversed(loadRuns(100)) if run["seed"] is not None]
+        if runs == []:
+            return
+
+        names = [describeRun(run) for run in runs]
+        name, ok = QInputDialog.getItem(self, "Replay Run", "Run:", names, 0, False)
+        if ok:
+            self.stackedWidget.setCurrentWidget(self.mazeView)
+            self.mazeView.replay(runs[names.index(name)])
+
     def activeColorAction(self):
         """Starts dialog for assigning the active cell color."""
         dialog = QColorDialog(self.mazeView.mazeViewer.activeColor)
         if dialog.exec():
             self.mazeView.mazeViewer.activeColor = dialog.selectedColor()
-            self.mazeView.mazeViewer.redrawMaze()
-            self.mazeView.mazeViewer.refresh()
+            self.repaintMazes()
 
     def inactiveColorAction(self):
         """Starts dialog for assigning the inactive cell color."""
         dialog = QColorDialog(self.mazeView.mazeViewer.inactiveColor)
         if dialog.exec():
             self.mazeView.mazeViewer.inactiveColor = dialog.selectedColor()
-            self.mazeView.mazeViewer.redrawMaze()
-            self.mazeView.mazeViewer.refresh()
+            self.repaintMazes()
 
     def observingColorAction(self):
         """Starts dialog for assigning the observing cell color."""
         dialog = QColorDialog(self.mazeView.mazeViewer.observingColor)
         if dialog.exec():
             self.mazeView.mazeViewer.observingColor = dialog.selectedColor()
-            self.mazeView.mazeViewer.redrawMaze()
-            self.mazeView.mazeViewer.refresh()
+            self.repaintMazes()
 
     def checkPathColorAction(self):
         """Starts dialog for assigning the path color."""
         dialog = QColorDialog(self.mazeView.mazeViewer.pathColor)
         if dialog.exec():
             self.mazeView.mazeViewer.pathColor = dialog.selectedColor()
-            self.mazeView.mazeViewer.redrawMaze()
-            self.mazeView.mazeViewer.refresh()
+            self.repaintMazes()
 
     def solvePathColorAction(self):
         """Starts dialog for assigning the route color."""
         dialog = QColorDialog(self.mazeView.mazeViewer.routeColor)
         if dialog.exec():
             self.mazeView.mazeViewer.routeColor = dialog.selectedColor()
-            self.mazeView.mazeViewer.redrawMaze()
-            self.mazeView.mazeViewer.refresh()
+            self.repaintMazes()
+
+    def saveThemeAction(self):
+        """Starts dialog for saving the current colors as a named theme."""
+        name, ok = QInputDialog.getText(self, "Save Theme", "Theme name:")
+        if ok and name != "":
+            saveTheme(name, self.mazeView.mazeViewer.cellPalette)
+
+    def loadThemeAction(self):
+        """Starts dialog for applying a saved theme."""
+        themes = loadThemes()
+        name, ok = QInputDialog.getItem(
+            self, "Load Theme", "Theme:", list(themes), 0, False
+        )
+        if ok:
+            self.mazeView.mazeViewer.cellPalette.setTheme(themes[name])
+            self.repaintMazes()
+
+    def repaintMazes(self):
+        """Repaints every maze after a color change."""
+        self.mazeView.mazeViewer.refresh()
+        self.mazeView.minimap.update()
+        self.compareView.refresh()
+        self.galleryView.refresh()
 
     def adjustSize(self):
         """Starts dialog for adjusting the size of the maze."""
@@ -125,6 +255,17 @@ class MainWindow(QMainWindow):
         dialog = SpeedDialog(self.mazeView.speed)
         if dialog.exec():
             self.mazeView.speed = dialog.speed
+            self.compareView.speed = self.mazeView.speed
+
+    def adjustCompression(self):
+        """Starts dialog for choosing the compression of step files."""
+        names = ["None"] + compressions()
+        current = self.mazeView.compression or "None"
+        name, ok = QInputDialog.getItem(
+            self, "Step Compression", "Compression:", names, names.index(current), False
+        )
+        if ok:
+            self.mazeView.compression = None if name == "None" else name
 
     def kruskalAction(self):
         self.mazeView.generator = "kruskal"
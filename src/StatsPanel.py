@@ -0,0 +1,161 @@
+"""The panel listing statistics of generated mazes.
+
+This file utilizes the layout of a ui file, and adds control
+logic to it.
+"""
+from PyQt6.QtWidgets import QWidget, QTableWidgetItem, QFileDialog
+from PyQt6 import uic
+from PyQt6.QtCore import QThread, pyqtSignal
+from MazeStats import mazeStats
+import json
+import csv
+
+
+class MazeStatsThread(QThread):
+    """Computes the statistics of a maze off the GUI thread.
+
+    Args:
+        maze (str): The maze to analyze.
+        info (dict): Details of the run merged into the statistics.
+        *args (list): List of arguments to pass to QThread.
+        **kwargs (dict): Dictionary of key-word arguments to pass to QThread.
+
+    Signals:
+        statsReady (dict): Emitted with the statistics once computed.
+    """
+
+    statsReady = pyqtSignal(dict)
+
+    def __init__(self, maze: str, info: dict, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.maze = maze
+        self.info = info
+
+    def run(self):
+        """Computes the statistics and emits statsReady."""
+        stats = mazeStats(self.maze)
+        stats.update(self.info)
+        self.statsReady.emit(stats)
+
+
+class StatsPanel(QWidget):
+    """The panel listing statistics of generated mazes.
+
+    One row is added per analyzed maze, so generators can be compared.
+
+    Args:
+        *args (list): List of arguments to pass to QWidget.
+        **kwargs (dict): Dictionary of key-word arguments to pass to QWidget.
+
+    Attributes:
+        results (list[dict]): The statistics of every analyzed maze.
+    """
+
+    columns = [
+        ("Generator", "generator"),
+        ("Size", "size"),
+        ("Seed", "seed"),
+        ("Dead Ends", "deadEnds"),
+        ("Junctions", "junctions"),
+        ("Branching", "branchingFactor"),
+        ("River", "riverFactor"),
+        ("Solution", "solutionLength"),
+        ("Longest Corridor", "longestCorridor"),
+        ("Max Distance", "maxDistance"),
+    ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        uic.loadUi("ui/StatsPanel.ui", self)
+
+        self.results = []
+        self._threads = []
+
+        self.statsTable.setColumnCount(len(self.columns))
+        self.statsTable.setHorizontalHeaderLabels([title for title, _ in self.columns])
+
+        self.clearButton.clicked.connect(self.clear)
+        self.exportButton.clicked.connect(self.export)
+
+    def analyze(self, maze: str, info: dict):
+        """Starts computing the statistics of a maze in the background.
+
+        Args:
+            maze (str): The maze to analyze.
+            info (dict): Details of the run (generator, seed) to record.
+        """
+        thread = MazeStatsThread(maze, info)
+        thread.statsReady.connect(self.addStats)
+        thread.finished.connect(lambda: self._threads.remove(thread))
+        self._threads.append(thread)
+        self.statusLabel.setText("Analyzing...")
+        thread.start()
+
+    def addStats(self, stats: dict):
+        """Adds a row for the statistics of a maze.
+
+        Args:
+            stats (dict): The statistics from mazeStats.
+        """
+        stats["size"] = f"{stats['width']}x{stats['height']}"
+        self.results.append(stats)
+
+        row = self.statsTable.rowCount()
+        self.statsTable.insertRow(row)
+        for column, (_, key) in enumerate(self.columns):
+            value = stats.get(key, "")
+            text = f"{value:.3f}" if isinstance(value, float) else str(value)
+            self.statsTable.setItem(row, column, QTableWidgetItem(text))
+
+        histogram = ", ".join(
+            f"{length}: {count}" for length, count in stats["corridorHistogram"].items()
+        )
+        self.statsTable.item(row, 0).setToolTip(f"Corridor lengths: {histogram}")
+        self.statsTable.scrollToBottom()
+
+        if len(self._threads) <= 1:
+            self.statusLabel.setText("")
+
+    def clear(self):
+        """Removes every row from the panel."""
+        self.results = []
+        self.statsTable.setRowCount(0)
+
+    def export(self):
+        """Exports the statistics to a CSV or JSON file chosen by the user."""
+        fileName, selected = QFileDialog.getSaveFileName(
+            self, "Export Statistics", "maze-stats.csv", "CSV (*.csv);;JSON (*.json)"
+        )
+        if fileName == "":
+            return
+
+        if fileName.endswith(".json") or selected.startswith("JSON"):
+            self.exportJson(fileName)
+        else:
+            self.exportCsv(fileName)
+
+    def exportCsv(self, fileName: str):
+        """Writes the statistics as CSV, one row per maze.
+
+        Args:
+            fileName (str): The file to write.
+        """
+        keys = [key for _, key in self.columns] + ["corridorHistogram"]
+        with open(fileName, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(keys)
+            for stats in self.results:
+                row = [stats.get(key, "") for key in keys[:-1]]
+                row.append(
+                    " ".join(f"{k}:{v}" for k, v in stats["corridorHistogram"].items())
+                )
+                writer.writerow(row)
+
+    def exportJson(self, fileName: str):
+        """Writes the statistics as a JSON list, one object per maze.
+
+        Args:
+            fileName (str): The file to write.
+        """
+        with open(fileName, "w") as file:
+            json.dump(self.results, file, indent=2)
@@ -0,0 +1,56 @@
+"""The throughput benchmark of the step file loaders.
+
+Compares loading a step file through every compression StepStream supports
+against the memory-mapped plain text loading:
+
+    python StepBenchmark.py maze.steps
+"""
+
+from MazeFile import MazeFile
+from StepStore import StepStore
+from StepStream import StepStream, CHUNK_SIZE, EXTENSIONS, compressions, openCompressed
+import tempfile
+import shutil
+import time
+import sys
+import os
+
+
+def benchmark(fileName: str):
+    """Prints the throughput of loading a step file plain and compressed.
+
+    Args:
+        fileName (str): A plain text step file.
+    """
+    size = os.path.getsize(fileName)
+
+    def measure(name: str, path: str, load):
+        start = time.perf_counter()
+        steps = load(path)
+        seconds = time.perf_counter() - start
+        print(
+            f"{name:>6}: {os.path.getsize(path) / 2**20:9.2f} MiB on disk, "
+            f"{len(steps):7d} steps, {size / 2**20 / seconds:8.1f} MiB/s"
+        )
+
+    def loadMapped(path):
+        with MazeFile(path) as steps:
+            return StepStore.fromArrays(steps)
+
+    def loadStream(path):
+        with StepStream(path) as steps:
+            return StepStore.fromArrays(steps)
+
+    measure("mmap", fileName, loadMapped)
+    measure("plain", fileName, loadStream)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for compression in compressions():
+            path = os.path.join(directory, "steps" + EXTENSIONS[compression])
+            with open(fileName, "rb") as src, openCompressed(path, compression, "wb") as dst:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            measure(compression, path, loadStream)
+
+
+if __name__ == "__main__":
+    benchmark(sys.argv[1])
@@ -0,0 +1,142 @@
+"""The index of when every cell changed during a run.
+
+The deltas of a StepStore are scanned once, in chunks, for the first step at
+which each cell was carved, observed and put on the route. The steps are kept
+in one integer array per event, so the step of any cell is a single lookup.
+"""
+
+import numpy as np
+from StepStore import StepStore
+from MazeGrid import wallArray, LEFT, RIGHT, TOP, BOTTOM
+
+WALL = ord("#")
+OBSERVING = ord(":")
+ROUTES = np.array([ord("*"), ord("s"), ord("x")], dtype=np.uint8)
+
+# The number of changes scanned at once
+CHUNK_CHANGES = 1 << 22
+
+
+class StepIndex:
+    """The first step of every cell's events in a run.
+
+    Note:
+        A cell is carved when one of its walls opens or its center stops
+        being a wall, observed when its center becomes ':' and on the route
+        when its center becomes '*', 's' or 'x'. Events already true at the
+        first step are at step 0.
+
+    Args:
+        steps (StepStore): The steps of the run. Its state is left untouched.
+
+    Attributes:
+        carved (np.ndarray): The step each cell was carved at, int32 with -1 for never.
+        observed (np.ndarray): The step each cell was first observed at, int32 with -1 for never.
+        routed (np.ndarray): The step each cell joined the route at, int32 with -1 for never.
+        shape (tuple[int, int]): The shape of the maze in cells, (H, W).
+    """
+
+    def __init__(self, steps: StepStore):
+        rows, columns = steps.shape
+        self.shape = (rows // 2, columns // 2)
+        height, width = self.shape
+
+        base = steps.base
+        cells = base[1::2, 1::2].ravel()
+        closed = wallArray(base).ravel() == LEFT | RIGHT | TOP | BOTTOM
+        self.carved = np.where(closed, -1, 0).astype(np.int32)
+        self.observed = np.where(cells == OBSERVING, 0, -1).astype(np.int32)
+        self.routed = np.where(np.isin(cells, ROUTES), 0, -1).astype(np.int32)
+
+        offsets = np.asarray(steps.offsets)
+        for start in range(0, int(offsets[-1]), CHUNK_CHANGES):
+            end = min(start + CHUNK_CHANGES, int(offsets[-1]))
+            positions = np.asarray(steps.positions[start:end], dtype=np.int64)
+            before = np.asarray(steps.before[start:end])
+            after = np.asarray(steps.after[start:end])
+
+            # The step of every change, deltas are laid out in step order
+            stepOf = (np.searchsorted(offsets, np.arange(start, end), side="right") - 1).astype(np.int32)
+
+            row, column = np.divmod(positions, columns)
+            center = (row % 2 == 1) & (column % 2 == 1)
+            centerCell = (row // 2) * width + column // 2
+
+            # A center or wall that opens carves the cells it belongs to
+            opened = (before == WALL) & (after != WALL)
+            vertical = opened & (row % 2 == 1) & (column % 2 == 0)
+            horizontal = opened & (row % 2 == 0) & (column % 2 == 1)
+            carves = [
+                (centerCell[opened & center], stepOf[opened & center]),
+                self._wallSide(vertical, row // 2, column // 2 - 1, width, height, stepOf),
+                self._wallSide(vertical, row // 2, column // 2, width, height, stepOf),
+                self._wallSide(horizontal, row // 2 - 1, column // 2, width, height, stepOf),
+                self._wallSide(horizontal, row // 2, column // 2, width, height, stepOf),
+            ]
+            self._record(self.carved, *(np.concatenate(parts) for parts in zip(*carves)))
+
+            observing = center & (after == OBSERVING)
+            self._record(self.observed, centerCell[observing], stepOf[observing])
+
+            routing = center & np.isin(after, ROUTES)
+            self._record(self.routed, centerCell[routing], stepOf[routing])
+
+    @staticmethod
+    def _wallSide(
+        mask: np.ndarray,
+        y: np.ndarray,
+        x: np.ndarray,
+        width: int,
+        height: int,
+        stepOf: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Picks the cells on one side of the walls in a mask.
+
+        Args:
+            mask (np.ndarray): The changes to use.
+            y (np.ndarray): The row of the cell on that side for every change.
+            x (np.ndarray): The column of the cell on that side for every change.
+            width (int): The width of the maze in cells.
+            height (int): The height of the maze in cells.
+            stepOf (np.ndarray): The step of every change.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The cells inside the maze and their steps.
+        """
+        mask = mask & (0 <= y) & (y < height) & (0 <= x) & (x < width)
+        return (y * width + x)[mask], stepOf[mask]
+
+    @staticmethod
+    def _record(events: np.ndarray, cells: np.ndarray, stepOf: np.ndarray):
+        """Records the first step of cells that have no step yet.
+
+        Args:
+            events (np.ndarray): The steps of an event, updated in place.
+            cells (np.ndarray): The cells with the event.
+            stepOf (np.ndarray): The step of each event.
+        """
+        if cells.size == 0:
+            return
+
+        # Sort by step so the first occurrence of a cell is its earliest
+        order = np.argsort(stepOf, kind="stable")
+        cells, first = np.unique(cells[order], return_index=True)
+        steps = stepOf[order][first]
+        new = events[cells] < 0
+        events[cells[new]] = steps[new]
+
+    def ages(self, solving: bool) -> np.ndarray:
+        """Gets the step that best tells each cell's age in a run.
+
+        Args:
+            solving (bool): True for a solve run, which ages cells by when
+                they were observed instead of carved.
+
+        Returns:
+            np.ndarray: The step of each cell, shape (H, W) int32 with -1 for never.
+        """
+        events = self.observed if solving else self.carved
+        if solving:
+            # Solvers that don't mark observed cells still mark the route
+            events = np.where(events < 0, self.routed, events)
+        return events.reshape(self.shape)
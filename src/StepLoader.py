@@ -0,0 +1,161 @@
+"""The parallel loader for large step files.
+
+The snapshots of a plain step file are split into contiguous chunks that are
+diffed by a pool of worker processes. Every worker maps the file itself and
+writes its deltas into a shared memory block, so only the block's name and
+sizes are pickled back. The deltas are then merged in order into a
+StepStore, which is the same store StepStore.fromArrays would build.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from MazeFile import MazeFile
+from StepStore import StepStore
+from SharedRing import disown
+import numpy as np
+import multiprocessing
+import mmap
+import os
+
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+
+
+def diffChunk(
+    fileName: str, offsets: np.ndarray, shape: tuple[int, int], stride: int
+) -> tuple[str, int, int]:
+    """Diffs consecutive snapshots of a chunk of a step file.
+
+    Note:
+        The caller owns the returned shared memory block and must unlink it.
+
+    Args:
+        fileName (str): The step file.
+        offsets (np.ndarray): The byte offsets of the chunk's snapshots, starting
+            with the snapshot before the chunk.
+        shape (tuple[int, int]): The shape of a snapshot.
+        stride (int): The number of bytes per row, newline included.
+
+    Returns:
+        tuple[str, int, int]: The name of the shared memory block, the number
+            of steps and the number of changed characters. The block holds the
+            int64 change count of each step, then the int32 positions, then
+            the values before and after.
+    """
+    with open(fileName, "rb") as file:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def snapshot(offset):
+        return np.ndarray(shape, dtype=np.uint8, buffer=data, offset=int(offset), strides=(stride, 1))
+
+    counts = []
+    positions = []
+    before = []
+    after = []
+    prev = np.ascontiguousarray(snapshot(offsets[0])).reshape(-1)
+    for offset in offsets[1:]:
+        flat = np.ascontiguousarray(snapshot(offset)).reshape(-1)
+        changed = np.flatnonzero(flat != prev)
+        counts.append(changed.size)
+        positions.append(changed.astype(np.int32))
+        before.append(prev[changed])
+        after.append(flat[changed])
+        prev = flat
+
+    steps = len(counts)
+    changes = sum(counts)
+    block = shared_memory.SharedMemory(create=True, size=max(1, 8 * steps + 6 * changes))
+    views = _blockViews(block, steps, changes)
+    views[0][:] = counts
+    for view, parts in zip(views[1:], (positions, before, after)):
+        if parts:
+            np.concatenate(parts, out=view)
+
+    # The caller owns the block now, the worker must not free it on exit
+    disown(block)
+
+    del views, prev, flat
+    name = block.name
+    block.close()
+    data.close()
+    return name, steps, changes
+
+
+def _blockViews(block: shared_memory.SharedMemory, steps: int, changes: int) -> list[np.ndarray]:
+    """Views the arrays of a shared memory block written by diffChunk.
+
+    Args:
+        block (shared_memory.SharedMemory): The block.
+        steps (int): The number of steps in the block.
+        changes (int): The number of changed characters in the block.
+
+    Returns:
+        list[np.ndarray]: The counts, positions, before and after arrays.
+    """
+    counts = np.ndarray(steps, dtype=np.int64, buffer=block.buf)
+    positions = np.ndarray(changes, dtype=np.int32, buffer=block.buf, offset=8 * steps)
+    before = np.ndarray(changes, dtype=np.uint8, buffer=block.buf, offset=8 * steps + 4 * changes)
+    after = np.ndarray(changes, dtype=np.uint8, buffer=block.buf, offset=8 * steps + 5 * changes)
+    return [counts, positions, before, after]
+
+
+def loadParallel(mazeFile: MazeFile, workers: int = None) -> StepStore:
+    """Builds a store from a mapped step file using a process pool.
+
+    Args:
+        mazeFile (MazeFile): The mapped step file.
+        workers (int): The number of worker processes. Defaults to the CPU count.
+
+    Raises:
+        ValueError: If the file holds no steps.
+
+    Returns:
+        StepStore: The store of the file's deltas.
+    """
+    if len(mazeFile) == 0:
+        raise ValueError("no steps to store")
+
+    workers = workers if workers is not None else os.cpu_count() or 1
+
+    # A few chunks per worker keeps them busy until the end
+    bounds = np.linspace(0, len(mazeFile) - 1, min(4 * workers, len(mazeFile) - 1) + 1).astype(np.int64)
+    chunks = [mazeFile.offsets[first : last + 1] for first, last in zip(bounds[:-1], bounds[1:])]
+
+    # Leaving the pool waits for every chunk
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("forkserver")) as pool:
+        futures = [
+            pool.submit(diffChunk, mazeFile.fileName, chunk, mazeFile.shape, mazeFile.stride)
+            for chunk in chunks
+        ]
+
+    results = [future.result() for future in futures if future.exception() is None]
+    if len(results) < len(futures):
+        # The blocks of the finished chunks must still be freed
+        for name, _, _ in results:
+            block = shared_memory.SharedMemory(name)
+            block.close()
+            block.unlink()
+        raise next(future.exception() for future in futures if future.exception() is not None)
+
+    steps = 1 + sum(result[1] for result in results)
+    changes = sum(result[2] for result in results)
+    counts = np.zeros(steps + 1, dtype=np.int64)
+    positions = np.empty(changes, dtype=np.int32)
+    before = np.empty(changes, dtype=np.uint8)
+    after = np.empty(changes, dtype=np.uint8)
+
+    # Merge the chunks in order, freeing each block once copied
+    step, change = 2, 0
+    for name, chunkSteps, chunkChanges in results:
+        block = shared_memory.SharedMemory(name)
+        views = _blockViews(block, chunkSteps, chunkChanges)
+        counts[step : step + chunkSteps] = views[0]
+        for target, view in zip((positions, before, after), views[1:]):
+            target[change : change + chunkChanges] = view
+        step += chunkSteps
+        change += chunkChanges
+
+        del views
+        block.close()
+        block.unlink()
+
+    return StepStore(mazeFile[0].copy(), np.cumsum(counts), positions, before, after)
@@ -0,0 +1,232 @@
+"""The store of steps for playing back a run.
+
+Instead of a full snapshot per step, the store keeps the first snapshot and,
+for every following step, the characters that changed along with their value
+before and after the step. Applying a step in either direction only touches
+the characters that changed, so playing backwards costs the same as playing
+forwards. Optional keyframes hold full snapshots at some steps, so long
+jumps start from the nearest keyframe instead of replaying every delta.
+"""
+
+import numpy as np
+from typing import Iterable
+from MazeGrid import mazeArray
+
+
+class StepStore:
+    """Invertible character deltas between consecutive snapshots.
+
+    Args:
+        base (np.ndarray): The first snapshot, shape (2H+1, 2W+1) uint8.
+        offsets (np.ndarray): int64 array of length len(steps) + 1. The delta
+            leading into step i spans offsets[i] to offsets[i + 1].
+        positions (np.ndarray): The flat index of every changed character.
+        before (np.ndarray): The value of every changed character before its step.
+        after (np.ndarray): The value of every changed character after its step.
+        keySteps (np.ndarray): The sorted steps with a keyframe. Defaults to None (no keyframes).
+        keyframes (np.ndarray): The snapshot at each key step, shape (K, 2H+1, 2W+1) uint8.
+            Defaults to None.
+
+    Attributes:
+        state (np.ndarray): The characters at the current step, shape (2H+1, 2W+1) uint8.
+        step (int): The current step.
+    """
+
+    def __init__(
+        self,
+        base: np.ndarray,
+        offsets: np.ndarray,
+        positions: np.ndarray,
+        before: np.ndarray,
+        after: np.ndarray,
+        keySteps: np.ndarray = None,
+        keyframes: np.ndarray = None,
+    ):
+        self.base = base
+        self.offsets = offsets
+        self.positions = positions
+        self.before = before
+        self.after = after
+        self.keySteps = keySteps
+        self.keyframes = keyframes
+
+        self.state = base.copy()
+        self._flat = self.state.reshape(-1)
+        self.step = 0
+
+    @classmethod
+    def fromArrays(cls, frames: Iterable[np.ndarray]) -> "StepStore":
+        """Builds a store from snapshots, one at a time.
+
+        Args:
+            frames (Iterable[np.ndarray]): The snapshots, each (2H+1, 2W+1) uint8.
+
+        Returns:
+            StepStore: The store of the snapshots' deltas.
+        """
+        base = None
+        prev = None
+        counts = [0]
+        positions = []
+        before = []
+        after = []
+
+        for frame in frames:
+            flat = frame.reshape(-1)
+            if base is None:
+                base = frame.copy()
+            elif flat.size != prev.size:
+                # A malformed snapshot can't be diffed, treat it as unchanged
+                counts.append(0)
+                continue
+            else:
+                changed = np.flatnonzero(flat != prev)
+                counts.append(changed.size)
+                positions.append(changed.astype(np.int32))
+                before.append(prev[changed])
+                after.append(flat[changed])
+            prev = flat
+
+        if base is None:
+            raise ValueError("no steps to store")
+
+        def join(parts, dtype):
+            return np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+
+        return cls(
+            base,
+            np.cumsum([0] + counts, dtype=np.int64),
+            join(positions, np.int32),
+            join(before, np.uint8),
+            join(after, np.uint8),
+        )
+
+    @classmethod
+    def fromSteps(cls, steps: Iterable[str]) -> "StepStore":
+        """Builds a store from snapshots given as text.
+
+        Args:
+            steps (Iterable[str]): The snapshots.
+
+        Returns:
+            StepStore: The store of the snapshots' deltas.
+        """
+        return cls.fromArrays(mazeArray(step) for step in steps if step.strip() != "")
+
+    def copy(self) -> "StepStore":
+        """Creates a store sharing the deltas, with its own state at the same step.
+
+        Returns:
+            StepStore: The new store.
+        """
+        store = StepStore(
+            self.base, self.offsets, self.positions, self.before, self.after, self.keySteps, self.keyframes
+        )
+        store.state[...] = self.state
+        store.step = self.step
+        return store
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def keyframeSteps(self) -> np.ndarray:
+        """Picks the steps worth a keyframe.
+
+        Note:
+            A keyframe is placed whenever the deltas since the previous one
+            add up to a snapshot's size, and at the last step. Replaying from
+            a keyframe then never costs more than about two snapshots.
+
+        Returns:
+            np.ndarray: The sorted steps, int64.
+        """
+        size = self.state.size
+        changes = self.offsets[1:]
+        marks = np.searchsorted(changes, np.arange(size, changes[-1] + 1, size))
+        return np.unique(np.append(marks, len(self) - 1)).astype(np.int64)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """tuple[int, int]: The shape of a snapshot."""
+        return self.state.shape
+
+    def forward(self) -> np.ndarray:
+        """Applies the next step.
+
+        Returns:
+            np.ndarray: The flat positions of the characters that changed.
+        """
+        self.step += 1
+        start, end = self.offsets[self.step], self.offsets[self.step + 1]
+        changed = self.positions[start:end]
+        self._flat[changed] = self.after[start:end]
+        return changed
+
+    def backward(self) -> np.ndarray:
+        """Reverts the current step.
+
+        Returns:
+            np.ndarray: The flat positions of the characters that changed.
+        """
+        start, end = self.offsets[self.step], self.offsets[self.step + 1]
+        changed = self.positions[start:end]
+        self._flat[changed] = self.before[start:end]
+        self.step -= 1
+        return changed
+
+    def seek(self, step: int) -> np.ndarray:
+        """Moves the state to a step.
+
+        Note:
+            Every step in between is applied or reverted as one slice.
+
+        Args:
+            step (int): The step to move to.
+
+        Returns:
+            np.ndarray: The flat positions of the characters that may have changed.
+        """
+        step = max(0, min(step, len(self) - 1))
+
+        # Start from a keyframe when that replays fewer deltas
+        if self.keySteps is not None and len(self.keySteps) > 0:
+            key = np.searchsorted(self.keySteps, step, side="right") - 1
+            if key >= 0:
+                keyStep = int(self.keySteps[key])
+                direct = abs(self.offsets[step + 1] - self.offsets[self.step + 1])
+                fromKey = self.offsets[step + 1] - self.offsets[keyStep + 1] + self.state.size
+                if fromKey < direct:
+                    self.state[...] = self.keyframes[key]
+                    self.step = keyStep
+                    self._seekDeltas(step)
+                    return np.arange(self.state.size)
+
+        return self._seekDeltas(step)
+
+    def _seekDeltas(self, step: int) -> np.ndarray:
+        """Moves the state to a step by replaying the deltas in between.
+
+        Args:
+            step (int): The step to move to, within range.
+
+        Returns:
+            np.ndarray: The flat positions of the characters that may have changed.
+        """
+        if step > self.step:
+            start, end = self.offsets[self.step + 1], self.offsets[step + 1]
+            values = self.after
+            order = slice(None, None, -1)  # the latest step wins
+        elif step < self.step:
+            start, end = self.offsets[step + 1], self.offsets[self.step + 1]
+            values = self.before
+            order = slice(None)  # the earliest step wins
+        else:
+            return self.positions[0:0]
+
+        # A character may change in several steps, keep one value per position
+        changed = self.positions[start:end][order]
+        changed, first = np.unique(changed, return_index=True)
+        self._flat[changed] = values[start:end][order][first]
+
+        self.step = step
+        return changed
@@ -0,0 +1,299 @@
+"""The streaming reader and writer for compressed step files.
+
+Step files repeat the whole maze for every step, so they compress very well.
+A compressed file is recognized by its magic bytes and decompressed in
+chunks straight into the snapshot parser, so neither the compressed nor the
+decompressed file is ever held in memory at once.
+"""
+
+import numpy as np
+import threading
+import tempfile
+import shutil
+import gzip
+import lzma
+import os
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MAGIC = {
+    "gzip": b"\x1f\x8b",
+    "lzma": b"\xfd7zXZ\x00",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+EXTENSIONS = {"gzip": ".gz", "lzma": ".xz", "zstd": ".zst"}
+CHUNK_SIZE = 1 << 20
+
+
+def compressions() -> list[str]:
+    """Gets the compressions that can be used.
+
+    Returns:
+        list[str]: The names of the compressions, zstd only if zstandard is installed.
+    """
+    return [name for name in MAGIC if name != "zstd" or zstandard is not None]
+
+
+def detectCompression(fileName: str) -> str | None:
+    """Detects the compression of a file from its magic bytes.
+
+    Args:
+        fileName (str): The file to check.
+
+    Returns:
+        str | None: The name of the compression, or None for plain text.
+    """
+    with open(fileName, "rb") as file:
+        head = file.read(max(len(magic) for magic in MAGIC.values()))
+
+    for name, magic in MAGIC.items():
+        if head.startswith(magic):
+            return name
+
+    return None
+
+
+def openCompressed(fileName: str, compression: str | None, mode: str = "rb"):
+    """Opens a file through a compression.
+
+    Args:
+        fileName (str): The file to open.
+        compression (str | None): The name of the compression, or None for plain text.
+        mode (str): "rb" or "wb". Defaults to "rb".
+
+    Raises:
+        ValueError: If the compression is unknown or zstandard isn't installed.
+
+    Returns:
+        BinaryIO: The file, reading or writing uncompressed bytes.
+    """
+    writing = "w" in mode
+    match compression:
+        case None:
+            return open(fileName, mode)
+        case "gzip":
+            return gzip.open(fileName, mode, compresslevel=6)
+        case "lzma":
+            return lzma.open(fileName, mode, preset=1 if writing else None)
+        case "zstd" if zstandard is not None:
+            return zstandard.open(fileName, mode)
+        case "zstd":
+            raise ValueError("zstd step files need the zstandard package")
+
+    raise ValueError(f"unknown compression: {compression}")
+
+
+def openSteps(fileName: str):
+    """Opens a step file for reading, decompressing it if needed.
+
+    Args:
+        fileName (str): The file to open.
+
+    Returns:
+        BinaryIO: The file, reading uncompressed bytes.
+    """
+    return openCompressed(fileName, detectCompression(fileName))
+
+
+class StepStream:
+    """Sequential access to the snapshots of a possibly compressed step file.
+
+    Note:
+        The snapshots are parsed with the same rules as MazeFile: the newline
+        style and shape come from the first snapshot, runs of blank lines are
+        a single separator and snapshots of another shape are skipped.
+
+    Args:
+        fileName (str): The file to read.
+        chunkSize (int): The number of decompressed bytes read at once. Defaults to CHUNK_SIZE.
+
+    Attributes:
+        fileName (str): The file being read.
+        compression (str | None): The compression of the file, or None for plain text.
+        shape (tuple[int, int] | None): The shape of a snapshot, known once the first is read.
+    """
+
+    def __init__(self, fileName: str, chunkSize: int = CHUNK_SIZE):
+        self.fileName = fileName
+        self.compression = detectCompression(fileName)
+        self.shape = None
+        self._chunkSize = chunkSize
+        self._snapshotSize = 0
+        self._file = openCompressed(fileName, self.compression)
+
+    def _chunks(self):
+        """Yields the decompressed contents in chunks.
+
+        Note:
+            Chunks hold at least two snapshots once their size is known, so
+            a snapshot is never assembled from many small pieces.
+        """
+        while chunk := self._file.read(max(self._chunkSize, 2 * self._snapshotSize)):
+            yield chunk
+
+    def __iter__(self):
+        """Yields the snapshots in order.
+
+        Yields:
+            np.ndarray: The characters of a snapshot, shape (2H+1, 2W+1) uint8.
+                The array is read-only and stays valid after the file is closed.
+        """
+        data = b""
+        newline = None
+        skipping = True
+        for chunk in self._chunks():
+            data += chunk
+            start = 0
+
+            # Blank lines before a snapshot may span chunks
+            if skipping:
+                data = data.lstrip(b"\r\n")
+                skipping = data == b""
+
+            if newline is None:
+                end = data.find(b"\n")
+                if end == -1:
+                    continue
+                newline = b"\r\n" if end > 0 and data[end - 1] == ord("\r") else b"\n"
+
+            separator = newline * 2
+            while (end := data.find(separator, start)) != -1:
+                snapshot = self._snapshot(data, start, end, newline)
+                if snapshot is not None:
+                    yield snapshot
+
+                # Runs of blank lines are a single separator
+                start = end + len(separator)
+                while start < len(data) and data[start] in b"\r\n":
+                    start += 1
+                skipping = start == len(data)
+
+            data = data[start:]
+
+        # The last snapshot may or may not end with a newline
+        if newline is None:
+            newline = b"\r\n" if b"\r\n" in data else b"\n"
+        data = data.rstrip(b"\r\n")
+        if data != b"":
+            snapshot = self._snapshot(data, 0, len(data), newline)
+            if snapshot is not None:
+                yield snapshot
+
+    def _snapshot(self, data: bytes, start: int, end: int, newline: bytes) -> np.ndarray | None:
+        """Views a snapshot of the decompressed data.
+
+        Args:
+            data (bytes): The decompressed data.
+            start (int): The offset of the snapshot.
+            end (int): The offset just past the snapshot's last row.
+            newline (bytes): The newline of the file.
+
+        Returns:
+            np.ndarray | None: The snapshot, or None if its shape doesn't match the first.
+        """
+        if self.shape is None:
+            columns = data.find(newline, start, end)
+            columns = end - start if columns == -1 else columns - start
+            stride = columns + len(newline)
+            self.shape = ((end - start + len(newline)) // stride, columns)
+            self._snapshotSize = self.shape[0] * stride
+
+        rows, columns = self.shape
+        stride = columns + len(newline)
+        if end - start != rows * stride - len(newline):
+            return None
+
+        return np.ndarray(self.shape, dtype=np.uint8, buffer=data, offset=start, strides=(stride, 1))
+
+    def close(self):
+        """Closes the file."""
+        self._file.close()
+
+    def __enter__(self) -> "StepStream":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class StepPipe:
+    """A path for a binary to write its steps to, compressed on the fly.
+
+    Note:
+        On systems with named pipes the binary writes into a pipe that is
+        compressed into the target while it runs, so the plain text never
+        touches the disk. Elsewhere the plain file is compressed once the
+        binary is done.
+
+    Args:
+        target (str): The file to write the steps to.
+        compression (str | None): The compression of the target, or None for plain text.
+
+    Attributes:
+        path (str): The path to hand to the binary.
+    """
+
+    def __init__(self, target: str, compression: str | None):
+        self.target = target
+        self.compression = compression
+        self._directory = None
+        self._thread = None
+        self._error = None
+
+        if compression is None:
+            self.path = target
+        elif hasattr(os, "mkfifo"):
+            self._directory = tempfile.mkdtemp(prefix="MazeViewer-")
+            self.path = os.path.join(self._directory, "steps")
+            os.mkfifo(self.path)
+            self._thread = threading.Thread(target=self._compress, daemon=True)
+            self._thread.start()
+        else:
+            self.path = target + ".tmp"
+
+    def _compress(self):
+        """Compresses everything written to path into the target."""
+        try:
+            with open(self.path, "rb") as src, openCompressed(self.target, self.compression, "wb") as dst:
+                while chunk := src.read(CHUNK_SIZE):
+                    dst.write(chunk)
+        except (OSError, ValueError) as error:
+            self._error = error
+
+    def finish(self):
+        """Waits for the steps to be compressed.
+
+        Note:
+            Must be called after the binary exited.
+
+        Raises:
+            OSError: If the steps couldn't be compressed.
+            ValueError: If the compression can't be used.
+        """
+        if self.compression is None:
+            return
+
+        if self._thread is None:
+            self._compress()
+            os.remove(self.path)
+        else:
+            # A binary that never opened the pipe leaves the reader waiting
+            while self._thread.is_alive():
+                try:
+                    os.close(os.open(self.path, os.O_WRONLY | os.O_NONBLOCK))
+                except OSError:
+                    pass
+                self._thread.join(0.05)
+            shutil.rmtree(self._directory, ignore_errors=True)
+
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self) -> str:
+        return self.path
+
+    def __exit__(self, *args):
+        self.finish()
@@ -0,0 +1,261 @@
+"""The export of maze playback as video.
+
+Frames are rendered by a pool of worker processes into the slots of a shared
+memory ring and streamed in order into an encoder as soon as they are ready.
+Only the maze characters are sent to the workers, the rendered frames are
+read in place. Only a bounded number of frames is in flight at any time, so
+memory use doesn't grow with the length of the run. The functions run by
+the workers are module-level so the pool can pickle them by name.
+"""
+
+from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtGui import QImage
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from FrameRenderer import renderFrame
+from SharedRing import SharedRing, RingSpec
+from StepStore import StepStore
+import numpy as np
+import multiprocessing
+import subprocess
+import shutil
+import os
+
+
+def renderInto(
+    spec: RingSpec, slot: int, chars: np.ndarray, colors: dict[str, tuple[int, int, int]], cellSize: int
+):
+    """Renders a frame into a slot of a shared ring.
+
+    Note:
+        Attaches to the ring by its spec, so only the characters of the
+        frame are pickled to the worker and nothing is sent back.
+
+    Args:
+        spec (RingSpec): The ring of frames.
+        slot (int): The slot to render into.
+        chars (np.ndarray): The characters of the maze, shape (2H+1, 2W+1) uint8.
+        colors (dict[str, tuple[int, int, int]]): The colors from FrameRenderer.paletteColors.
+        cellSize (int): The size of a cell in pixels.
+    """
+    with SharedRing.attach(spec) as ring:
+        renderFrame(chars, colors, cellSize, out=ring[slot])
+
+
+class FfmpegEncoder:
+    """Streams raw RGB frames into ffmpeg through a pipe.
+
+    Args:
+        fileName (str): The video file to write.
+        width (int): The width of a frame in pixels.
+        height (int): The height of a frame in pixels.
+        fps (int): The frames per second of the video.
+    """
+
+    def __init__(self, fileName: str, width: int, height: int, fps: int):
+        # Most codecs need even dimensions
+        self.width = width + width % 2
+        self.height = height + height % 2
+        self.fileName = fileName
+
+        cmd = [
+            shutil.which("ffmpeg"),
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgb24",
+            "-s",
+            f"{self.width}x{self.height}",
+            "-r",
+            str(fps),
+            "-i",
+            "-",
+            "-pix_fmt",
+            "yuv420p",
+            fileName,
+        ]
+        self._process = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    @staticmethod
+    def available() -> bool:
+        """bool: True if ffmpeg can be found on the PATH."""
+        return shutil.which("ffmpeg") is not None
+
+    def write(self, frame: np.ndarray):
+        """Writes a frame.
+
+        Args:
+            frame (np.ndarray): The frame, shape (height, width, 3) uint8.
+        """
+        height, width, _ = frame.shape
+        if (width, height) != (self.width, self.height):
+            frame = np.pad(frame, ((0, self.height - height), (0, self.width - width), (0, 0)), mode="edge")
+
+        try:
+            self._process.stdin.write(np.ascontiguousarray(frame).data)
+        except BrokenPipeError:
+            raise OSError(f"ffmpeg stopped early with exit code {self._process.wait()}") from None
+
+    def close(self, cancelled: bool = False):
+        """Finishes the video.
+
+        Args:
+            cancelled (bool): True to stop ffmpeg and remove the partial file.
+        """
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            # ffmpeg already stopped
+            pass
+        if cancelled:
+            self._process.terminate()
+        self._process.wait()
+
+        if cancelled and os.path.exists(self.fileName):
+            os.remove(self.fileName)
+
+
+class ImageSequenceEncoder:
+    """Writes every frame as a numbered PNG image.
+
+    Args:
+        fileName (str): The name of the images, numbered before the extension
+            (maze.png => maze-000000.png, maze-000001.png, ...).
+    """
+
+    def __init__(self, fileName: str):
+        self.base, self.extension = os.path.splitext(fileName)
+        if self.extension == "":
+            self.extension = ".png"
+        self.count = 0
+
+    def write(self, frame: np.ndarray):
+        """Writes a frame.
+
+        Args:
+            frame (np.ndarray): The frame, shape (height, width, 3) uint8.
+        """
+        frame = np.ascontiguousarray(frame)
+        height, width, _ = frame.shape
+        image = QImage(frame.data, width, height, 3 * width, QImage.Format.Format_RGB888)
+        image.save(f"{self.base}-{self.count:06d}{self.extension}")
+        self.count += 1
+
+    def close(self, cancelled: bool = False):
+        """Finishes the sequence.
+
+        Args:
+            cancelled (bool): Unused, the images written so far are kept.
+        """
+
+
+class VideoExportThread(QThread):
+    """Renders the steps of a run and streams them into an encoder.
+
+    Args:
+        steps (StepStore): The steps of the run. Its current state is left untouched.
+        encoder (FfmpegEncoder | ImageSequenceEncoder): The encoder for the frames.
+        colors (dict[str, tuple[int, int, int]]): The colors from FrameRenderer.paletteColors.
+        cellSize (int): The size of a cell in pixels.
+        every (int): Render every Nth step. Defaults to 1.
+        workers (int): The number of render processes. Defaults to the CPU count.
+        *args (list): List of arguments to pass to QThread.
+        **kwargs (dict): Dictionary of key-word arguments to pass to QThread.
+
+    Attributes:
+        frames (list[int]): The steps that are rendered, in order.
+        cancelled (bool): True once the export was cancelled.
+
+    Signals:
+        frameWritten (int): Emitted with the number of frames written so far.
+        failed (str): Emitted with the error when the export fails, the
+            partial output is removed like when it is cancelled.
+    """
+
+    frameWritten = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+    def __init__(
+        self,
+        steps: StepStore,
+        encoder,
+        colors: dict[str, tuple[int, int, int]],
+        cellSize: int,
+        every: int = 1,
+        workers: int = None,
+        *args,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+
+        # Replay on a private state so playback isn't disturbed
+        self.steps = steps.copy()
+        self.encoder = encoder
+        self.colors = colors
+        self.cellSize = cellSize
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.cancelled = False
+
+        self.frames = list(range(0, len(steps), max(1, every)))
+        if self.frames[-1] != len(steps) - 1:
+            self.frames.append(len(steps) - 1)
+
+    def cancel(self):
+        """Stops the export after the frame being written."""
+        self.cancelled = True
+
+    def run(self):
+        """Renders and encodes the frames.
+
+        Note:
+            The ring is freed once the workers are done with it, also when
+            the export is cancelled or fails.
+        """
+        # Frames in flight are bounded by the ring, so memory stays flat
+        depth = 2 * self.workers
+        height, width = self.steps.shape[0] // 2, self.steps.shape[1] // 2
+        shape = (height * self.cellSize + 1, width * self.cellSize + 1, 3)
+        pending = deque()
+        written = 0
+
+        def writeOldest():
+            nonlocal written
+            slot, future = pending.popleft()
+            future.result()
+            self.encoder.write(ring[slot])
+            written += 1
+            self.frameWritten.emit(written)
+
+        # The pool is shut down before the ring is freed
+        try:
+            with SharedRing(depth, shape) as ring, ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("forkserver")
+            ) as pool:
+                try:
+                    for i, step in enumerate(self.frames):
+                        if self.cancelled:
+                            break
+
+                        # Arguments are pickled later, the state must not change under them
+                        self.steps.seek(step)
+                        chars = self.steps.state.copy()
+                        slot = i % depth
+                        pending.append((slot, pool.submit(renderInto, ring.spec, slot, chars, self.colors, self.cellSize)))
+
+                        if len(pending) >= depth:
+                            writeOldest()
+
+                    while pending and not self.cancelled:
+                        writeOldest()
+                finally:
+                    for _, future in pending:
+                        future.cancel()
+        except Exception as error:
+            # Exceptions must not leave run, PyQt aborts the process on them
+            self.cancelled = True
+            self.failed.emit(str(error) or type(error).__name__)
+        finally:
+            self.encoder.close(self.cancelled)
@@ -4,8 +4,9 @@ This file utilizes the layout of a ui file, and adds control
 logic to it.
 """
 from PyQt6.QtWidgets import QGraphicsRectItem, QWidget, QStyleOptionGraphicsItem
-from PyQt6.QtGui import QPainter, QColor, QFont, QFontMetrics
+from PyQt6.QtGui import QPainter, QFont, QFontMetrics
 from PyQt6.QtCore import QPointF, QRect
+from CellPalette import CellPalette, CellState
 
 
 class Cell(QGraphicsRectItem):
@@ -13,6 +14,7 @@ class Cell(QGraphicsRectItem):
 
     Args:
         *args (list): The list of arguments to pass to the parent class.
+        cellPalette (CellPalette): The palette shared with the other cells.
         **kwargs (dict): Dictionary of key-word arguments to pass to QWidget.
 
     Attributes:
@@ -39,12 +41,11 @@ class Cell(QGraphicsRectItem):
                         's' - Start (visited)
                         'X' - Exit (not visited)
                         'x' - Exit (visited)
-        wallColor (QColor): The color of the wall.
-        pathColor (QColor): The color of the path.
-        routeColor (QColor): The color of the route.
+        state (CellState): The fill state of the cell.
+        cellPalette (CellPalette): The palette the colors are looked up in.
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, cellPalette: CellPalette = None, **kwargs):
         super().__init__(*args, **kwargs)
 
         # Walls
@@ -73,10 +74,8 @@ class Cell(QGraphicsRectItem):
 
         self.char = " "
 
-        self.wallColor = QColor(0, 0, 0, 255)  # Black
-        self.textColor = QColor(0, 0, 0, 255)  # Black
-        self.pathColor = QColor(63, 162, 242, 255)  # Light Blue
-        self.routeColor = QColor(242, 150, 63, 255)  # Light Orange
+        self.state = CellState.INACTIVE
+        self.cellPalette = cellPalette if cellPalette is not None else CellPalette()
 
     def paint(
         self,
@@ -96,11 +95,11 @@ class Cell(QGraphicsRectItem):
         """
 
         # Standard rectangle
-        painter.fillRect(self.rect(), self.brush().color())
+        painter.fillRect(self.rect(), self.cellPalette.fill(self.state))
 
         # Set pen to wallColor
         pen = painter.pen()
-        pen.setColor(self.wallColor)
+        pen.setColor(self.cellPalette["wall"])
         painter.setPen(pen)
 
         # Get the four corners of the rectangle
@@ -144,7 +143,7 @@ class Cell(QGraphicsRectItem):
 
         # Set pen to pathColor
         pen = painter.pen()
-        pen.setColor(self.pathColor)
+        pen.setColor(self.cellPalette["path"])
         pen.setWidth(int(self.rect().width() * 0.1))
         painter.setPen(pen)
 
@@ -172,7 +171,7 @@ class Cell(QGraphicsRectItem):
 
         # Set pen to routeColor
         pen = painter.pen()
-        pen.setColor(self.routeColor)
+        pen.setColor(self.cellPalette["route"])
         pen.setWidth(int(self.rect().width() * 0.1))
         painter.setPen(pen)
 
@@ -199,7 +198,7 @@ class Cell(QGraphicsRectItem):
         # Draw char if needed
         # Set pen to textColor
         pen = painter.pen()
-        pen.setColor(self.textColor)
+        pen.setColor(self.cellPalette["text"])
         pen.setWidth(1)
         painter.setPen(pen)
 
@@ -274,21 +273,3 @@ class Cell(QGraphicsRectItem):
         font.setPointSize(ogSz)
 
         return sz
-
-    @property
-    def pathColor(self):
-        """QColor: The color of a path cell."""
-        return self._pathColor
-
-    @pathColor.setter
-    def pathColor(self, color: QColor):
-        self._pathColor = color
-
-    @property
-    def routeColor(self):
-        """QColor: The color of a route cell."""
-        return self._routeColor
-
-    @routeColor.setter
-    def routeColor(self, color: QColor):
-        self._routeColor = color